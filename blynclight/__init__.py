@@ -22,11 +22,25 @@ from .constants import FlashSpeed, MusicSelections
 
 from .exceptions import BlyncLightNotFound, BlyncLightUnknownDevice, BlyncLightInUse
 
+from .scenes import SceneRegistry
+from .profiles import DeviceProfile, register_profile
+from .state import StateCache
+from .index import LightIndex
+from .bulk import open_lights
+from .layers import StateStack
+
 __all__ = [
     "BlyncLight",
     "BlyncLightNotFound",
     "BlyncLightInUse",
     "BlyncLightUnknownDevice",
+    "DeviceProfile",
     "FlashSpeed",
+    "LightIndex",
     "MusicSelections",
+    "SceneRegistry",
+    "StateCache",
+    "StateStack",
+    "open_lights",
+    "register_profile",
 ]
@@ -4,28 +4,97 @@ Control your Embrava BlyncLight from the command-line!
 
 """
 
+import json
+import shlex
 import sys
 
+import click
 import typer
 
 
 from collections import deque
+from contextlib import nullcontext
+from functools import lru_cache
 from itertools import cycle
 from loguru import logger
 from pathlib import Path
-from time import sleep
+from time import perf_counter
+from typing import Any, Dict, List, Tuple
 
 
 from .blynclight import BlyncLight
-from .constants import EMBRAVA_VENDOR_IDS
+from .bulk import open_lights
+from .clock import SYSTEM_CLOCK, Clock
+from .constants import COLORS, EMBRAVA_VENDOR_IDS
 from .exceptions import BlyncLightNotFound
-from .effects import Gradient, Spectrum
+from .flash import blink
+from .follow import Follower
+from .index import LightIndex
+from .plugins import EffectGroup
+from .scenes import SceneRegistry, default_scenes_path
 from .__version__ import __version__
 
-cli = typer.Typer()
+cli = typer.Typer(cls=EffectGroup)
 
 DEFAULT_COLOR = (0, 0, 255)  # (Red, Blue, Green)
 
+# Clock used by the timed subcommands, a VirtualClock in tests.
+CLOCK: Clock = SYSTEM_CLOCK
+
+# Subcommands that open their own lights, or none at all, instead of
+# the light selected by the root command.
+OPENS_OWN_LIGHTS = ["udev-rules", "serve", "follow", "batch", "bench", "alias"]
+
+# Root command options that describe a light's state, see light_state().
+STATE_OPTIONS = [
+    "light_id",
+    "red",
+    "blue",
+    "green",
+    "red_b",
+    "blue_b",
+    "green_b",
+    "off",
+    "dim",
+    "flash",
+    "play",
+    "repeat",
+    "volume",
+]
+
+
+def light_state(
+    red: int = 0,
+    blue: int = 0,
+    green: int = 0,
+    red_b: bool = False,
+    blue_b: bool = False,
+    green_b: bool = False,
+    off: bool = False,
+    dim: bool = False,
+    flash: int = 0,
+    play: int = 0,
+    repeat: bool = False,
+    volume: int = 5,
+) -> Dict[str, Any]:
+    """Returns the BlyncLight attributes described by the root command
+    options as a dictionary suitable for BlyncLight.apply().
+    """
+    return {
+        "red": red if not red_b else 255,
+        "blue": blue if not blue_b else 255,
+        "green": green if not green_b else 255,
+        "off": 1 if off else 0,
+        "dim": 1 if dim else 0,
+        "flash": 1 if flash > 0 else 0,
+        "speed": flash,
+        "mute": 0 if play else 1,
+        "music": play,
+        "play": 1 if play else 0,
+        "volume": volume,
+        "repeat": 1 if repeat else 0,
+    }
+
 
 def list_lights(value: bool) -> None:
     """Display a list of BlyncLights currently available and exit.
@@ -85,6 +154,12 @@ def blync_callback(
         show_default=True,
         help="Light identifier",
     ),
+    light_name: str = typer.Option(
+        None,
+        "--light",
+        "-L",
+        help="Light alias, serial number or HID path, instead of --light-id.",
+    ),
     red: int = typer.Option(
         0,
         "--red",
@@ -156,6 +231,18 @@ def blync_callback(
         is_eager=True,
         callback=list_lights,
     ),
+    metrics: Path = typer.Option(
+        None,
+        "--metrics",
+        "-M",
+        help="Export OpenMetrics for open lights to this file every second.",
+    ),
+    resilient: bool = typer.Option(
+        False,
+        "--resilient",
+        is_flag=True,
+        help="Keep running and reconnect lights that are unplugged.",
+    ),
     verbose: int = typer.Option(0, "--verbose", "-v", count=True, callback=verbosity),
     version: bool = typer.Option(
         False, "--version", "-V", is_flag=True, is_eager=True, callback=report_version
@@ -212,30 +299,34 @@ def blync_callback(
     Windows, Linux, FreeBSD and MacOS via a Cython module.
     """
 
-    if ctx.invoked_subcommand == "udev-rules":
+    if metrics:
+        from .metrics import MetricsExporter
+
+        exporter = MetricsExporter(metrics)
+        exporter.start()
+        ctx.call_on_close(exporter.stop)
+
+    ctx.meta["resilient"] = resilient
+
+    if ctx.invoked_subcommand in OPENS_OWN_LIGHTS:
         return
 
     try:
-        light = BlyncLight.get_light(light_id, immediate=False)
+        if light_name:
+            light = LightIndex().open(light_name, immediate=False, resilient=resilient)
+        else:
+            light = BlyncLight.get_light(light_id, immediate=False, resilient=resilient)
     except BlyncLightNotFound as error:
         typer.secho(str(error), fg="red")
         raise typer.Exit(-1) from None
 
     assert not light.immediate
 
-    light.red = red if not red_b else 255
-    light.blue = blue if not blue_b else 255
-    light.green = green if not green_b else 255
-    light.off = 1 if off else 0
-    light.dim = 1 if dim else 0
-    light.flash = 1 if flash > 0 else 0
-    light.speed = flash
-
-    light.mute = 0 if play else 1
-    light.music = play
-    light.play = 1 if play else 0
-    light.volume = volume
-    light.repeat = 1 if repeat else 0
+    state = light_state(
+        red, blue, green, red_b, blue_b, green_b, off, dim, flash, play, repeat, volume
+    )
+    for name, value in state.items():
+        setattr(light, name, value)
 
     if not ctx.invoked_subcommand:
 
@@ -291,8 +382,12 @@ def fli_subcommand(
     This mode runs until the user interrupts.
     """
 
+    from .calibrate import CalibrationCache
+
     light = ctx.obj
 
+    interval = CalibrationCache().calibration_for(light).interval(interval)
+
     color = deque([(0x0FF & intensity) >> 0, 0, 0])
 
     try:
@@ -300,10 +395,12 @@ def fli_subcommand(
         light.on = True
         light.immediate = 1
 
+        deadline = CLOCK.now()
         while True:
             color.rotate(1)
             light.color = color
-            sleep(interval)
+            deadline += interval
+            CLOCK.sleep_until(deadline)
 
     except KeyboardInterrupt:
         light.off = True
@@ -340,26 +437,31 @@ def throbber_subcommand(
     This mode runs until the user interrupts.
     """
 
+    from .calibrate import CalibrationCache
+    from .effects import Gradient, PrefetchRunner
+
     light = ctx.obj
 
     if light.color == (0, 0, 0):
         light.red = 255
 
-    try:
-        step = 8 * (min(max(0, fast), 24) + 1)
-        colors = Gradient(
-            0, 255, step, light.red, light.green, light.blue, reverse=True
-        )
-        light.color = (0, 0, 0)
-        light.immediate = 1
+    # Run at the light's highest sustainable frame rate, shrinking the
+    # gradient step to keep roughly the same throb period.
+    interval = CalibrationCache().calibration_for(light).interval(0.01)
 
-        for color in cycle(colors):
-            light.color = color
-            sleep(0.05)
+    step = 8 * (min(max(0, fast), 24) + 1)
+    step = max(1, round(step * min(interval / 0.05, 1.0)))
+    colors = Gradient(0, 255, step, light.red, light.green, light.blue, reverse=True)
+    light.color = (0, 0, 0)
 
+    runner = PrefetchRunner([light], cycle(colors), interval=interval, clock=CLOCK)
+
+    try:
+        runner.run()
     except KeyboardInterrupt:
         light.off = True
         light.reset()
+        logger.info(f"{runner.ring.underruns} underruns, {runner.dropped} dropped")
 
 
 @cli.command("rainbow")
@@ -373,6 +475,19 @@ def rainbow_subcommand(
         is_flag=True,
         count=True,
     ),
+    all_lights: bool = typer.Option(
+        False,
+        "--all",
+        "-A",
+        is_flag=True,
+        help="Synchronize the rainbow across all available lights.",
+    ),
+    spread: bool = typer.Option(
+        False,
+        "--spread",
+        is_flag=True,
+        help="Spread lights evenly around the color cycle.",
+    ),
 ):
     """BlyncLights Love Rainbows.
 
@@ -386,30 +501,707 @@ def rainbow_subcommand(
     ```console
     $ blync rainbow -s   # slow cycling by 0.1 seconds
     $ blync rainbow -ss  # slow cycling by 0.15 seconds
+    $ blync rainbow -A   # all lights in phase from a single clock
+    $ blync rainbow -A --spread  # all lights evenly out of phase
     ```
 
+    Inter-light write skew for each tick is logged with -vv.
+
     This mode runs until the user interrupts.
     """
 
+    from .calibrate import CalibrationCache
+    from .effects import EffectCache, EffectRunner, Spectrum, TableRunner
+
+    lights = [ctx.obj]
+
+    if all_lights:
+        for result in open_lights(immediate=False, resilient=ctx.obj.resilient):
+            if result.ok and result.light is not ctx.obj:
+                lights.append(result.light)
+
+    # The spectrum is compiled into command words once and cached.
+    ctx.obj.on = True
+    table = EffectCache().get(
+        "spectrum", {"steps": 255}, ctx.obj.bytes, lambda: Spectrum(steps=255)
+    )
+    offsets = EffectRunner.spread(len(lights), len(table)) if spread else None
+
+    calibrations = CalibrationCache()
+    interval = max(
+        calibrations.calibration_for(light).interval(speed * 0.05) for light in lights
+    )
+
+    runner = TableRunner(lights, table, interval=interval, offsets=offsets, clock=CLOCK)
+    runner.on_tick = lambda tick, skew: logger.debug(
+        f"tick {tick} skew {skew * 1e6:.0f}us"
+    )
+
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        for light in lights:
+            light.off = True
+            light.reset()
+        logger.info(
+            f"{runner.ticks} ticks, {runner.dropped} dropped, "
+            f"max skew {runner.max_skew * 1e6:.0f}us"
+        )
+
+
+@cli.command("calibrate")
+def calibrate_subcommand(
+    ctx: typer.Context,
+    samples: int = typer.Option(
+        20,
+        "--samples",
+        "-n",
+        help="Number of timed writes.",
+        show_default=True,
+    ),
+):
+    """Measure Write Latency.
+
+    Times a burst of writes to the light and caches the shortest
+    interval between writes it sustains. The `fli`, `throbber` and
+    `rainbow` modes never update the light faster than this interval.
+    Lights that haven't been calibrated are paced by their model's
+    maximum update rate.
+
+    ## Examples
+
+    \b
+    ```console
+    $ blync calibrate         # measure the first light
+    $ blync -l 1 calibrate    # measure the second light
+    ```
+    """
+
+    from .calibrate import CalibrationCache
+
+    light = ctx.obj
+
+    calibration = CalibrationCache().calibrate(light, samples)
+
+    typer.echo(
+        f"{light.identifier} latency {calibration.latency * 1e6:.0f}us, "
+        f"min interval {calibration.min_interval * 1e3:.2f}ms, "
+        f"max rate {calibration.max_rate:.0f}/s"
+    )
+
+
+@cli.command("blink")
+def blink_subcommand(
+    ctx: typer.Context,
+    on: float = typer.Option(
+        0.5, "--on-time", "-n", help="Seconds on per blink.", show_default=True
+    ),
+    off: float = typer.Option(
+        0.5, "--off-time", "-f", help="Seconds off per blink.", show_default=True
+    ),
+    seconds: float = typer.Option(
+        None, "--seconds", "-s", help="Seconds to blink, forever if not given."
+    ),
+):
+    """Blink the Light.
+
+    Blinks the light with the specified color. Patterns that match one
+    of the firmware's flash speeds are handed to the light with a single
+    write; other patterns are toggled by this command. With --seconds
+    the light is switched off with flashing stopped when time is up.
+
+    ## Examples
+
+    \b
+    ```console
+    $ blync -R blink                 # firmware flash, one write
+    $ blync -G blink -n 0.1 -f 0.9   # short blips, toggled in software
+    $ blync -R blink -s 5            # flash for five seconds, then off
+    ```
+    """
+
     light = ctx.obj
 
+    color = light.color if light.color != (0, 0, 0) else DEFAULT_COLOR
+
     try:
-        colors = [rgb for rgb in Spectrum(steps=255)]
-        interval = speed * 0.05
+        plan = blink(light, color, on, off, seconds, clock=CLOCK)
+        logger.info(f"{'Hardware' if plan.hardware else 'Software'} blink {plan}")
+    except ValueError as error:
+        typer.secho(str(error), fg="red")
+        raise typer.Exit(code=1)
+    except KeyboardInterrupt:
+        light.off = True
+        light.reset()
 
-        light.on = True
-        light.color = (0, 0, 0)
-        light.immediate = 1
 
-        for color in cycle(colors):
-            light.color = color
-            sleep(interval)
+@cli.command("bench")
+def bench_subcommand(
+    ctx: typer.Context,
+    pattern: str = typer.Option(
+        "colors",
+        "--pattern",
+        "-p",
+        help="Write pattern, one of those listed below.",
+        show_default=True,
+    ),
+    seconds: float = typer.Option(
+        5.0, "--seconds", "-s", help="Seconds to run.", show_default=True
+    ),
+    rate: float = typer.Option(
+        0.0,
+        "--rate",
+        "-r",
+        help="Ticks per second, 0 writes as fast as possible.",
+        show_default=True,
+    ),
+    all_lights: bool = typer.Option(
+        False, "--all", "-A", is_flag=True, help="Benchmark all available lights."
+    ),
+    simulate: int = typer.Option(
+        0,
+        "--simulate",
+        "-S",
+        help="Benchmark this many simulated lights instead of devices.",
+    ),
+    latency: float = typer.Option(
+        0.0005,
+        "--latency",
+        help="Seconds per write of simulated lights.",
+        show_default=True,
+    ),
+    as_json: bool = typer.Option(
+        False, "--json", "-j", is_flag=True, help="Report as JSON."
+    ),
+):
+    """Measure Write Throughput and Latency.
+
+    Drives the selected light, every light with --all, or simulated
+    lights with --simulate, using a write pattern and reports the
+    writes per second sustained, write latency percentiles and
+    dropped ticks.
+
+    \b
+    - constant: every light is written the same color every tick
+    - colors: every light is written a new color every tick
+    - round-robin: one light is written per tick, taking turns
+
+    ## Examples
+
+    \b
+    ```console
+    $ blync bench                        # the first light, flat out
+    $ blync bench -A -p round-robin -r 200
+    $ blync bench -S 8 --latency 0.001 --json
+    ```
+    """
+
+    from .bench import Benchmark, simulated_lights
+
+    if simulate:
+        lights = simulated_lights(simulate, latency, clock=CLOCK)
+    else:
+        try:
+            if all_lights:
+                results = open_lights(immediate=False)
+                lights = [result.light for result in results if result.ok]
+            elif ctx.parent.params["light_name"]:
+                light_name = ctx.parent.params["light_name"]
+                lights = [LightIndex().open(light_name, immediate=False)]
+            else:
+                light_id = ctx.parent.params["light_id"]
+                lights = [BlyncLight.get_light(light_id, immediate=False)]
+        except BlyncLightNotFound as error:
+            typer.secho(str(error), fg="red")
+            raise typer.Exit(-1) from None
+
+    try:
+        bench = Benchmark(lights, pattern, rate=rate or None, clock=CLOCK)
+    except ValueError as error:
+        typer.secho(str(error), fg="red")
+        raise typer.Exit(code=1)
+
+    try:
+        report = bench.run(seconds)
+    finally:
+        if not simulate:
+            for light in lights:
+                light.reset()
+
+    if as_json:
+        typer.echo(json.dumps(report, indent=2))
+        return
+
+    def ms(value):
+        return f"{value * 1e3:.3f}ms" if value is not None else "-"
+
+    typer.echo(
+        f"{report['pattern']}: {len(lights)} lights, {report['ticks']} ticks, "
+        f"{report['dropped']} dropped in {report['seconds']:.2f}s"
+    )
+    for name, result in [("total", report)] + list(report["lights"].items()):
+        typer.echo(
+            f"{name:>15s} {result['writes_per_second']:10.1f} writes/s "
+            f"p50 {ms(result['p50'])} p99 {ms(result['p99'])} "
+            f"p999 {ms(result['p999'])} max {ms(result['max'])} "
+            f"errors {result['errors']}"
+        )
+
+
+@cli.command("fade")
+def fade_subcommand(
+    ctx: typer.Context,
+    seconds: float = typer.Option(
+        10.0,
+        "--seconds",
+        "-s",
+        help="Seconds to fade from black to the color.",
+        show_default=True,
+    ),
+    rate: float = typer.Option(
+        0.0,
+        "--rate",
+        "-r",
+        help="Dither frames per second, 0 for the light's maximum update rate.",
+        show_default=True,
+    ),
+    period: int = typer.Option(
+        16,
+        "--period",
+        "-p",
+        help="Frames per dither cycle, a power of two.",
+        show_default=True,
+    ),
+    bench: bool = typer.Option(
+        False,
+        "--bench",
+        is_flag=True,
+        help="Report the write rate the fade sustained.",
+    ),
+):
+    """Smoothly Fade In.
+
+    Fades the light from black to the specified color, dithering
+    between adjacent color levels so the fade doesn't step visibly at
+    low intensity.
+
+    ## Examples
+
+    \b
+    ```console
+    $ blync -R fade            # fade in red over ten seconds
+    $ blync -G fade -s 60      # fade in green over a minute
+    $ blync fade --bench       # report the writes per second needed
+    ```
+    """
+
+    from .effects import Ditherer
+
+    light = ctx.obj
+
+    color = light.color if light.color != (0, 0, 0) else DEFAULT_COLOR
+
+    try:
+        ditherer = Ditherer([light], rate=rate or None, period=period, clock=CLOCK)
+    except ValueError as error:
+        typer.secho(str(error), fg="red")
+        raise typer.Exit(code=1)
+
+    def effect(t: float) -> Tuple[float, float, float]:
+        scale = min(t / seconds, 1.0) if seconds > 0 else 1.0
+        return tuple(value * scale for value in color)
+
+    try:
+        ditherer.run(effect, seconds)
+    except KeyboardInterrupt:
+        light.off = True
+        light.reset()
+
+    summary = (
+        f"{ditherer.frames} frames, {ditherer.dropped} dropped, "
+        f"{ditherer.writes} writes, {ditherer.write_rate:.1f} writes/s"
+    )
+    if bench:
+        typer.echo(summary)
+    else:
+        logger.info(summary)
+
+
+@lru_cache()
+def _batch_command() -> click.Command:
+    """A click command accepting only the root command's STATE_OPTIONS."""
+    root = typer.main.get_command(cli)
+    params = [param for param in root.params if param.name in STATE_OPTIONS]
+    return typer.core.TyperCommand("blync", params=params)
+
+
+def parse_batch_line(line: str) -> Tuple[int, Dict[str, Any]]:
+    """Parses a line of root command options, e.g. "-l 1 -R --dim",
+    and returns a tuple of (light_id, state) where state is a dictionary
+    suitable for BlyncLight.apply().
+
+    Raises
+    - click.ClickException for options that don't parse
+    """
+    args = shlex.split(line, comments=True)
+    with _batch_command().make_context("blync", args) as bctx:
+        options = dict(bctx.params)
+
+    light_id = options.pop("light_id")
+    state = light_state(**options)
+    if not state["off"] and not any(state[c] for c in ["red", "blue", "green"]):
+        state["red"], state["blue"], state["green"] = DEFAULT_COLOR
+    return light_id, state
+
+
+@cli.command("batch")
+def batch_subcommand(
+    ctx: typer.Context,
+    filename: Path = typer.Option(
+        None, "--input", "-i", help="Read commands from this file."
+    ),
+):
+    """Apply a script of commands to many lights.
+
+    Each line of the script holds the same options accepted by `blync`
+    itself, without the `blync`. Blank lines and comments starting with
+    `#` are ignored. Every light is opened once and each line results in
+    a single write to its light. The time taken by each line is reported.
+
+    ## Examples
+
+    \b
+    ```console
+    $ printf -- '-l 0 -R\\n-l 1 -G --dim\\n' | blync batch
+    $ blync batch -i provision.blync
+    ```
+    """
+
+    lights = {}
+    errors = 0
+    start = perf_counter()
+
+    with filename.open() if filename else nullcontext(sys.stdin) as script:
+        for lineno, line in enumerate(script, 1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+
+            began = perf_counter()
+            try:
+                light_id, state = parse_batch_line(line)
+                light = lights.get(light_id)
+                if light is None:
+                    light = lights[light_id] = BlyncLight.get_light(
+                        light_id, immediate=False
+                    )
+                light.apply(**state)
+            except Exception as error:
+                errors += 1
+                typer.secho(f"{lineno:4d}: {line.strip()}: {error}", fg="red")
+                continue
+
+            elapsed = (perf_counter() - began) * 1000
+            typer.secho(f"{lineno:4d}: {elapsed:8.3f}ms {line.strip()}")
+
+    elapsed = (perf_counter() - start) * 1000
+    typer.secho(
+        f"{len(lights)} lights, {errors} errors, {elapsed:.3f}ms",
+        fg="red" if errors else "green",
+    )
+
+    if errors:
+        raise typer.Exit(1)
+
+
+def color_state(name: str) -> Dict[str, Any]:
+    """Returns light attributes for a named color from constants.COLORS,
+    where "off" turns the light off.
+
+    Typer option callback.
+    """
+    try:
+        color = COLORS[name.lower()]
+    except KeyError:
+        raise typer.BadParameter(f"Choose from {', '.join(COLORS)}") from None
+    return {"color": color, "on": 0 if name.lower() == "off" else 1}
+
+
+@cli.command("calendar")
+def calendar_subcommand(
+    ctx: typer.Context,
+    files: List[Path] = typer.Argument(..., help="iCalendar files to follow."),
+    busy: str = typer.Option(
+        "red", "--busy", help="Color while an event is in progress.", show_default=True
+    ),
+    free: str = typer.Option(
+        "green", "--free", help="Color between events.", show_default=True
+    ),
+    horizon: int = typer.Option(
+        30, "--horizon", help="Days of recurring events to expand.", show_default=True
+    ),
+    reload: float = typer.Option(
+        60,
+        "--reload",
+        help="Maximum seconds between checks for changed files.",
+        show_default=True,
+    ),
+):
+    """Show calendar presence.
+
+    Loads events from local iCalendar files and sets the light to the
+    busy color while any event is in progress and to the free color
+    otherwise. The light is only written when the state changes and the
+    command sleeps until the next event starts or ends, waking at least
+    every --reload seconds to re-read files that changed.
 
+    ## Examples
+
+    \b
+    ```console
+    $ blync calendar work.ics
+    $ blync calendar --busy magenta --free off work.ics oncall.ics
+    ```
+
+    This mode runs until the user interrupts.
+    """
+
+    from .ical import CalendarSchedule
+
+    light = ctx.obj
+    busy_state, free_state = color_state(busy), color_state(free)
+
+    schedule = CalendarSchedule(files, horizon=horizon * 86400)
+
+    try:
+        schedule.run(light, busy_state, free_state, reload_interval=reload)
     except KeyboardInterrupt:
         light.off = True
         light.reset()
 
 
+@cli.command("scene")
+def scene_subcommand(
+    ctx: typer.Context,
+    name: str = typer.Argument(None, help="Scene to apply."),
+    filename: Path = typer.Option(
+        None, "--scenes", "-s", help="Scene file [default: XDG config scenes.ini]"
+    ),
+    list_scenes: bool = typer.Option(
+        False, "--list", "-L", is_flag=True, help="List scenes and exit."
+    ),
+):
+    """Apply a named scene.
+
+    Scenes are light states defined in an INI file, one section per
+    scene, and are compiled once into the command word written to the
+    light. Other color options on the command-line are ignored.
+
+    \b
+    ```
+    [busy]
+    color = red
+
+    [alert-flash-fast]
+    color = red
+    flash = 3
+    ```
+
+    ## Examples
+
+    \b
+    ```console
+    $ blync scene busy
+    $ blync -l 1 scene alert-flash-fast
+    $ blync scene --list
+    ```
+    """
+
+    try:
+        scenes = SceneRegistry.load(filename or default_scenes_path())
+    except (OSError, ValueError) as error:
+        typer.secho(str(error), fg="red")
+        raise typer.Exit(-1) from None
+
+    if list_scenes or not name:
+        for scene in scenes:
+            typer.secho(f"{scene:<24s}:{scenes[scene].hex()}")
+        raise typer.Exit()
+
+    try:
+        ctx.obj.write_frame(scenes[name])
+    except Exception as error:
+        typer.secho(str(error), fg="red")
+        raise typer.Exit(-1) from None
+
+
+@cli.command("serve")
+def serve_subcommand(
+    ctx: typer.Context,
+    host: str = typer.Option(
+        "127.0.0.1", "--host", "-H", help="Address to listen on.", show_default=True
+    ),
+    port: int = typer.Option(
+        8000, "--port", "-P", help="Port to listen on.", show_default=True
+    ),
+    tick: float = typer.Option(
+        0.05,
+        "--tick",
+        "-t",
+        help="Seconds between coalesced writes to each light.",
+        show_default=True,
+    ),
+):
+    """Control BlyncLights over HTTP.
+
+    Opens every available light and serves a small HTTP API on the
+    local host. Each request assigns BlyncLight attributes using a
+    JSON object. Bursts of updates to the same light are coalesced
+    into a single write per tick.
+
+    ## Examples
+
+    \b
+    ```console
+    $ blync serve -P 8000 &
+    $ curl -X PUT -d '{"color": [255, 0, 0], "on": 1}' localhost:8000/lights/0
+    $ curl localhost:8000/lights/0
+    ```
+
+    This mode runs until the user interrupts.
+    """
+
+    import asyncio
+
+    from .server import LightServer
+
+    resilient = ctx.meta.get("resilient", False)
+
+    lights = {
+        light_id: result.light
+        for light_id, result in enumerate(
+            open_lights(immediate=False, resilient=resilient)
+        )
+        if result.ok
+    }
+
+    if not lights:
+        typer.secho("No lights found.", fg="red")
+        raise typer.Exit(-1)
+
+    server = LightServer(lights, tick=tick)
+
+    try:
+        asyncio.run(server.serve_forever(host, port))
+    except KeyboardInterrupt:
+        for light in lights.values():
+            light.reset()
+
+
+@cli.command("follow")
+def follow_subcommand(
+    ctx: typer.Context,
+    filename: Path = typer.Option(
+        None, "--input", "-i", help="Read events from this file or FIFO."
+    ),
+    window: float = typer.Option(
+        0.1,
+        "--window",
+        "-w",
+        help="Seconds to collect events for a light before writing.",
+        show_default=True,
+    ),
+):
+    """Follow a stream of JSON light events.
+
+    Reads newline-delimited JSON objects from standard input, or a
+    file or FIFO, and applies each to the light it names. Events for
+    the same light that arrive within the debounce window are collapsed
+    into a single write. Lights are opened on first use and stay open
+    until the stream ends.
+
+    ## Examples
+
+    \b
+    ```console
+    $ echo '{"light": 0, "color": "red", "flash": 2}' | blync follow
+    $ tail -f events.jsonl | blync follow -w 0.25
+    $ blync follow -i /tmp/blync.fifo
+    ```
+    """
+
+    resilient = ctx.meta.get("resilient", False)
+
+    follower = Follower(
+        lambda light_id: BlyncLight.get_light(
+            light_id, immediate=False, resilient=resilient
+        ),
+        window=window,
+    )
+
+    source = filename.open("rb") if filename else nullcontext(sys.stdin.buffer)
+
+    try:
+        with source as stream:
+            follower.follow(stream)
+    except KeyboardInterrupt:
+        for light in follower.lights.values():
+            light.reset()
+
+    logger.info(
+        f"{follower.events} events, {follower.writes} writes, {follower.errors} errors"
+    )
+
+
+@cli.command("alias")
+def alias_subcommand(
+    name: str = typer.Argument(None, help="Alias to define or remove."),
+    serial_number: str = typer.Argument(None, help="Serial number of the light."),
+    remove: bool = typer.Option(
+        False, "--remove", "-r", is_flag=True, help="Remove the alias."
+    ),
+):
+    """Name lights by serial number.
+
+    Aliases are stored with the lights seen on the bus in an index, so
+    a light opened with `--light` is found without enumerating and
+    regardless of the order lights were plugged in. Without arguments,
+    the bus is enumerated and the known lights and aliases are listed.
+
+    ## Examples
+
+    \b
+    ```console
+    $ blync alias
+    $ blync alias desk A1B2C3
+    $ blync --light desk -R
+    $ blync alias desk --remove
+    ```
+    """
+
+    index = LightIndex()
+
+    if name and remove:
+        if not index.unalias(name):
+            typer.secho(f"Unknown alias: {name}", fg="red")
+            raise typer.Exit(-1)
+        raise typer.Exit()
+
+    if name:
+        if not serial_number:
+            typer.secho(index.resolve(name))
+            raise typer.Exit()
+        index.alias(name, serial_number)
+        raise typer.Exit()
+
+    index.refresh()
+    names = {serial: alias for alias, serial in index.aliases.items()}
+    for serial, info in index.lights.items():
+        alias = names.get(serial, "")
+        path = info.get("path") or "-"
+        typer.secho(f"{alias:<16s}:{serial:<24s}:", nl=False)
+        typer.secho(path, fg="green" if info.get("path") else "red")
+
+
 @cli.command(name="udev-rules")
 def udev_rules_subcommand(
     ctx: typer.Context,
@@ -0,0 +1,222 @@
+"""Write Throughput and Latency Benchmark
+
+Drives a set of lights with a write pattern for a fixed time and
+reports how many writes per second they sustained and the tail of the
+write latency distribution. Lights can be real devices or simulated
+devices with a configurable write latency, so the harness itself can
+be measured on hosts without lights.
+
+>>> bench = Benchmark([BlyncLight.get_light()], "colors", rate=100)
+>>> report = bench.run(seconds=5)
+
+Patterns:
+
+- constant: every light is written the same color every tick
+- colors: every light is written the next Spectrum color every tick
+- round-robin: one light is written per tick, taking turns
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .blynclight import BlyncLight
+from .clock import SYSTEM_CLOCK, Clock
+from .constants import EMBRAVA_VENDOR_IDS
+from .effects import Spectrum
+from .metrics import LightMetrics
+
+PATTERNS = ("constant", "colors", "round-robin")
+
+BENCH_QUANTILES = (0.5, 0.99, 0.999)
+
+
+class SimulatedDevice:
+    """Stands in for a hid.device, sleeping for `latency` seconds on
+    every write. If `record` is True, every command word written is
+    kept in `frames` with the clock's time when the write completed.
+    """
+
+    def __init__(
+        self, latency: float = 0.0005, clock: Clock = SYSTEM_CLOCK, record: bool = False
+    ):
+        """
+        :param latency: float seconds per write
+        :param clock: Clock
+        :param record: bool
+        """
+        self.latency = latency
+        self.clock = clock
+        self.record = record
+        self.frames: List[Tuple[float, bytes]] = []
+        self.writes = 0
+
+    def open(self, vendor_id: int, product_id: int, serial_number: str = None) -> None:
+        pass
+
+    def open_path(self, path: bytes) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def write(self, data: bytes) -> int:
+        if self.latency:
+            self.clock.sleep(self.latency)
+        self.writes += 1
+        if self.record:
+            self.frames.append((self.clock.now(), bytes(data)))
+        return len(data)
+
+
+def simulated_lights(
+    count: int,
+    latency: float = 0.0005,
+    clock: Clock = SYSTEM_CLOCK,
+    record: bool = False,
+) -> List[BlyncLight]:
+    """Returns `count` lights backed by SimulatedDevices that pace their
+    writes with `clock`. The lights are not registered with get_light().
+
+    :param count: int
+    :param latency: float seconds per write
+    :param clock: Clock
+    :param record: bool, see SimulatedDevice
+    """
+    lights = []
+    for index in range(count):
+        light = BlyncLight(EMBRAVA_VENDOR_IDS[0], 0xF000 + index)
+        light.device = SimulatedDevice(latency, clock, record)
+        light.clock = clock
+        lights.append(light)
+    return lights
+
+
+class Benchmark:
+    """Writes a pattern to lights and measures the writes.
+
+    Ticks are scheduled against absolute deadlines when a rate is
+    given; ticks that can't start on time are dropped and counted.
+    Without a rate, ticks run back to back and nothing is dropped.
+
+    Lights pace their writes to their profile's max_update_rate; pacing
+    is turned off while the benchmark runs so the report measures the
+    device rather than the pacing.
+    """
+
+    def __init__(
+        self,
+        lights: Sequence[BlyncLight],
+        pattern: str = "colors",
+        rate: float = None,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        """
+        :param lights: sequence of BlyncLights
+        :param pattern: str one of PATTERNS
+        :param rate: optional float ticks per second
+        :param clock: Clock
+
+        Raises
+        - ValueError for unknown patterns or no lights
+        """
+        if pattern not in PATTERNS:
+            raise ValueError(f"Unknown pattern: {pattern}")
+        if not lights:
+            raise ValueError("Expected at least one light.")
+        self.lights = list(lights)
+        self.pattern = pattern
+        self.rate = rate
+        self.clock = clock
+        self.colors = list(Spectrum(steps=64))
+        self.ticks = 0
+        self.dropped = 0
+        self.elapsed = 0.0
+        self.metrics = [LightMetrics(window=None) for _ in self.lights]
+
+    def step(self, tick: int) -> None:
+        """Writes the pattern for `tick`.
+
+        :param tick: int
+        """
+        if self.pattern == "round-robin":
+            light = self.lights[tick % len(self.lights)]
+            light.color = self.colors[tick % len(self.colors)]
+            light.update(force=True)
+        else:
+            color = self.colors[tick % len(self.colors)]
+            for light in self.lights:
+                if self.pattern == "colors":
+                    light.color = color
+                light.update(force=True)
+        self.ticks += 1
+
+    def run(self, seconds: float = 5.0) -> Dict[str, Any]:
+        """Runs the pattern for `seconds` and returns report().
+
+        :param seconds: float
+        """
+        paced = [light._min_interval for light in self.lights]
+        for light, metrics in zip(self.lights, self.metrics):
+            light.immediate = False
+            light.color = self.colors[0]
+            light.on = True
+            light._min_interval = 0.0
+            light.add_hook("on_after_write", metrics)
+
+        interval = 1.0 / self.rate if self.rate else 0.0
+        start = self.clock.now()
+        tick = 0
+        try:
+            while self.clock.now() - start < seconds:
+                if interval:
+                    self.clock.sleep_until(start + tick * interval)
+                    late = int((self.clock.now() - start) / interval)
+                    if late > tick:
+                        self.dropped += late - tick
+                        tick = late
+                self.step(tick)
+                tick += 1
+        finally:
+            self.elapsed = self.clock.now() - start
+            for light, metrics, min_interval in zip(self.lights, self.metrics, paced):
+                light.remove_hook("on_after_write", metrics)
+                light._min_interval = min_interval
+
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        """Returns the results of the last run as a JSON serializable
+        dictionary. Latencies are in seconds.
+        """
+        combined = LightMetrics(window=None)
+        for metrics in self.metrics:
+            combined.latencies.extend(metrics.latencies)
+            combined.writes += metrics.writes
+            combined.errors += metrics.errors
+
+        elapsed = self.elapsed
+
+        def summary(metrics: LightMetrics) -> Dict[str, Any]:
+            quantiles = metrics.quantiles(BENCH_QUANTILES)
+            return {
+                "writes": metrics.writes,
+                "errors": metrics.errors,
+                "writes_per_second": metrics.writes / elapsed if elapsed else 0.0,
+                "p50": quantiles.get(0.5),
+                "p99": quantiles.get(0.99),
+                "p999": quantiles.get(0.999),
+                "max": max(metrics.latencies, default=None),
+            }
+
+        report = {
+            "pattern": self.pattern,
+            "rate": self.rate,
+            "seconds": elapsed,
+            "ticks": self.ticks,
+            "dropped": self.dropped,
+        }
+        report.update(summary(combined))
+        report["lights"] = {
+            light.key: summary(metrics)
+            for light, metrics in zip(self.lights, self.metrics)
+        }
+        return report
@@ -1,16 +1,29 @@
-from collections import Sequence
+from collections.abc import Sequence
 from contextlib import contextmanager
 from enum import Enum
-from typing import Dict, List, Tuple, Union
-from functools import partial, partialmethod, wraps
+from typing import Any, Dict, List, Optional, Tuple, Union
+from functools import lru_cache, partial, partialmethod, wraps
+from time import perf_counter
 
 import hid
+import os
+import threading
 
 from bitvector import BitVector, BitField
 from loguru import logger
 
-from .constants import EMBRAVA_VENDOR_IDS, FlashSpeed, END_OF_COMMAND, COMMAND_LENGTH
+from .clock import SYSTEM_CLOCK, Clock
+from .constants import (
+    COLORS,
+    EMBRAVA_VENDOR_IDS,
+    FlashSpeed,
+    END_OF_COMMAND,
+    COMMAND_LENGTH,
+)
 from .exceptions import BlyncLightInUse, BlyncLightNotFound, BlyncLightUnknownDevice
+from .profiles import DeviceProfile, profile_for
+from .reconnect import Reconnector
+from .state import StateCache
 
 
 class BlyncCommand(BitField):
@@ -21,6 +34,9 @@ class BlyncCommand(BitField):
 
     def __set__(self, obj, value) -> None:
         super().__set__(obj, value)
+        if obj.on_field_set:
+            for hook in obj.on_field_set:
+                hook(self.name, value)
         try:
             obj.update()
         except AttributeError:
@@ -98,7 +114,9 @@ class BlyncLight(BitVector):
     Not all devices have musical capability.
 
     The recommended way to obtain a BlyncLight object is to use the
-    class method get_light().
+    class method get_light(). Lights returned by get_light() are shared
+    process-wide, asking for the same light twice returns the same
+    object rather than raising BlyncLightInUse.
 
     >>> light = BlyncLight.get_light()
 
@@ -114,8 +132,39 @@ class BlyncLight(BitVector):
 
     The BlyncLight object is an in-memory representation of the
     state of the hardware device. I have not been able to discern how
-    to read the device's current state, so every time a new object is
-    instantiated it writes a known state to the device by default.
+    to read the device's current state, so every new object starts
+    with a known state in memory. The device is not opened until the
+    first write, which sends the complete command word.
+
+    The device handle is released with close() or by using the light
+    as a context manager. A closed light keeps its in-memory state and
+    reopens the device on the next write:
+
+    >>> with BlyncLight.get_light() as light:
+    ...     light.on = True
+
+    Lights created with a StateCache remember the last command word
+    written to the device and adopt it when next created, so a
+    restarted process resumes the state the light is already showing
+    without writing to it:
+
+    >>> light = BlyncLight.get_light(state_cache=StateCache())
+
+    Each light has a DeviceProfile chosen by its product_id. Fields the
+    model doesn't support are cleared from the command word written to
+    the device, colors are corrected by the profile's calibration and
+    writes are paced to the model's maximum update rate. The in-memory
+    state is not changed by the profile.
+
+    Resilient lights survive being unplugged. A failed write marks the
+    light disconnected instead of raising; later changes are kept in
+    memory and a background Reconnector reopens the light with
+    exponential backoff and writes the latest state:
+
+    >>> light = BlyncLight.get_light(resilient=True)
+
+    Profilers, tracers and metrics exporters can observe a light by
+    registering hooks with add_hook(), see BlyncLight.HOOKS.
 
     Additionally, any updates to the bit fields in the ByncLight class
     will be immediately written to the hardware device by default.
@@ -179,37 +228,154 @@ class BlyncLight(BitVector):
     eoc    : 16    End Of Command field, must be 0xffff
     """
 
+    # Names of the attributes callers may assign to change the state
+    # of the light, see BlyncLight.apply().
+    ATTRIBUTES = (
+        "red",
+        "blue",
+        "green",
+        "color",
+        "off",
+        "on",
+        "dim",
+        "bright",
+        "flash",
+        "speed",
+        "repeat",
+        "play",
+        "music",
+        "mute",
+        "volume",
+    )
+
+    # Hooks called around device writes and field updates, managed with
+    # add_hook() and remove_hook(). They are empty tuples on the class
+    # so a light without hooks pays only a truth test per write.
+    #
+    # on_before_write(frame)
+    # on_after_write(frame, elapsed, result)
+    # on_field_set(name, value)
+    HOOKS = ("on_before_write", "on_after_write", "on_field_set")
+    on_before_write = ()
+    on_after_write = ()
+    on_field_set = ()
+
+    # Seconds taken by the most recent call to available_lights().
+    enumeration_seconds = 0.0
+
+    # Clock pacing writes and timing them for the write hooks.
+    clock: Clock = SYSTEM_CLOCK
+
+    # Resilient lights catch write failures, see BlyncLight.reconnect().
+    resilient = False
+    connected = True
+    _reconnector = None
+
     @classmethod
     def available_lights(cls) -> List[Dict[str, Union[int, str]]]:
         """Returns a list of dictionaries describing all the BlyncLight
         devices found. 
         """
+        start = perf_counter()
         lights = []
         for vendor_id in EMBRAVA_VENDOR_IDS:
             lights.extend(hid.enumerate(vendor_id))
+        BlyncLight.enumeration_seconds = perf_counter() - start
         return lights
 
     @classmethod
-    def get_light(cls, light_id: int = 0, immediate: bool = True):
+    def shared_lights(cls) -> List["BlyncLight"]:
+        """Returns the lights returned by get_light() in this process."""
+        with cls._registry_lock:
+            return list(cls._registry.values())
+
+    # Process-wide registry of lights returned by get_light(), keyed
+    # by BlyncLight.key.
+    _registry: Dict[str, "BlyncLight"] = {}
+    _registry_lock = threading.Lock()
+
+    @classmethod
+    def get_light(
+        cls,
+        light_id: int = 0,
+        immediate: bool = True,
+        state_cache: StateCache = None,
+        resilient: bool = False,
+    ):
         """Returns a configured BlyncLight for the supplied `light_id`
         which is an index into the list of available devices discovered.
 
+        If the light has already been returned by get_light() in this
+        process, the existing object is returned and `immediate`,
+        `state_cache` and `resilient` are ignored.
+
         :param light_id: int
         :param immediate: bool
+        :param state_cache: optional StateCache
+        :param resilient: bool
 
         Raises
         - BlyncLightNotFound
-        - BlyncLightInUse
         - BlyncLightUnknown
         """
         try:
-            light = cls.available_lights()[light_id]
+            info = cls.available_lights()[light_id]
         except IndexError:
             raise BlyncLightNotFound(f"Light not found: {light_id}")
 
-        return cls(light["vendor_id"], light["product_id"], immediate)
+        return cls.get_light_for(info, immediate, state_cache, resilient)
 
-    def __init__(self, vendor_id: int, product_id: int, immediate: bool = False):
+    @classmethod
+    def get_light_for(
+        cls,
+        info: Dict[str, Any],
+        immediate: bool = True,
+        state_cache: StateCache = None,
+        resilient: bool = False,
+    ):
+        """Returns the shared BlyncLight described by `info`, a dictionary
+        like those returned by available_lights(), without enumerating.
+        The device is opened by its HID path when info has one. See
+        get_light() for the remaining arguments.
+
+        :param info: Dict[str, Any] with vendor_id, product_id and
+                     optionally path and serial_number keys
+        :param immediate: bool
+        :param state_cache: optional StateCache
+        :param resilient: bool
+
+        Raises
+        - BlyncLightUnknown
+        """
+        vendor_id, product_id = info["vendor_id"], info["product_id"]
+        serial_number = info.get("serial_number") or None
+        key = cls._key(vendor_id, product_id, serial_number, info.get("path"))
+
+        with cls._registry_lock:
+            light = cls._registry.get(key)
+            if light is None:
+                light = cls(
+                    vendor_id,
+                    product_id,
+                    immediate,
+                    state_cache,
+                    resilient,
+                    path=info.get("path"),
+                    serial_number=serial_number,
+                )
+                cls._registry[key] = light
+        return light
+
+    def __init__(
+        self,
+        vendor_id: int,
+        product_id: int,
+        immediate: bool = False,
+        state_cache: StateCache = None,
+        resilient: bool = False,
+        path: bytes = None,
+        serial_number: str = None,
+    ):
         """Returns a configured BlyncLight.
 
         The `immediate` argument initializes the light's immediate property. 
@@ -217,12 +383,27 @@ class BlyncLight(BitVector):
         until the user calls BlyncLight.update().  If immediate is True, any
         changes are written to the light immediately.
 
+        The device is opened by the first write, see BlyncLight.open().
+
+        If a `state_cache` is supplied, the last command word it saved for
+        this light is adopted as the in-memory state and every write is
+        saved to it.
+
+        If `resilient` is True, write failures disconnect the light rather
+        than raising, see BlyncLight.reconnect().
+
+        A light with a HID `path` is opened by path, otherwise by its ids
+        and `serial_number`, which distinguishes lights of the same model.
+
         :param vendor_id: int
         :param product_id: int
+        :param immediate: bool
+        :param state_cache: optional StateCache
+        :param resilient: bool
+        :param path: optional bytes HID path
+        :param serial_number: optional str
 
         Raises
-        - BlyncLightNotFound
-        - BlyncLightInUse
         - BlyncLightUnknown
         """
 
@@ -230,17 +411,24 @@ class BlyncLight(BitVector):
 
         self.vendor_id = vendor_id
         self.product_id = product_id
+        self.path = path
+        self.serial_number = serial_number
         if vendor_id not in EMBRAVA_VENDOR_IDS:
             raise BlyncLightUnknownDevice(self.identifier)
         self.device = hid.device()
-        try:
-            self.device.open(vendor_id, product_id)
-        except OSError:
-            raise BlyncLightInUse(self.identifier)
-        except ValueError:
-            raise BlyncLightNotFound(self.identifier)
-        self.reset()
-        self.immediate = immediate
+        self.is_open = False
+        self.state_cache = state_cache
+        self.resilient = resilient
+        self.profile = profile_for(product_id)
+        self._filter = _profile_filter(self.profile)
+        self._min_interval = self.profile.min_interval
+        self._last_write = float("-inf")
+        self.reset(flush=False)
+        if state_cache:
+            frame = state_cache.load(self.key)
+            if frame:
+                self.value = int.from_bytes(frame, "big")
+        self._immediate = bool(immediate)
 
     red = BlyncColor(56, 8)
     blue = BlyncColor(48, 8)
@@ -265,20 +453,205 @@ class BlyncLight(BitVector):
         return "\n".join(lines)
 
     def __del__(self):
+        if self._reconnector:
+            self._reconnector.stop(0)
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
-        self.device.close()
+    def open(self) -> None:
+        """Opens the target device if it is not already open. Called
+        by update() before the first write and after close(). Lights with
+        a HID path are opened by path, falling back to their ids and
+        serial number when the path has gone away, for example after the
+        light was plugged into another port. A light without a serial
+        number only falls back to its ids when it is the only light of
+        its model, since any other could be opened in its place.
+
+        Raises
+        - BlyncLightNotFound
+        - BlyncLightInUse
+        """
+        if self.is_open:
+            return
+        if self.path:
+            try:
+                self.device.open_path(self.path)
+                self.is_open = True
+                return
+            except (OSError, ValueError):
+                logger.debug(f"{self.key} not at {self.path!r}, opening by id")
+            if not self.serial_number:
+                if len(hid.enumerate(self.vendor_id, self.product_id)) != 1:
+                    raise BlyncLightNotFound(self.key)
+        try:
+            if self.serial_number:
+                self.device.open(self.vendor_id, self.product_id, self.serial_number)
+            else:
+                self.device.open(self.vendor_id, self.product_id)
+        except OSError:
+            raise BlyncLightInUse(self.identifier) from None
+        except ValueError:
+            raise BlyncLightNotFound(self.identifier) from None
+        self.is_open = True
+
+    def close(self) -> None:
+        """Closes the target device. The in-memory state is kept and the
+        device is reopened by the next write.
+        """
+        if getattr(self, "is_open", False):
+            self.device.close()
+            self.is_open = False
 
     def update(self, force: bool = False) -> None:
         """Write the current in-memory representation of the light's state
         to the target light. If immediate or force is True, the write is attempted.
         If not force and not self.immediate, the write is deferred.
 
+        Resilient lights don't raise. A failed write, one that raises or
+        writes fewer than COMMAND_LENGTH bytes, disconnects the light and
+        writes to a disconnected light are deferred until it is
+        reconnected.
+
         :param force: bool
+
+        Raises
+        - BlyncLightNotFound
+        - BlyncLightInUse
         """
-        if self.immediate or force:
-            self.device.write(self.bytes)
+        if not (self.immediate or force):
+            return
+
+        if not self.resilient:
+            self._write()
+            return
+
+        if not self.connected:
+            return
+
+        try:
+            result = self._write()
+        except (OSError, ValueError, BlyncLightNotFound, BlyncLightInUse) as error:
+            self._disconnect(error)
             return
 
+        if isinstance(result, int) and result != COMMAND_LENGTH:
+            self._disconnect(OSError(f"write returned {result}"))
+
+    def _write(self):
+        """Writes the command word to the device, opening it if needed,
+        and returns the result of the device write.
+        """
+        if not self.is_open:
+            self.open()
+        data = self._device_frame() if self._filter else self.bytes
+        if self._min_interval:
+            self.clock.sleep_until(self._last_write + self._min_interval)
+        if self.on_before_write or self.on_after_write:
+            result = self._hooked_write(data)
+        else:
+            result = self.device.write(data)
+        if self._min_interval:
+            self._last_write = self.clock.now()
+        if self.state_cache:
+            self.state_cache.save(self.key, self.bytes)
+        return result
+
+    def _disconnect(self, error: Exception) -> None:
+        """Marks the light disconnected and starts reconnecting."""
+        logger.warning(f"Light {self.identifier} disconnected: {error}")
+        self.connected = False
+        try:
+            self.close()
+        except Exception:
+            self.is_open = False
+        if self._reconnector is None:
+            self._reconnector = Reconnector(self)
+        self._reconnector.start()
+
+    def reconnect(self) -> None:
+        """Reopens the device with a new handle and writes the current
+        in-memory state. Called by the light's Reconnector; if the write
+        fails the light stays disconnected.
+
+        Raises
+        - BlyncLightNotFound
+        - BlyncLightInUse
+        """
+        self.device = hid.device()
+        self.is_open = False
+        self.open()
+        self.connected = True
+        self.update(force=True)
+
+    def _device_frame(self) -> bytes:
+        """Returns the command word with fields the light's profile
+        doesn't support cleared and colors calibrated.
+        """
+        mask, tables = self._filter
+        data = bytearray((self.value & mask).to_bytes(COMMAND_LENGTH, "big"))
+        for index, table in zip((1, 2, 3), tables):
+            data[index] = table[data[index]]
+        return bytes(data)
+
+    def _hooked_write(self, data: bytes):
+        """Writes `data` to the device, calling the write hooks, and
+        returns the result of the write. If the write raises, the after
+        write hooks receive the exception as the result before it is
+        re-raised.
+        """
+        for hook in self.on_before_write:
+            hook(data)
+        start = self.clock.now()
+        try:
+            result = self.device.write(data)
+        except Exception as error:
+            result = error
+            raise
+        finally:
+            elapsed = self.clock.now() - start
+            for hook in self.on_after_write:
+                hook(data, elapsed, result)
+        return result
+
+    def add_hook(self, name: str, callback) -> None:
+        """Registers `callback` with the hook `name`, one of:
+
+        - on_before_write(frame) before each device write
+        - on_after_write(frame, elapsed, result) after each device write,
+          where result is the value returned by the device or the
+          exception it raised
+        - on_field_set(name, value) after each command field is assigned
+
+        :param name: str
+        :param callback: callable
+
+        Raises
+        - ValueError if name is not in BlyncLight.HOOKS
+        """
+        if name not in self.HOOKS:
+            raise ValueError(f"Unknown hook: {name}")
+        setattr(self, name, getattr(self, name) + (callback,))
+
+    def remove_hook(self, name: str, callback) -> None:
+        """Unregisters `callback` from the hook `name`.
+
+        :param name: str
+        :param callback: callable
+
+        Raises
+        - ValueError if name is unknown or callback is not registered
+        """
+        if name not in self.HOOKS:
+            raise ValueError(f"Unknown hook: {name}")
+        hooks = list(getattr(self, name))
+        hooks.remove(callback)
+        setattr(self, name, tuple(hooks))
+
     def reset(self, flush: bool = True) -> None:
         """Resets the in-memory representation of the light's state to a known
         state (off=1, speed=1, mute=1, all other bits zero) and writes the state
@@ -304,21 +677,210 @@ class BlyncLight(BitVector):
 
         self.update(force=flush)
 
+    def apply(self, **fields: Any) -> None:
+        """Assigns each keyword argument to the light attribute of the
+        same name with device updates paused and then writes the
+        resulting command word to the target light exactly once.
+
+        >>> light.apply(color=(255, 0, 0), on=True, flash=1)
+
+        Raises
+        - AttributeError if a keyword is not in BlyncLight.ATTRIBUTES
+        """
+        for name in fields:
+            if name not in self.ATTRIBUTES:
+                raise AttributeError(f"Unknown light attribute: {name}")
+
+        with self.updates_paused():
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+        if not self.immediate:
+            self.update(force=True)
+
+    @classmethod
+    def command_word(cls, **fields: Any) -> bytes:
+        """Returns the command word produced by assigning `fields` to a
+        light in the reset state, without a device. The result can be
+        written to any light with write_frame().
+
+        >>> busy = BlyncLight.command_word(color=(255, 0, 0), on=True)
+
+        Raises
+        - AttributeError if a keyword is not in BlyncLight.ATTRIBUTES
+        """
+        word = cls.__new__(cls)
+        BitVector.__init__(word, size=COMMAND_LENGTH * 8)
+        word.is_open = False
+        word.state_cache = None
+        word._filter = None
+        word._min_interval = 0.0
+        word.reset(flush=False)
+        for name, value in fields.items():
+            if name not in cls.ATTRIBUTES:
+                raise AttributeError(f"Unknown light attribute: {name}")
+            setattr(word, name, value)
+        return word.bytes
+
+    @classmethod
+    def field_limits(cls, name: str) -> Tuple[int, int]:
+        """Returns the inclusive range of values accepted for the light
+        attribute `name`, derived from the width of its bit field.
+
+        :param name: str one of BlyncLight.ATTRIBUTES
+        """
+        if name == "speed":
+            return 1, 3
+        if name == "color":
+            return 0, 0xFFFFFF
+        name = {"on": "off", "bright": "dim"}.get(name, name)
+        field = cls.__dict__[name].field
+        return 0, (1 << (field.stop - field.start)) - 1
+
+    @classmethod
+    def validate(cls, fields: Any) -> Dict[str, Any]:
+        """Returns a copy of `fields` with values converted to the types
+        BlyncLight attributes expect, for fields decoded from untrusted
+        input like JSON. Assigning an out of range value to a light would
+        silently truncate it to the width of its bit field.
+
+        :param fields: Dict[str, Any]
+
+        Raises
+        - ValueError if fields is not a dictionary of known attributes
+          with integer or boolean values that fit their fields.
+        """
+        if not isinstance(fields, dict):
+            raise ValueError("Expected a JSON object of light attributes.")
+
+        valid = {}
+        for name, value in fields.items():
+            if name not in cls.ATTRIBUTES:
+                raise ValueError(f"Unknown light attribute: {name}")
+            if name == "color" and isinstance(value, (list, tuple)):
+                if len(value) != 3 or not all(
+                    isinstance(v, int) and 0 <= v <= 0xFF for v in value
+                ):
+                    raise ValueError("Expected color as [red, blue, green] bytes.")
+                value = tuple(value)
+            elif not isinstance(value, (int, bool)):
+                raise ValueError(f"Expected an integer value for {name}")
+            else:
+                low, high = cls.field_limits(name)
+                if not low <= value <= high:
+                    raise ValueError(
+                        f"Expected {name} between {low} and {high}, got {value}"
+                    )
+            valid[name] = value
+        return valid
+
+    @classmethod
+    def state_fields(cls, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the BlyncLight attributes described by `state`, a
+        dictionary decoded from JSON or a scene file. The "color" key
+        accepts a name from constants.COLORS, a [red, blue, green] list or
+        a 24-bit integer, and "flash" accepts a flash speed, zero stops
+        flashing. Values are checked with validate().
+
+        :param state: Dict[str, Any]
+
+        Raises
+        - ValueError if state doesn't describe a light state
+        """
+        fields = {}
+        for name, value in state.items():
+            if name == "color" and isinstance(value, str):
+                try:
+                    value = COLORS[value.lower()]
+                except KeyError:
+                    raise ValueError(f"Unknown color: {value}") from None
+            elif name == "flash":
+                fields["flash"] = 1 if value else 0
+                if value:
+                    fields["speed"] = value
+                continue
+            fields[name] = value
+        return cls.validate(fields)
+
+    @classmethod
+    def state_word(cls, **state: Any) -> bytes:
+        """Returns the command word for `state`, described as for
+        state_fields(), with the light switched on unless on or off is
+        given.
+
+        >>> busy = BlyncLight.state_word(color="red", flash=2)
+
+        Raises
+        - ValueError if state doesn't describe a light state
+        """
+        if "on" not in state and "off" not in state:
+            state["on"] = 1
+        try:
+            return cls.command_word(**cls.state_fields(state))
+        except (AttributeError, TypeError) as error:
+            raise ValueError(str(error)) from None
+
+    def write_frame(self, frame: bytes) -> None:
+        """Replaces the in-memory state with the command word `frame` and
+        writes it to the target light.
+
+        :param frame: bytes
+
+        Raises
+        - ValueError if frame is not a command word
+        """
+        if len(frame) != COMMAND_LENGTH:
+            raise ValueError(f"Expected {COMMAND_LENGTH} bytes, got {len(frame)}")
+        self.value = int.from_bytes(frame, "big")
+        self.update(force=True)
+
+    def apply_scene(self, name: str, scenes=None) -> None:
+        """Writes the precompiled scene `name` to the target light.
+
+        :param name: str
+        :param scenes: optional SceneRegistry, defaults to SceneRegistry.default()
+
+        Raises
+        - KeyError if the scene is unknown
+        """
+        if scenes is None:
+            from .scenes import SceneRegistry
+
+            scenes = SceneRegistry.default()
+        self.write_frame(scenes[name])
+
     @property
     def identifier(self):
         """Hexadecimal concatenation of vendor_id and product_id."""
-        return f"0x{self.vendor_id:04x}:0x{self.product_id:04x}"
+        return self._identifier(self.vendor_id, self.product_id)
+
+    @staticmethod
+    def _identifier(vendor_id: int, product_id: int) -> str:
+        return f"0x{vendor_id:04x}:0x{product_id:04x}"
 
     @property
-    def status(self) -> Dict[str, str]:
-        """A dictionary representation of the bit vector.
+    def key(self) -> str:
+        """Unique name of the light: its serial number, or its HID path
+        for lights without one, or its identifier.
         """
-        try:
-            return self._status
-        except AttributeError:
-            pass
+        return self._key(self.vendor_id, self.product_id, self.serial_number, self.path)
+
+    @classmethod
+    def _key(
+        cls, vendor_id: int, product_id: int, serial_number: str, path: bytes
+    ) -> str:
+        if serial_number:
+            return serial_number
+        if path:
+            return os.fsdecode(path)
+        return cls._identifier(vendor_id, product_id)
 
-        self._status = {
+    @property
+    def status(self) -> Dict[str, str]:
+        """A dictionary representation of the bit vector, built from
+        the current field values.
+        """
+        return {
             "red": f"0x{self.red:02x}",
             "blue": f"0x{self.blue:02x}",
             "green": f"0x{self.green:02x}",
@@ -333,8 +895,6 @@ class BlyncLight(BitVector):
             "volume": f"0x{self.volume:1x}",
         }
 
-        return self._status
-
     @property
     def immediate(self) -> bool:
         """Property which controls the frequency that state is written
@@ -414,3 +974,37 @@ class BlyncLight(BitVector):
             yield
         finally:
             self.immediate = imm
+
+
+# Fields cleared from the command word for models lacking a capability.
+UNSUPPORTED_FIELDS = {
+    "music": ("music", "play", "repeat", "volume"),
+    "dim": ("dim",),
+}
+
+
+@lru_cache(maxsize=None)
+def _profile_filter(profile: DeviceProfile) -> Optional[Tuple[int, Tuple]]:
+    """Returns a tuple of the mask of command word bits supported by
+    `profile` and red, blue and green color lookup tables, or None if
+    frames are written unchanged. Computed once per profile.
+    """
+    mask = (1 << (COMMAND_LENGTH * 8)) - 1
+    for capability, names in UNSUPPORTED_FIELDS.items():
+        if getattr(profile, capability):
+            continue
+        for name in names:
+            field = BlyncLight.__dict__[name].field
+            width = field.stop - field.start
+            mask &= ~(((1 << width) - 1) << field.start)
+
+    tables = ()
+    if profile.calibrated:
+        tables = tuple(
+            bytes(min(255, round(v * scale)) for v in range(256))
+            for scale in profile.calibration
+        )
+
+    if mask == (1 << (COMMAND_LENGTH * 8)) - 1 and not tables:
+        return None
+    return mask, tables
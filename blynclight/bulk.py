@@ -0,0 +1,124 @@
+"""Opening Many Lights at Once
+
+Opening a HID handle and writing a light's first command word each take
+a round trip to the device, so opening lights one after another makes
+startup time grow with the number of lights. open_lights() enumerates
+the bus once and opens and initializes every light concurrently on a
+thread pool. A light that fails to open doesn't stop the others; its
+exception is collected in its OpenResult along with how long the open
+took.
+
+>>> results = open_lights(reset=True)
+>>> lights = [result.light for result in results if result.ok]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from loguru import logger
+
+from .blynclight import BlyncLight
+from .exceptions import BlyncLightException
+from .state import StateCache
+
+# Upper bound on the threads used to open lights.
+MAX_WORKERS = 8
+
+
+class OpenResult(NamedTuple):
+    """The outcome of opening one light.
+
+    info: the enumeration dictionary describing the light
+    light: the opened BlyncLight, or None if it failed
+    error: the exception raised opening the light, or None
+    seconds: time spent opening and initializing the light
+    """
+
+    info: Dict[str, Any]
+    light: Optional[BlyncLight]
+    error: Optional[Exception]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        """True if the light was opened."""
+        return self.error is None
+
+    @property
+    def key(self) -> str:
+        """BlyncLight.key of the light described by info."""
+        info = self.info
+        return BlyncLight._key(
+            info["vendor_id"],
+            info["product_id"],
+            info.get("serial_number"),
+            info.get("path"),
+        )
+
+
+def _open_light(
+    info: Dict[str, Any],
+    immediate: bool,
+    state_cache: StateCache,
+    resilient: bool,
+    reset: bool,
+) -> OpenResult:
+    start = perf_counter()
+    light = None
+    try:
+        light = BlyncLight.get_light_for(info, False, state_cache, resilient)
+        light.open()
+        if reset:
+            light.reset(flush=True)
+        # Bypass the setter, which writes the light's current state.
+        light._immediate = bool(immediate)
+    except (BlyncLightException, OSError, ValueError) as error:
+        return OpenResult(info, None, error, perf_counter() - start)
+    return OpenResult(info, light, None, perf_counter() - start)
+
+
+def open_lights(
+    infos: Sequence[Dict[str, Any]] = None,
+    immediate: bool = True,
+    state_cache: StateCache = None,
+    resilient: bool = False,
+    reset: bool = False,
+    max_workers: int = MAX_WORKERS,
+) -> List[OpenResult]:
+    """Opens the lights described by `infos` concurrently and returns an
+    OpenResult for each, in the same order. If infos is None, the bus is
+    enumerated once with available_lights(). Lights are the shared
+    instances returned by get_light() and are written with their reset
+    state if `reset` is True. The remaining arguments are as for
+    get_light().
+
+    :param infos: optional sequence of dictionaries like those returned
+                  by available_lights()
+    :param immediate: bool
+    :param state_cache: optional StateCache
+    :param resilient: bool
+    :param reset: bool
+    :param max_workers: int upper bound on threads used
+    """
+    if infos is None:
+        infos = BlyncLight.available_lights()
+
+    if not infos:
+        return []
+
+    workers = max(1, min(max_workers, len(infos)))
+    with ThreadPoolExecutor(workers, thread_name_prefix="blynclight-open") as pool:
+        futures = [
+            pool.submit(_open_light, info, immediate, state_cache, resilient, reset)
+            for info in infos
+        ]
+        results = [future.result() for future in futures]
+
+    for result in results:
+        if result.ok:
+            logger.debug(f"Opened {result.light.key} in {result.seconds:.4f}s")
+        else:
+            logger.warning(f"Failed to open {result.key}: {result.error!r}")
+
+    return results
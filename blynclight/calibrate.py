@@ -0,0 +1,181 @@
+"""Effect Timing Calibration
+
+Effects that change a light's color many times a second can only go
+as fast as the light accepts writes; asking for more queues writes in
+the HID stack and the effect lags behind its clock. Calibration times a
+burst of writes to a light and derives the shortest interval between
+writes the light sustains, which effects use as a floor for their
+frame interval.
+
+Lights are only measured when asked to, with CalibrationCache.calibrate()
+or `blync calibrate`, since measuring writes to the light. Calibrations
+are cached per light, by BlyncLight.key, in calibration.json in
+$XDG_CACHE_HOME/blynclight; lights without one are paced by their
+device profile.
+"""
+
+import json
+import os
+import statistics
+
+from pathlib import Path
+from typing import Dict, NamedTuple
+
+from loguru import logger
+
+from .blynclight import BlyncLight
+from .exceptions import BlyncLightNotFound
+from .state import default_cache_dir
+
+# Multiple of the measured write latency used as the minimum interval
+# between writes, leaving the HID stack time to drain.
+HEADROOM = 2.0
+
+
+class Calibration(NamedTuple):
+    """Measured write timing for a light.
+
+    latency: median seconds per device write
+    min_interval: shortest seconds between writes the light sustains
+    """
+
+    latency: float
+    min_interval: float
+
+    @property
+    def max_rate(self) -> float:
+        """Highest sustainable writes per second."""
+        return 1.0 / self.min_interval if self.min_interval else float("inf")
+
+    @classmethod
+    def from_profile(cls, light: BlyncLight) -> "Calibration":
+        """Returns a Calibration with the minimum interval of `light`'s
+        profile, for lights that haven't been measured.
+
+        :param light: BlyncLight
+        """
+        return cls(0.0, light.profile.min_interval)
+
+    def interval(self, requested: float) -> float:
+        """Returns `requested` seconds or min_interval if it is longer.
+
+        :param requested: float seconds
+        """
+        return max(requested, self.min_interval)
+
+
+def measure(light: BlyncLight, samples: int = 20) -> Calibration:
+    """Writes the light's current state `samples` times and returns a
+    Calibration from the median write latency. Writes go through the
+    light's write path, so they are paced by its profile and timed with
+    its clock by an on_after_write hook. The minimum interval is never
+    shorter than the light's profile allows.
+
+    :param light: BlyncLight
+    :param samples: int number of timed writes
+
+    Raises
+    - BlyncLightNotFound if the light can't be written
+    - BlyncLightInUse
+    """
+    latencies = []
+
+    def timed(frame: bytes, elapsed: float, result) -> None:
+        if not isinstance(result, Exception) and not (
+            isinstance(result, int) and result < 0
+        ):
+            latencies.append(elapsed)
+
+    try:
+        light.update(force=True)
+        light.add_hook("on_after_write", timed)
+        try:
+            for _ in range(max(1, samples)):
+                light.update(force=True)
+        finally:
+            light.remove_hook("on_after_write", timed)
+    except OSError as error:
+        raise BlyncLightNotFound(f"Failed to calibrate {light.identifier}: {error}")
+
+    if not latencies:
+        raise BlyncLightNotFound(f"Failed to calibrate {light.identifier}")
+
+    latency = statistics.median(latencies)
+    min_interval = max(latency * HEADROOM, light.profile.min_interval)
+    return Calibration(latency, min_interval)
+
+
+class CalibrationCache:
+    """Calibrations keyed by BlyncLight.key, stored in a JSON file.
+
+    >>> cache = CalibrationCache()
+    >>> calibration = cache.calibration_for(light)
+    """
+
+    def __init__(self, path: Path = None):
+        """
+        :param path: optional Path, defaults to calibration.json in
+                     default_cache_dir()
+        """
+        self.path = Path(path) if path else default_cache_dir() / "calibration.json"
+        self._calibrations: Dict[str, Calibration] = None
+
+    def load(self) -> Dict[str, Calibration]:
+        """Returns the cached calibrations, read from the file once."""
+        if self._calibrations is None:
+            self._calibrations = {}
+            try:
+                for key, values in json.loads(self.path.read_text()).items():
+                    self._calibrations[key] = Calibration(*values)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, TypeError) as error:
+                logger.warning(f"Ignoring calibrations in {self.path}: {error}")
+        return self._calibrations
+
+    def get(self, key: str) -> Calibration:
+        """Returns the cached Calibration for the light with `key` or None.
+
+        :param key: str BlyncLight.key
+        """
+        return self.load().get(key)
+
+    def save(self, key: str, calibration: Calibration) -> None:
+        """Stores `calibration` for the light with `key` and rewrites the
+        file.
+
+        :param key: str BlyncLight.key
+        :param calibration: Calibration
+        """
+        calibrations = self.load()
+        calibrations[key] = calibration
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+            tmp.write_text(json.dumps({k: list(v) for k, v in calibrations.items()}))
+            os.replace(tmp, self.path)
+        except OSError as error:
+            logger.warning(f"Failed to cache calibration in {self.path}: {error}")
+
+    def calibrate(self, light: BlyncLight, samples: int = 20) -> Calibration:
+        """Measures `light`, caches and returns the Calibration.
+
+        :param light: BlyncLight
+        :param samples: int number of timed writes
+        """
+        calibration = measure(light, samples)
+        logger.debug(
+            f"{light.key} latency {calibration.latency * 1e6:.0f}us "
+            f"min interval {calibration.min_interval * 1e3:.2f}ms"
+        )
+        self.save(light.key, calibration)
+        return calibration
+
+    def calibration_for(self, light: BlyncLight) -> Calibration:
+        """Returns the cached Calibration for `light`, or one paced by
+        its profile if the light hasn't been calibrated. Doesn't write
+        to the light.
+
+        :param light: BlyncLight
+        """
+        return self.get(light.key) or Calibration.from_profile(light)
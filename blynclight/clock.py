@@ -0,0 +1,106 @@
+"""Clocks for Effects and Schedulers
+
+Everything in blynclight that waits, from effect loops to the pacing of
+device writes, reads the time and sleeps through a Clock. The system
+clock sleeps for real, while a VirtualClock only advances when it is
+slept on, so hours of an effect run in milliseconds with deterministic
+timestamps.
+
+>>> clock = VirtualClock(stop=3600)
+>>> EffectRunner(lights, colors, clock=clock).run()
+
+Sleeping past a VirtualClock's `stop` time raises KeyboardInterrupt, as
+if the user pressed Control-C, ending loops that otherwise run until
+interrupted.
+"""
+
+import time
+
+from typing import Callable
+
+
+class Clock:
+    """Reads the time from a function and sleeps for real."""
+
+    def __init__(self, now: Callable[[], float] = time.perf_counter):
+        """
+        :param now: callable returning the current time in seconds
+        """
+        self._now = now
+
+    def __call__(self) -> float:
+        return self.now()
+
+    def now(self) -> float:
+        """Returns the current time in seconds."""
+        return self._now()
+
+    def sleep(self, seconds: float) -> None:
+        """Sleeps for `seconds`, returning at once if it isn't positive.
+
+        :param seconds: float
+        """
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def sleep_until(self, deadline: float) -> None:
+        """Sleeps until now() reaches `deadline`.
+
+        :param deadline: float seconds
+        """
+        self.sleep(deadline - self.now())
+
+
+class VirtualClock(Clock):
+    """A clock that only advances when slept on or advanced."""
+
+    def __init__(self, start: float = 0.0, stop: float = None):
+        """
+        :param start: float initial time in seconds
+        :param stop: optional float time after which sleeping raises
+                     KeyboardInterrupt
+        """
+        self.time = start
+        self.stop = stop
+        self.sleeps = 0
+
+    def now(self) -> float:
+        return self.time
+
+    def advance(self, seconds: float) -> None:
+        """Moves the clock forward `seconds` without sleeping.
+
+        :param seconds: float
+        """
+        self.time += max(0.0, seconds)
+
+    def sleep(self, seconds: float) -> None:
+        """Advances the clock by `seconds`.
+
+        :param seconds: float
+
+        Raises
+        - KeyboardInterrupt if the clock passes its stop time
+        """
+        self.sleep_until(self.time + max(0.0, seconds))
+
+    def sleep_until(self, deadline: float) -> None:
+        """Advances the clock to `deadline` if it is in the future.
+
+        :param deadline: float seconds
+
+        Raises
+        - KeyboardInterrupt if the clock passes its stop time
+        """
+        self.sleeps += 1
+        if self.stop is not None and deadline > self.stop:
+            self.time = max(self.time, self.stop)
+            raise KeyboardInterrupt
+        self.time = max(self.time, deadline)
+
+
+# Monotonic clock used unless another is given.
+SYSTEM_CLOCK = Clock()
+
+# Clock reading POSIX time, for schedules of wall clock events.
+WALL_CLOCK = Clock(time.time)
@@ -8,6 +8,22 @@ EMBRAVA_VENDOR_IDS = [0x2C0D, 0x0E53]
 END_OF_COMMAND = 0xFF22
 PAD_VALUE = 0
 
+# Named colors as (red, blue, green) tuples, the channel order
+# used by BlyncLight.color.
+COLORS = {
+    "off": (0, 0, 0),
+    "black": (0, 0, 0),
+    "red": (255, 0, 0),
+    "green": (0, 0, 255),
+    "blue": (0, 255, 0),
+    "yellow": (255, 0, 255),
+    "cyan": (0, 255, 255),
+    "magenta": (255, 255, 0),
+    "purple": (128, 128, 0),
+    "orange": (255, 0, 128),
+    "white": (255, 255, 255),
+}
+
 
 class DeviceType(enum.Enum):
     INVALID = 0
@@ -3,8 +3,22 @@
 """
 
 
+from .dither import Ditherer
 from .gradient import Gradient
 from .spectrum import Spectrum
+from .runner import EffectRunner
+from .prefetch import FrameRing, PrefetchRunner
+from .table import EffectCache, EffectTable, TableRunner
 
 
-__all__ = ["Gradient", "Spectrum"]
+__all__ = [
+    "Ditherer",
+    "EffectCache",
+    "EffectRunner",
+    "EffectTable",
+    "FrameRing",
+    "Gradient",
+    "PrefetchRunner",
+    "Spectrum",
+    "TableRunner",
+]
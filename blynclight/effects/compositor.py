@@ -0,0 +1,228 @@
+"""Alpha Blended Effect Compositing
+
+A Compositor overlays several effects, each an iterable of colors, to
+produce one color per frame; for example a slow Spectrum background
+with a short red pulse on top. Each EffectLayer has an alpha between 0
+and 255 and a blend mode:
+
+- normal: the layer covers the colors beneath it by alpha
+- add: the layer's color, scaled by alpha, is added and saturates at 255
+- max: each channel keeps the larger of the layer and the colors beneath
+
+Blending uses integer fixed-point math with 255 as one. An effect may
+yield (red, blue, green, alpha) to vary its alpha per frame. Layers
+whose effect is exhausted are removed, so a finite effect like a pulse
+plays once and disappears.
+
+>>> compositor = Compositor([EffectLayer(cycle(Spectrum()))])
+>>> compositor.add(EffectLayer(pulse((255, 0, 0), 20), mode="add"))
+>>> CompositeRunner([light], compositor, interval=0.02).run()
+
+With NumPy installed, from the tensor extra `pip install
+blynclight[tensor]`, compositors with at least `vector_threshold`
+layers blend each run of layers with the same mode in one array
+operation. Runs of normal layers are blended in floating point and may
+differ from the integer path by rounding.
+"""
+
+from typing import Iterable, List, Sequence, Tuple
+
+from ..clock import SYSTEM_CLOCK, Clock
+from .runner import EffectRunner
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MODES = ("normal", "add", "max")
+
+Color = Tuple[int, int, int]
+
+
+class EffectLayer:
+    """An effect with an alpha and blend mode."""
+
+    def __init__(self, effect: Iterable, alpha: int = 255, mode: str = "normal"):
+        """
+        :param effect: iterable of (red, blue, green) or
+                       (red, blue, green, alpha) colors
+        :param alpha: int 0-255 applied to every color
+        :param mode: str one of MODES
+
+        Raises
+        - ValueError for unknown modes
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown blend mode: {mode}")
+        self.effect = iter(effect)
+        self.alpha = max(0, min(255, int(alpha)))
+        self.mode = mode
+
+    def next(self) -> Tuple[int, int, int, int]:
+        """Returns the layer's next (red, blue, green, alpha).
+
+        Raises
+        - StopIteration when the effect is exhausted
+        """
+        color = next(self.effect)
+        if len(color) == 4:
+            red, blue, green, alpha = color
+            return red, blue, green, (alpha * self.alpha + 127) // 255
+        red, blue, green = color
+        return red, blue, green, self.alpha
+
+
+def blend(dst: Color, src: Color, alpha: int, mode: str) -> Color:
+    """Returns `src` blended over `dst` with `alpha` using `mode`.
+
+    :param dst: (red, blue, green) beneath
+    :param src: (red, blue, green) of the layer
+    :param alpha: int 0-255
+    :param mode: str one of MODES
+    """
+    if mode == "normal":
+        inverse = 255 - alpha
+        return tuple((s * alpha + d * inverse + 127) // 255 for d, s in zip(dst, src))
+    scaled = [(s * alpha + 127) // 255 for s in src]
+    if mode == "add":
+        return tuple(min(255, d + s) for d, s in zip(dst, scaled))
+    return tuple(max(d, s) for d, s in zip(dst, scaled))
+
+
+class Compositor:
+    """Blends a stack of EffectLayers, bottom first, into one color per
+    frame.
+    """
+
+    def __init__(
+        self,
+        layers: Sequence[EffectLayer] = None,
+        background: Color = (0, 0, 0),
+        vector_threshold: int = 8,
+    ):
+        """
+        :param layers: optional sequence of EffectLayers, bottom first
+        :param background: (red, blue, green) beneath every layer
+        :param vector_threshold: int layers needed to use NumPy
+        """
+        self.layers: List[EffectLayer] = list(layers or [])
+        self.background = tuple(background)
+        self.vector_threshold = vector_threshold
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Color:
+        return self.frame()
+
+    def add(self, layer: EffectLayer) -> None:
+        """Adds `layer` on top of the existing layers.
+
+        :param layer: EffectLayer
+        """
+        self.layers.append(layer)
+
+    def _sample(self) -> List[Tuple[EffectLayer, Tuple[int, int, int, int]]]:
+        samples = []
+        for layer in list(self.layers):
+            try:
+                samples.append((layer, layer.next()))
+            except StopIteration:
+                self.layers.remove(layer)
+        return samples
+
+    def skip(self, count: int) -> None:
+        """Advances every layer `count` frames without blending.
+
+        :param count: int
+        """
+        for _ in range(count):
+            self._sample()
+
+    def frame(self) -> Color:
+        """Advances every layer one frame and returns the blended color."""
+        samples = self._sample()
+        if np is not None and len(samples) >= self.vector_threshold:
+            return self._blend_vector(samples)
+        color = self.background
+        for layer, (red, blue, green, alpha) in samples:
+            color = blend(color, (red, blue, green), alpha, layer.mode)
+        return color
+
+    def _blend_vector(self, samples) -> Color:
+        values = np.array([sample for _, sample in samples], dtype=np.int64)
+        modes = [layer.mode for layer, _ in samples]
+        color = np.array(self.background, dtype=np.int64)
+
+        start = 0
+        while start < len(modes):
+            stop = start
+            while stop < len(modes) and modes[stop] == modes[start]:
+                stop += 1
+            run = values[start:stop]
+            src, alpha = run[:, :3], run[:, 3:]
+            if modes[start] == "normal":
+                keep = (255 - alpha[:, 0]) / 255.0
+                # Weight of each layer after the layers above it cover it.
+                above = np.append(np.cumprod(keep[::-1])[::-1][1:], 1.0)
+                weights = alpha[:, 0] / 255.0 * above
+                mixed = color * np.prod(keep) + weights @ src
+                color = np.rint(mixed).astype(np.int64)
+            else:
+                scaled = (src * alpha + 127) // 255
+                if modes[start] == "add":
+                    color = np.minimum(255, color + scaled.sum(axis=0))
+                else:
+                    color = np.maximum(color, scaled.max(axis=0))
+            start = stop
+
+        return tuple(int(value) for value in color)
+
+
+def pulse(color: Color, frames: int) -> Iterable[Tuple[int, int, int, int]]:
+    """Returns a finite effect that fades `color` in and out over
+    `frames` frames using per-frame alpha.
+
+    :param color: (red, blue, green)
+    :param frames: int
+    """
+    half = max(1, frames // 2)
+    for index in range(frames):
+        alpha = 255 * (half - abs(index - half)) // half
+        yield (*color, max(0, alpha))
+
+
+class CompositeRunner(EffectRunner):
+    """Shows a Compositor's frames on lights at a fixed frame rate with
+    the scheduling of EffectRunner. Dropped ticks advance the layers
+    without blending so effects stay in time.
+    """
+
+    def __init__(
+        self,
+        lights: Sequence,
+        compositor: Compositor,
+        interval: float = 0.05,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        """
+        :param lights: sequence of BlyncLights
+        :param compositor: Compositor
+        :param interval: float seconds between ticks
+        :param clock: Clock
+        """
+        super().__init__(lights, [compositor.background], interval, clock=clock)
+        self.compositor = compositor
+        self._next_tick = 0
+
+    def frame(self, tick: int) -> List[Color]:
+        """Returns the composited color for `tick`, the same for every
+        light.
+
+        :param tick: int
+        """
+        if tick > self._next_tick:
+            self.compositor.skip(tick - self._next_tick)
+        self._next_tick = tick + 1
+        return [self.compositor.frame()] * len(self.lights)
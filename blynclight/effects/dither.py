@@ -0,0 +1,194 @@
+"""Temporal Dithering for BlyncLights
+
+BlyncLight color channels are eight bits, so slow fades near black
+step visibly from one level to the next. The Ditherer accepts colors
+with fractional channel values and alternates each channel between the
+two adjacent eight-bit levels at a high frame rate, so the perceived
+brightness falls between them.
+
+Which frames show the higher level is decided by the frame number
+alone, using an ordered (bit-reversed) threshold pattern, so the high
+frames are spread evenly through each period and the pattern stays
+stable when frames are dropped.
+
+Frames are shown at the update rate of the slowest light's model, or
+DEFAULT_RATE when no model limits it, unless a rate is given.
+"""
+
+from typing import Callable, List, Sequence, Tuple
+
+from ..clock import SYSTEM_CLOCK, Clock
+
+Color = Tuple[float, float, float]
+
+# Frames per second for lights whose profile doesn't limit the update
+# rate, the rate of a full-speed USB HID device.
+DEFAULT_RATE = 100.0
+
+
+def thresholds(period: int) -> List[int]:
+    """Returns the rank of each frame in a dither period. A channel
+    with fraction f shows its higher level on the frames whose rank is
+    below round(f * period). `period` must be a power of two.
+
+    :param period: int
+
+    Raises
+    - ValueError if period is not a power of two
+    """
+    if period < 1 or period & (period - 1):
+        raise ValueError(f"Expected a power of two period, got {period}")
+    bits = period.bit_length() - 1
+    return [int(f"{n:0{bits}b}"[::-1] or "0", 2) for n in range(period)]
+
+
+def from_16bit(color: Sequence[int]) -> Color:
+    """Returns a 16-bit per channel color scaled to fractional eight-bit
+    channel values.
+
+    :param color: sequence of three ints between 0 and 65535
+    """
+    return tuple(value / 257 for value in color)
+
+
+def max_rate(lights: Sequence) -> float:
+    """Returns the highest frame rate every light in `lights` accepts,
+    from their profiles' max_update_rate, or DEFAULT_RATE.
+
+    :param lights: sequence of BlyncLights
+    """
+    rates = [
+        light.profile.max_update_rate
+        for light in lights
+        if getattr(light, "profile", None) and light.profile.max_update_rate
+    ]
+    return min(rates, default=DEFAULT_RATE)
+
+
+class Ditherer:
+    """Writes fractional colors to lights by temporal dithering on a
+    fixed frame clock.
+
+    >>> ditherer = Ditherer([light])
+    >>> ditherer.run(lambda t: (t * 2.5, 0, 0), duration=10)
+
+    Frames are scheduled against absolute deadlines; late frames are
+    dropped rather than replayed. A light is only written when its
+    eight-bit color changes, so `writes` counts the device writes the
+    effect needed and writes / elapsed is the sustained write rate.
+    """
+
+    def __init__(
+        self,
+        lights: Sequence,
+        rate: float = None,
+        period: int = 16,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        """
+        :param lights: sequence of BlyncLights
+        :param rate: optional float frames per second, defaults to
+                     max_rate(lights)
+        :param period: int frames per dither cycle, a power of two
+        :param clock: Clock
+
+        Raises
+        - ValueError if period is not a power of two
+        """
+        self.lights = list(lights)
+        self.rate = rate or max_rate(self.lights)
+        self.interval = 1.0 / self.rate
+        self.period = period
+        self.ranks = thresholds(period)
+        self.clock = clock
+        self.frames = 0
+        self.dropped = 0
+        self.writes = 0
+        self.elapsed = 0.0
+        self._shown = [None] * len(self.lights)
+
+    def quantize(self, color: Color, frame: int) -> Tuple[int, int, int]:
+        """Returns the eight-bit color shown for `color` on `frame`.
+
+        :param color: (red, blue, green) floats between 0 and 255
+        :param frame: int
+        """
+        rank = self.ranks[frame % self.period]
+        result = []
+        for value in color:
+            value = min(max(value, 0.0), 255.0)
+            level = int(value)
+            if rank < int((value - level) * self.period + 0.5):
+                level += 1
+            result.append(min(level, 255))
+        return tuple(result)
+
+    def show(self, color: Color, frame: int) -> int:
+        """Writes the dithered `color` for `frame` to every light whose
+        eight-bit color changed and returns the number of writes.
+
+        :param color: (red, blue, green) floats between 0 and 255
+        :param frame: int
+        """
+        writes = self._write(self.quantize(color, frame))
+        self.frames += 1
+        return writes
+
+    def settle(self, color: Color) -> int:
+        """Writes `color` rounded to the nearest eight-bit levels, without
+        dithering, to every light whose eight-bit color differs and
+        returns the number of writes.
+
+        :param color: (red, blue, green) floats between 0 and 255
+        """
+        return self._write(tuple(min(max(int(value + 0.5), 0), 255) for value in color))
+
+    def _write(self, shown: Tuple[int, int, int]) -> int:
+        writes = 0
+        for index, light in enumerate(self.lights):
+            if self._shown[index] != shown:
+                light.color = shown
+                light.update(force=True)
+                self._shown[index] = shown
+                writes += 1
+        self.writes += writes
+        return writes
+
+    def run(self, effect: Callable[[float], Color], duration: float) -> None:
+        """Shows `effect(t)` for `duration` seconds, where t is the
+        seconds since the run started, and then settles the lights on
+        `effect(duration)` so they don't stay on a dithered level below
+        the final color. The lights are switched on with updates
+        deferred so each frame writes each light at most once.
+
+        :param effect: callable returning a fractional color for time t
+        :param duration: float seconds
+        """
+        for light in self.lights:
+            light.immediate = False
+            light.on = True
+
+        nframes = int(duration * self.rate)
+        start = self.clock.now()
+        frame = 0
+
+        while frame < nframes:
+            self.clock.sleep_until(start + frame * self.interval)
+            late = int((self.clock.now() - start) / self.interval)
+            if late > frame:
+                self.dropped += min(late, nframes) - frame
+                frame = late
+                if frame >= nframes:
+                    break
+            self.show(effect(frame * self.interval), frame)
+            frame += 1
+
+        self.settle(effect(duration))
+        self.elapsed = self.clock.now() - start
+
+    @property
+    def write_rate(self) -> float:
+        """Device writes per second per light sustained by the last run."""
+        if not self.elapsed or not self.lights:
+            return 0.0
+        return self.writes / len(self.lights) / self.elapsed
@@ -0,0 +1,246 @@
+"""Prefetched Effect Frames
+
+Computing an effect inline with the device writes turns any spike in
+compute time into a stutter on the lights. A PrefetchRunner moves the
+effect onto a producer thread that encodes frames ahead of time into a
+FrameRing, a fixed-size ring buffer backed by a single bytearray. The
+output side only dequeues pre-encoded command words and writes them on
+schedule.
+
+>>> runner = PrefetchRunner([light], cycle(Spectrum(steps=255)), capacity=128)
+>>> runner.run()
+
+The ring reports its depth and counts underruns, ticks where the
+producer hadn't supplied a frame in time. On an underrun the lights
+keep showing the previous frame.
+"""
+
+import threading
+
+from typing import Iterable, Optional, Sequence
+
+from ..clock import SYSTEM_CLOCK, Clock
+from ..constants import COMMAND_LENGTH
+from .runner import EffectRunner
+
+
+class FrameRing:
+    """A bounded single-producer, single-consumer queue of fixed-width
+    frames stored in one preallocated bytearray.
+    """
+
+    def __init__(self, capacity: int, width: int):
+        """
+        :param capacity: int number of frames held
+        :param width: int bytes per frame
+
+        Raises
+        - ValueError if capacity or width is not positive
+        """
+        if capacity < 1 or width < 1:
+            raise ValueError("Expected a positive capacity and width.")
+        self.capacity = capacity
+        self.width = width
+        self.buffer = bytearray(capacity * width)
+        self.head = 0  # frames consumed
+        self.tail = 0  # frames produced
+        self.closed = False
+        self.underruns = 0
+        self.min_depth = capacity
+        self._condition = threading.Condition()
+
+    @property
+    def depth(self) -> int:
+        """Number of frames waiting to be consumed."""
+        return self.tail - self.head
+
+    def put(self, frame: bytes, timeout: float = None) -> bool:
+        """Appends `frame`, waiting up to `timeout` seconds for space.
+        Returns False if the ring is closed or still full.
+
+        :param frame: bytes of length width
+        :param timeout: optional float seconds, waits forever if None
+
+        Raises
+        - ValueError if frame is the wrong length
+        """
+        if len(frame) != self.width:
+            raise ValueError(f"Expected {self.width} bytes, got {len(frame)}")
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self.closed or self.depth < self.capacity, timeout
+            ):
+                return False
+            if self.closed:
+                return False
+            offset = (self.tail % self.capacity) * self.width
+            self.buffer[offset : offset + self.width] = frame
+            self.tail += 1
+            self._condition.notify_all()
+        return True
+
+    def get(self) -> Optional[bytes]:
+        """Returns the oldest frame without waiting, or None and counts
+        an underrun if the ring is empty.
+        """
+        with self._condition:
+            depth = self.depth
+            if not depth:
+                if not self.closed:
+                    self.underruns += 1
+                return None
+            self.min_depth = min(self.min_depth, depth)
+            offset = (self.head % self.capacity) * self.width
+            frame = bytes(self.buffer[offset : offset + self.width])
+            self.head += 1
+            self._condition.notify_all()
+        return frame
+
+    def wait(self, depth: int, timeout: float = None) -> bool:
+        """Waits up to `timeout` seconds until `depth` frames are queued or
+        the ring is closed. Returns False on timeout.
+
+        :param depth: int
+        :param timeout: optional float seconds, waits forever if None
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self.closed or self.depth >= depth, timeout
+            )
+
+    def discard(self, count: int) -> int:
+        """Drops up to `count` of the oldest frames and returns the number
+        dropped.
+
+        :param count: int
+        """
+        with self._condition:
+            count = min(count, self.depth)
+            self.head += count
+            self._condition.notify_all()
+        return count
+
+    def close(self) -> None:
+        """Marks the end of the frames and wakes a waiting producer."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    @property
+    def drained(self) -> bool:
+        """True when the ring is closed and every frame was consumed."""
+        return self.closed and not self.depth
+
+
+class PrefetchRunner(EffectRunner):
+    """Runs an effect on a producer thread ahead of the device writes.
+
+    The effect is an iterable yielding, per tick, either one (red, blue,
+    green) color for every light or a sequence with a color per light.
+    The run finishes when a finite effect is exhausted and its frames
+    have been shown.
+    """
+
+    def __init__(
+        self,
+        lights: Sequence,
+        effect: Iterable,
+        interval: float = 0.05,
+        capacity: int = 64,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        """
+        :param lights: sequence of BlyncLights
+        :param effect: iterable of colors, one item per tick
+        :param interval: float seconds between ticks
+        :param capacity: int frames prefetched
+        :param clock: Clock
+        """
+        super().__init__(lights, [(0, 0, 0)], interval, clock=clock)
+        self.effect = effect
+        self.ring = FrameRing(capacity, COMMAND_LENGTH * len(self.lights))
+        self._producer = None
+        self._next_tick = 0
+        self._base = None
+
+    def encode(self, colors) -> bytes:
+        """Returns the command words for every light showing `colors`.
+
+        :param colors: a color for every light or one (red, blue, green)
+        """
+        if colors and isinstance(colors[0], int):
+            colors = [colors] * len(self.lights)
+        frame = bytearray(self._base)
+        for index, (red, blue, green) in enumerate(colors):
+            offset = index * COMMAND_LENGTH
+            frame[offset + 1 : offset + 4] = bytes((red, blue, green))
+        return bytes(frame)
+
+    def produce(self) -> None:
+        """Encodes effect frames into the ring until the effect is
+        exhausted or the ring is closed.
+        """
+        try:
+            for colors in self.effect:
+                if not self.ring.put(self.encode(colors)):
+                    break
+        finally:
+            self.ring.close()
+
+    def start(self, timeout: float = 1.0) -> None:
+        """Captures each light's command word, starts the producer and
+        waits up to `timeout` seconds for it to half fill the ring.
+
+        :param timeout: float seconds
+        """
+        self._base = b"".join(light.bytes for light in self.lights)
+        self._producer = threading.Thread(
+            target=self.produce, name="blynclight-prefetch", daemon=True
+        )
+        self._producer.start()
+        self.ring.wait(max(1, self.ring.capacity // 2), timeout)
+
+    def stop(self) -> None:
+        """Stops the producer and waits for it to exit."""
+        self.ring.close()
+        if self._producer:
+            self._producer.join()
+            self._producer = None
+
+    def step(self, tick: int) -> float:
+        """Writes the next prefetched frame to the lights, discarding the
+        frames of dropped ticks first. Returns the inter-light skew.
+
+        :param tick: int
+        """
+        if tick > self._next_tick:
+            self.ring.discard(tick - self._next_tick)
+        self._next_tick = tick + 1
+
+        frame = self.ring.get()
+        if frame is None:
+            self.finished = self.ring.drained
+            return 0.0
+
+        stamps = []
+        for index, light in enumerate(self.lights):
+            offset = index * COMMAND_LENGTH
+            light.write_frame(frame[offset : offset + COMMAND_LENGTH])
+            stamps.append(self.clock.now())
+
+        return self._record_tick(tick, stamps)
+
+    def run(self, count: int = None) -> None:
+        """Starts the producer and shows prefetched frames for `count`
+        ticks, forever if count is None, or until the effect ends.
+
+        :param count: optional int
+        """
+        for light in self.lights:
+            light.immediate = False
+            light.on = True
+        self.start()
+        try:
+            super().run(count)
+        finally:
+            self.stop()
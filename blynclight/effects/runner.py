@@ -0,0 +1,135 @@
+"""Synchronized Effect Runner for Multiple BlyncLights"""
+
+from typing import List, Sequence, Tuple
+
+from ..clock import SYSTEM_CLOCK, Clock
+
+
+class EffectRunner:
+    """Drives several lights through a shared sequence of colors from a
+    single monotonic clock.
+
+    Each tick selects one frame per light, assigns all of them in
+    memory and then writes every light back to back, so lights stay in
+    phase instead of drifting apart the way independent sleep loops do.
+    Ticks are scheduled against absolute deadlines; if the runner falls
+    behind, late ticks are dropped rather than replayed so every light
+    keeps showing the frame that belongs to the current time.
+
+    >>> lights = [BlyncLight.get_light(n) for n in range(2)]
+    >>> colors = list(Spectrum(steps=255))
+    >>> runner = EffectRunner(lights, colors, offsets=EffectRunner.spread(2, 255))
+    >>> runner.run()
+    """
+
+    def __init__(
+        self,
+        lights: Sequence,
+        frames: Sequence[Tuple[int, int, int]],
+        interval: float = 0.05,
+        offsets: Sequence[int] = None,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        """
+        :param lights: sequence of BlyncLights
+        :param frames: sequence of (red, blue, green) colors
+        :param interval: float seconds between ticks
+        :param offsets: optional per-light phase offset in frames
+        :param clock: Clock
+
+        Raises
+        - ValueError if frames is empty or offsets and lights differ in length
+        """
+        self.lights = list(lights)
+        self.frames = list(frames)
+        self.interval = interval
+        self.offsets = list(offsets) if offsets else [0] * len(self.lights)
+        self.clock = clock
+        self.on_tick = None
+        self.finished = False
+        self.ticks = 0
+        self.dropped = 0
+        self.skew = 0.0
+        self.max_skew = 0.0
+
+        if not self.frames:
+            raise ValueError("Expected at least one frame.")
+
+        if len(self.offsets) != len(self.lights):
+            raise ValueError("Expected one offset per light.")
+
+    @staticmethod
+    def spread(nlights: int, nframes: int) -> List[int]:
+        """Returns offsets that spread `nlights` evenly around a cycle of
+        `nframes` frames.
+
+        :param nlights: int
+        :param nframes: int
+        """
+        return [(index * nframes) // max(1, nlights) for index in range(nlights)]
+
+    def frame(self, tick: int) -> List[Tuple[int, int, int]]:
+        """Returns the color of each light for `tick`.
+
+        :param tick: int
+        """
+        nframes = len(self.frames)
+        return [self.frames[(tick + offset) % nframes] for offset in self.offsets]
+
+    def step(self, tick: int) -> float:
+        """Assigns every light its color for `tick` and then writes all
+        the lights together. Returns the inter-light skew, the seconds
+        between the first and the last write completing.
+
+        :param tick: int
+        """
+        for light, color in zip(self.lights, self.frame(tick)):
+            light.color = color
+
+        stamps = []
+        for light in self.lights:
+            light.update(force=True)
+            stamps.append(self.clock.now())
+
+        return self._record_tick(tick, stamps)
+
+    def _record_tick(self, tick: int, stamps: Sequence[float]) -> float:
+        """Records a tick whose light writes completed at the clock times
+        in `stamps` and calls on_tick. Returns the inter-light skew.
+        Every runner's step() ends here so ticks are accounted the same
+        way however the frames were written.
+
+        :param tick: int
+        :param stamps: sequence of float
+        """
+        self.skew = stamps[-1] - stamps[0] if stamps else 0.0
+        self.max_skew = max(self.max_skew, self.skew)
+        self.ticks += 1
+
+        if self.on_tick:
+            self.on_tick(tick, self.skew)
+
+        return self.skew
+
+    def run(self, count: int = None) -> None:
+        """Runs the effect for `count` ticks, forever if count is None,
+        or until a tick sets `finished`. The lights are switched on with
+        updates deferred so each tick writes each light exactly once.
+
+        :param count: optional int
+        """
+        for light in self.lights:
+            light.immediate = False
+            light.on = True
+
+        start = self.clock.now()
+        next_tick = 0
+        done = 0
+
+        while (count is None or done < count) and not self.finished:
+            self.clock.sleep_until(start + next_tick * self.interval)
+            tick = max(next_tick, int((self.clock.now() - start) / self.interval))
+            self.dropped += tick - next_tick
+            self.step(tick)
+            next_tick = tick + 1
+            done += 1
@@ -0,0 +1,285 @@
+"""Compiled Effect Tables
+
+An effect's colors become command words one frame at a time as they
+are shown, and effects with many steps take noticeable time to generate
+before the first frame. An EffectTable holds an effect compiled into
+the command words written to the light, run-length encoded so repeated
+frames are stored once. An EffectCache keeps tables in files under
+$XDG_CACHE_HOME/blynclight/effects, keyed by the effect's name, its
+parameters and the command word the colors were compiled into, and
+maps them back into memory with mmap on later runs.
+
+>>> cache = EffectCache()
+>>> table = cache.get("spectrum", {"steps": 255}, light.bytes,
+...                   lambda: Spectrum(steps=255))
+>>> TableRunner([light], table, interval=0.05).run()
+
+Table files are read in place: a 16 byte header followed by one 16
+byte record per run holding the index one past the run's last frame
+and the run's command word. Looking up a frame is a binary search over
+the records and returns a memoryview of the mapped file, so loading a
+table neither parses nor copies the frames.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+from loguru import logger
+
+from ..clock import SYSTEM_CLOCK, Clock
+from ..constants import COMMAND_LENGTH
+from ..state import default_cache_dir
+from .runner import EffectRunner
+
+MAGIC = b"BLYNCFX\x01"
+
+_HEADER = struct.Struct("<8sII")  # magic, runs, frames
+_RECORD = struct.Struct(f"<I{COMMAND_LENGTH}s{12 - COMMAND_LENGTH}x")  # end, word
+
+
+class EffectTable:
+    """A read-only sequence of command words stored as runs of repeated
+    frames in a bytes-like buffer.
+    """
+
+    def __init__(self, buffer):
+        """
+        :param buffer: bytes-like table, see EffectTable.encode()
+
+        Raises
+        - ValueError if buffer isn't a valid table
+        """
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Truncated effect table.")
+        magic, self.runs, self.frames = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not an effect table.")
+        if len(buffer) != _HEADER.size + self.runs * _RECORD.size:
+            raise ValueError("Truncated effect table.")
+        if not self.frames:
+            raise ValueError("Expected at least one frame.")
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def _end(self, run: int) -> int:
+        return struct.unpack_from(
+            "<I", self._buffer, _HEADER.size + run * _RECORD.size
+        )[0]
+
+    def _word(self, run: int) -> memoryview:
+        offset = _HEADER.size + run * _RECORD.size + 4
+        return self._view[offset : offset + COMMAND_LENGTH]
+
+    def __getitem__(self, index: int) -> memoryview:
+        if index < 0:
+            index += self.frames
+        if not 0 <= index < self.frames:
+            raise IndexError("Effect table index out of range.")
+        low, high = 0, self.runs - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._end(middle) <= index:
+                low = middle + 1
+            else:
+                high = middle
+        return self._word(low)
+
+    def __iter__(self) -> Iterator[memoryview]:
+        start = 0
+        for run in range(self.runs):
+            end = self._end(run)
+            word = self._word(run)
+            for _ in range(end - start):
+                yield word
+            start = end
+
+    def close(self) -> None:
+        """Releases the table's buffer, unmapping it if it was loaded
+        from a file. Frames returned by the table must not be used after.
+        """
+        self._view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            try:
+                self._buffer.close()
+            except BufferError:
+                pass
+
+    @staticmethod
+    def encode(frames: Iterable[bytes]) -> bytes:
+        """Returns `frames` encoded as a table, merging repeated frames
+        into runs.
+
+        :param frames: iterable of command words
+
+        Raises
+        - ValueError if a frame is not a command word
+        """
+        records = []
+        previous, end = None, 0
+        for frame in frames:
+            frame = bytes(frame)
+            if len(frame) != COMMAND_LENGTH:
+                raise ValueError(f"Expected {COMMAND_LENGTH} bytes, got {len(frame)}")
+            if frame != previous and previous is not None:
+                records.append(_RECORD.pack(end, previous))
+            previous = frame
+            end += 1
+        if previous is not None:
+            records.append(_RECORD.pack(end, previous))
+        return _HEADER.pack(MAGIC, len(records), end) + b"".join(records)
+
+    @classmethod
+    def compile(cls, colors: Iterable, base: bytes) -> "EffectTable":
+        """Returns a table of `base` with each of `colors` substituted.
+
+        :param colors: iterable of (red, blue, green)
+        :param base: bytes command word, usually a light's bytes
+        """
+        word = bytearray(base)
+
+        def frames():
+            for red, blue, green in colors:
+                word[1:4] = bytes((red, blue, green))
+                yield word
+
+        return cls(cls.encode(frames()))
+
+
+class EffectCache:
+    """Compiled EffectTables stored as files and loaded with mmap.
+
+    >>> table = EffectCache().get("spectrum", {"steps": 255}, base, factory)
+    """
+
+    def __init__(self, path: Path = None):
+        """
+        :param path: optional directory, defaults to effects in
+                     default_cache_dir()
+        """
+        self.path = Path(path) if path else default_cache_dir() / "effects"
+
+    def filename(self, name: str, params: Dict[str, Any], base: bytes) -> Path:
+        """Returns the path of the table for effect `name` with `params`
+        compiled into `base`.
+
+        :param name: str
+        :param params: Dict[str, Any] JSON serializable parameters
+        :param base: bytes command word
+        """
+        key = json.dumps([name, params, bytes(base).hex()], sort_keys=True)
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+        return self.path / f"{slug}-{digest}.fx"
+
+    def load(
+        self, name: str, params: Dict[str, Any], base: bytes
+    ) -> Optional[EffectTable]:
+        """Returns the cached table mapped into memory, or None if it
+        isn't cached or the file is invalid.
+
+        :param name: str
+        :param params: Dict[str, Any]
+        :param base: bytes command word
+        """
+        path = self.filename(name, params, base)
+        try:
+            with path.open("rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            return EffectTable(buffer)
+        except ValueError as error:
+            buffer.close()
+            logger.warning(f"Ignoring effect table {path}: {error}")
+            return None
+
+    def save(
+        self, name: str, params: Dict[str, Any], base: bytes, table: EffectTable
+    ) -> EffectTable:
+        """Writes `table` to the cache and returns it mapped from the
+        file. Failures are logged and `table` is returned.
+
+        :param name: str
+        :param params: Dict[str, Any]
+        :param base: bytes command word
+        :param table: EffectTable
+        """
+        path = self.filename(name, params, base)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}")
+            tmp.write_bytes(table._buffer)
+            os.replace(tmp, path)
+        except OSError as error:
+            logger.warning(f"Failed to cache effect table in {path}: {error}")
+            return table
+        return self.load(name, params, base) or table
+
+    def get(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        base: bytes,
+        factory: Callable[[], Iterable],
+    ) -> EffectTable:
+        """Returns the cached table for effect `name`, compiling the
+        colors returned by `factory` and caching them if needed.
+
+        :param name: str
+        :param params: Dict[str, Any] parameters that determine the colors
+        :param base: bytes command word the colors are substituted into
+        :param factory: callable returning an iterable of (red, blue, green)
+        """
+        table = self.load(name, params, base)
+        if table is None:
+            table = self.save(name, params, base, EffectTable.compile(factory(), base))
+        return table
+
+
+class TableRunner(EffectRunner):
+    """Writes an EffectTable's command words to lights with the
+    scheduling of EffectRunner. Every light is written the table's
+    command words, replacing its in-memory state.
+    """
+
+    def __init__(
+        self,
+        lights: Sequence,
+        table: EffectTable,
+        interval: float = 0.05,
+        offsets: Sequence[int] = None,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        """
+        :param lights: sequence of BlyncLights
+        :param table: EffectTable
+        :param interval: float seconds between ticks
+        :param offsets: optional per-light phase offset in frames
+        :param clock: Clock
+        """
+        super().__init__(lights, [(0, 0, 0)], interval, offsets, clock=clock)
+        self.frames = table
+
+    def step(self, tick: int) -> float:
+        """Writes every light its command word for `tick` and returns the
+        inter-light skew.
+
+        :param tick: int
+        """
+        stamps = []
+        for light, frame in zip(self.lights, self.frame(tick)):
+            light.write_frame(frame)
+            stamps.append(self.clock.now())
+
+        return self._record_tick(tick, stamps)
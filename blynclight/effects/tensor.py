@@ -0,0 +1,204 @@
+"""Vectorized Frames for Arrays of BlyncLights
+
+Effects for walls of lights compute a color per light per tick. Rather
+than looping over lights and ticks in Python, frame_tensor() evaluates
+an effect function once over every tick and light position with NumPy
+and returns a (ticks, lights, 3) uint8 tensor of (red, blue, green)
+colors. TensorPlayer encodes the tensor into command words up front
+and streams them to the lights, one write per light per tick.
+
+NumPy is optional and installed with the tensor extra, `pip install
+blynclight[tensor]`; it is imported when this module is and the
+functions raise ImportError without it.
+
+>>> layout = [0.0, 0.25, 0.5, 0.75]
+>>> frames = frame_tensor(layout, wave(color=(255, 0, 0)), ticks=200)
+>>> TensorPlayer(lights, frames).run()
+"""
+
+import math
+
+from typing import Callable, Sequence, Tuple
+
+from ..clock import SYSTEM_CLOCK, Clock
+from ..constants import COMMAND_LENGTH
+from .runner import EffectRunner
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "Vectorized frames require numpy: pip install blynclight[tensor]"
+        )
+
+
+def frame_tensor(
+    layout: Sequence, effect: Callable, ticks: int, interval: float = 0.05
+):
+    """Returns a (ticks, lights, 3) uint8 array of (red, blue, green)
+    colors computed by `effect` for every tick and light.
+
+    The effect is called once as effect(t, x) where t is an array of
+    seconds with shape (ticks, 1) and x is the layout with shape
+    (1, lights) for scalar positions or (1, lights, n) for n-dimensional
+    positions. It returns colors broadcastable to (ticks, lights, 3);
+    values are rounded and clipped to 0-255.
+
+    :param layout: sequence of light positions
+    :param effect: callable(t, x) returning an array of colors
+    :param ticks: int number of frames
+    :param interval: float seconds between frames
+
+    Raises
+    - ImportError if numpy is not installed
+    - ValueError if the effect's colors have the wrong shape
+    """
+    _require_numpy()
+    positions = np.asarray(layout, dtype=float)
+    nlights = positions.shape[0]
+    t = np.arange(ticks, dtype=float)[:, np.newaxis] * interval
+    colors = np.asarray(effect(t, positions[np.newaxis]), dtype=float)
+    try:
+        colors = np.broadcast_to(colors, (ticks, nlights, 3))
+    except ValueError:
+        raise ValueError(
+            f"Expected colors shaped ({ticks}, {nlights}, 3), got {colors.shape}"
+        ) from None
+    return np.clip(np.rint(colors), 0, 255).astype(np.uint8)
+
+
+def wave(
+    color: Tuple[int, int, int] = (255, 0, 0),
+    period: float = 2.0,
+    wavelength: float = 1.0,
+) -> Callable:
+    """Returns an effect whose brightness travels across the layout as
+    a sine wave. Layouts must be scalar positions.
+
+    :param color: (red, blue, green) at full brightness
+    :param period: float seconds per cycle at each light
+    :param wavelength: float distance between peaks
+    """
+
+    def effect(t, x):
+        level = 0.5 + 0.5 * np.sin(2 * math.pi * (t / period - x / wavelength))
+        return level[..., np.newaxis] * np.asarray(color, dtype=float)
+
+    return effect
+
+
+def spectrum(
+    rate: float = 20.0,
+    spread: float = 0.0,
+    frequency: Tuple[float, float, float] = (0.3, 0.3, 0.3),
+    phase: Tuple[float, float, float] = (0, 2, 4),
+    center: int = 128,
+    width: int = 127,
+) -> Callable:
+    """Returns an effect cycling through the color cycle of Spectrum(),
+    advancing `rate` steps per second. Each light is offset by its
+    position times `spread` steps. Layouts must be scalar positions.
+
+    :param rate: float Spectrum steps per second
+    :param spread: float steps of offset per unit of position
+    :param frequency: (red, blue, green) frequencies
+    :param phase: (red, green, blue) phases, as Spectrum()
+    :param center: int
+    :param width: int
+    """
+
+    def effect(t, x):
+        step = (t * rate + x * spread)[..., np.newaxis]
+        offsets = np.asarray([phase[0], phase[2], phase[1]], dtype=float)
+        return np.sin(np.asarray(frequency) * step + offsets) * width + center
+
+    return effect
+
+
+class TensorPlayer(EffectRunner):
+    """Streams a (ticks, lights, 3) frame tensor to lights, looping
+    over the ticks, with the scheduling of EffectRunner.
+
+    Each light's command word for every tick is encoded from the tensor
+    in a single array operation when the run starts, so a tick costs
+    one write per light.
+    """
+
+    def __init__(
+        self,
+        lights: Sequence,
+        frames,
+        interval: float = 0.05,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        """
+        :param lights: sequence of BlyncLights
+        :param frames: (ticks, lights, 3) array of (red, blue, green)
+        :param interval: float seconds between ticks
+        :param clock: Clock
+
+        Raises
+        - ImportError if numpy is not installed
+        - ValueError if frames doesn't have a color for every light
+        """
+        _require_numpy()
+        frames = np.asarray(frames, dtype=np.uint8)
+        if frames.ndim != 3 or frames.shape[1:] != (len(lights), 3):
+            raise ValueError(
+                f"Expected frames shaped (ticks, {len(lights)}, 3), "
+                f"got {frames.shape}"
+            )
+        super().__init__(lights, range(len(frames)), interval, clock=clock)
+        self.tensor = frames
+        self.words = None
+
+    def encode(self):
+        """Returns a (ticks, lights, COMMAND_LENGTH) uint8 array of command
+        words: each light's current command word with its color replaced
+        by the tensor's color for each tick.
+        """
+        base = np.frombuffer(
+            b"".join(light.bytes for light in self.lights), dtype=np.uint8
+        ).reshape(len(self.lights), COMMAND_LENGTH)
+        words = np.repeat(base[np.newaxis], len(self.tensor), axis=0)
+        words[:, :, 1:4] = self.tensor
+        return words
+
+    def frame(self, tick: int):
+        """Returns the (lights, 3) colors for `tick`.
+
+        :param tick: int
+        """
+        return self.tensor[tick % len(self.tensor)]
+
+    def step(self, tick: int) -> float:
+        """Writes every light its command word for `tick` and returns the
+        inter-light skew.
+
+        :param tick: int
+        """
+        if self.words is None:
+            self.words = self.encode()
+
+        stamps = []
+        for light, word in zip(self.lights, self.words[tick % len(self.words)]):
+            light.write_frame(word.tobytes())
+            stamps.append(self.clock.now())
+
+        return self._record_tick(tick, stamps)
+
+    def run(self, count: int = None) -> None:
+        """Runs the frames for `count` ticks or forever if count is None.
+
+        :param count: optional int
+        """
+        for light in self.lights:
+            light.immediate = False
+            light.on = True
+        self.words = self.encode()
+        super().run(count)
@@ -0,0 +1,141 @@
+"""Hardware Flash Offload
+
+BlyncLight firmware can flash the light by itself at three speeds,
+selected by the flash and speed fields. A blinking effect done in
+software costs two device writes per cycle forever, while the same
+blink done by the firmware costs a single write.
+
+plan_blink() compares a requested on/off pattern with the firmware's
+flash rates and returns a FlashPlan: the fields to program the
+firmware when a rate matches, or a software plan otherwise. blink()
+carries out a plan on a light.
+
+>>> blink(light, (255, 0, 0), on=0.25, off=0.25, seconds=60)
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from .clock import SYSTEM_CLOCK, Clock
+from .constants import FlashSpeed
+
+# Nominal seconds per on/off cycle of the firmware flash speeds. The
+# firmware flashes with an even duty cycle.
+FLASH_PERIODS: Dict[FlashSpeed, float] = {
+    FlashSpeed.LOW: 1.0,
+    FlashSpeed.MEDIUM: 0.5,
+    FlashSpeed.HIGH: 0.25,
+}
+
+
+class FlashPlan(NamedTuple):
+    """How a blink pattern is produced.
+
+    on: seconds the light is on per cycle
+    off: seconds the light is off per cycle
+    speed: the matching FlashSpeed, or None to toggle in software
+    """
+
+    on: float
+    off: float
+    speed: Optional[FlashSpeed] = None
+
+    @property
+    def hardware(self) -> bool:
+        """True if the firmware produces the pattern."""
+        return self.speed is not None
+
+    @property
+    def fields(self) -> Dict[str, int]:
+        """BlyncLight attributes that start the pattern; flash is only
+        set for hardware plans.
+        """
+        if not self.hardware:
+            return {"flash": 0, "on": 1}
+        return {"flash": 1, "speed": FlashSpeed.value_for_speed(self.speed), "on": 1}
+
+
+def plan_blink(
+    on: float,
+    off: float,
+    tolerance: float = 0.15,
+    periods: Dict[FlashSpeed, float] = None,
+) -> FlashPlan:
+    """Returns a FlashPlan for a light that is on for `on` seconds and
+    off for `off` seconds, repeatedly. The firmware is used if the
+    pattern's duty cycle is even and its period is within `tolerance`,
+    as a fraction, of a firmware flash period.
+
+    :param on: float seconds
+    :param off: float seconds
+    :param tolerance: float relative error accepted
+    :param periods: optional Dict[FlashSpeed, float], defaults to FLASH_PERIODS
+
+    Raises
+    - ValueError if on or off is not positive
+    """
+    if on <= 0 or off <= 0:
+        raise ValueError("Expected positive on and off durations.")
+
+    period = on + off
+    if abs(on - off) <= tolerance * period:
+        candidates = []
+        for speed, nominal in (periods or FLASH_PERIODS).items():
+            error = abs(period - nominal) / nominal
+            if error <= tolerance:
+                candidates.append((error, speed))
+        if candidates:
+            return FlashPlan(on, off, min(candidates)[1])
+
+    return FlashPlan(on, off)
+
+
+def blink(
+    light,
+    color: Tuple[int, int, int],
+    on: float,
+    off: float,
+    seconds: float = None,
+    tolerance: float = 0.15,
+    clock: Clock = SYSTEM_CLOCK,
+) -> FlashPlan:
+    """Blinks `light` with `color` for `seconds`, or until interrupted if
+    seconds is None, and returns the plan used. Hardware plans write the
+    light once; software plans write it at each transition, scheduled
+    against absolute deadlines. When `seconds` have passed, flashing is
+    stopped and the light is switched off.
+
+    :param light: BlyncLight
+    :param color: (red, blue, green)
+    :param on: float seconds
+    :param off: float seconds
+    :param seconds: optional float
+    :param tolerance: float relative error accepted for hardware plans
+    :param clock: Clock
+    """
+    plan = plan_blink(on, off, tolerance)
+    light.apply(color=color, **plan.fields)
+
+    start = clock.now()
+
+    if plan.hardware:
+        if seconds is None:
+            while True:
+                clock.sleep(3600)
+        clock.sleep_until(start + seconds)
+        light.apply(flash=0, on=0)
+        return plan
+
+    end = None if seconds is None else start + seconds
+    deadline = start
+    lit = True
+    while True:
+        deadline += on if lit else off
+        if end is not None and deadline > end:
+            clock.sleep_until(end)
+            break
+        clock.sleep_until(deadline)
+        lit = not lit
+        light.apply(on=lit)
+
+    light.apply(flash=0, on=0)
+    return plan
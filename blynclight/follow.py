@@ -0,0 +1,194 @@
+"""Follow a Stream of JSON Light Events
+
+Reads newline-delimited JSON objects from a stream and maps each
+one onto an open BlyncLight:
+
+    {"light": 0, "color": "red", "flash": 2}
+    {"light": 1, "on": 0}
+
+The "light" key selects a light by index and defaults to zero. The
+"color" key accepts a name from constants.COLORS, a [red, blue, green]
+list or a 24-bit integer. The "flash" key accepts a flash speed like
+the command-line -f option; zero stops flashing. Any other key must be
+a BlyncLight attribute. Values are range checked like the HTTP
+endpoint's, so an event that doesn't fit the light is rejected instead
+of being truncated.
+
+Events for the same light that arrive within `window` seconds of the
+first pending event are collapsed into one state and written once.
+Input is read in large chunks by a background thread so producers are
+never blocked waiting for events to be parsed or lights to be written.
+"""
+
+import json
+import threading
+
+from queue import Empty, Queue
+from typing import Any, BinaryIO, Callable, Dict, Tuple
+
+from loguru import logger
+
+from .blynclight import BlyncLight
+from .clock import SYSTEM_CLOCK, Clock
+
+CHUNK_SIZE = 64 * 1024
+
+
+def event_to_fields(event: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    """Returns a tuple of (light_id, fields) for a decoded event where
+    fields are BlyncLight attributes suitable for BlyncLight.apply().
+
+    :param event: Dict[str, Any]
+
+    Raises
+    - ValueError for events that cannot be mapped onto a light or
+      have values out of range
+    """
+    if not isinstance(event, dict):
+        raise ValueError(f"Expected a JSON object: {event!r}")
+
+    event = dict(event)
+    light_id = event.pop("light", 0)
+    if not isinstance(light_id, int):
+        raise ValueError(f"Expected an integer light: {light_id!r}")
+
+    return light_id, BlyncLight.state_fields(event)
+
+
+class Follower:
+    """Parses buffered JSON lines into per-light pending states and
+    writes each pending state once its debounce window expires.
+
+    >>> follower = Follower(lambda n: BlyncLight.get_light(n), window=0.1)
+    >>> follower.follow(sys.stdin.buffer)
+    """
+
+    def __init__(
+        self,
+        open_light: Callable[[int], BlyncLight],
+        window: float = 0.1,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        """
+        :param open_light: callable returning a BlyncLight for a light id
+        :param window: float seconds to collect events before writing
+        :param clock: Clock
+        """
+        self.open_light = open_light
+        self.window = window
+        self.clock = clock
+        self.lights: Dict[int, BlyncLight] = {}
+        self.pending: Dict[int, Dict[str, Any]] = {}
+        self.deadlines: Dict[int, float] = {}
+        self.events = 0
+        self.errors = 0
+        self.writes = 0
+        self._partial = b""
+
+    def feed(self, data: bytes) -> int:
+        """Parses every complete line in `data`, holding any trailing
+        partial line until the next call, and returns the number of
+        events accepted.
+
+        :param data: bytes
+        """
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        accepted = 0
+        for line in lines:
+            if line.strip() and self.event(line):
+                accepted += 1
+        return accepted
+
+    def event(self, line: bytes) -> bool:
+        """Merges a single JSON encoded event into the pending state of
+        the light it names. Returns False if the event was rejected.
+
+        :param line: bytes
+        """
+        try:
+            light_id, fields = event_to_fields(json.loads(line))
+        except ValueError as error:
+            self.errors += 1
+            logger.warning(f"Ignoring event {line[:80]!r}: {error}")
+            return False
+
+        pending = self.pending.setdefault(light_id, {})
+        for name, value in fields.items():
+            pending.pop(name, None)
+            pending[name] = value
+        self.deadlines.setdefault(light_id, self.clock.now() + self.window)
+        self.events += 1
+        return True
+
+    def timeout(self) -> float:
+        """Seconds until the next pending state is due, or None if
+        nothing is pending.
+        """
+        if not self.deadlines:
+            return None
+        return max(0.0, min(self.deadlines.values()) - self.clock.now())
+
+    def flush(self, force: bool = False) -> int:
+        """Writes every pending state whose window has expired, or all
+        pending states if `force` is True. Returns the number of writes.
+
+        :param force: bool
+        """
+        now = self.clock.now()
+        due = [n for n, t in self.deadlines.items() if force or t <= now]
+        for light_id in due:
+            del self.deadlines[light_id]
+            fields = self.pending.pop(light_id)
+            try:
+                light = self.lights.get(light_id)
+                if light is None:
+                    light = self.lights[light_id] = self.open_light(light_id)
+                light.apply(**fields)
+                self.writes += 1
+            except Exception as error:
+                self.errors += 1
+                logger.error(f"Failed to update light {light_id}: {error}")
+        return len(due)
+
+    def follow(self, stream: BinaryIO) -> None:
+        """Reads events from `stream` until end of file, writing debounced
+        states to lights as their windows expire. Pending states are
+        written when the stream ends.
+
+        :param stream: binary file-like object, e.g. sys.stdin.buffer
+        """
+        chunks = Queue()
+        reader = threading.Thread(
+            target=self._read_chunks, args=(stream, chunks), daemon=True
+        )
+        reader.start()
+
+        while True:
+            try:
+                data = chunks.get(timeout=self.timeout())
+            except Empty:
+                data = None
+            if data == b"":
+                break
+            if data:
+                self.feed(data)
+            self.flush()
+
+        if self._partial.strip():
+            self.event(self._partial)
+        self._partial = b""
+        self.flush(force=True)
+
+    @staticmethod
+    def _read_chunks(stream: BinaryIO, chunks: Queue) -> None:
+        read = getattr(stream, "read1", stream.read)
+        try:
+            while True:
+                data = read(CHUNK_SIZE)
+                chunks.put(data)
+                if not data:
+                    break
+        except Exception as error:
+            logger.error(f"Failed to read events: {error}")
+            chunks.put(b"")
@@ -0,0 +1,509 @@
+"""Calendar Driven Presence for BlyncLights
+
+Loads events from local iCalendar (.ics) files, expands recurring
+events over a bounded window into an interval tree and drives a light
+between a "busy" and a "free" state. The schedule sleeps until the next
+event boundary instead of polling the clock.
+
+Only the parts of RFC 5545 needed for presence are understood:
+VEVENT components with DTSTART, DTEND or DURATION, TRANSP, STATUS,
+EXDATE, RECURRENCE-ID overrides and RRULE with FREQ of DAILY, WEEKLY,
+MONTHLY or YEARLY plus INTERVAL, COUNT, UNTIL and BYDAY (with
+ordinals like 1MO or -1FR for monthly rules). Events with other rules
+are logged and skipped. Times with a TZID are resolved with zoneinfo
+when available, otherwise as local time.
+"""
+
+import re
+
+from bisect import bisect_right
+from calendar import monthrange
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+from .clock import WALL_CLOCK, Clock
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover
+    ZoneInfo = None
+
+
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+BYDAY = re.compile(r"(?P<ordinal>[+-]?\d{1,2})?(?P<weekday>MO|TU|WE|TH|FR|SA|SU)$")
+
+# RRULE parts understood by the expansion, rules with others are skipped.
+RULE_PARTS = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "WKST"}
+
+DURATION = re.compile(
+    r"(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+class Interval(NamedTuple):
+    """A half-open interval [start, end) of POSIX timestamps."""
+
+    start: float
+    end: float
+    summary: str = ""
+
+
+def parse_datetime(value: str, params: Dict[str, str]) -> Tuple[datetime, bool]:
+    """Returns a tuple of (datetime, all_day) for an iCalendar DATE or
+    DATE-TIME value. Floating times are naive and taken as local time.
+
+    :param value: str
+    :param params: Dict[str, str] property parameters, e.g. TZID
+    """
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d"), True
+
+    if value.endswith("Z"):
+        dt = datetime.strptime(value[:-1], "%Y%m%dT%H%M%S")
+        return dt.replace(tzinfo=timezone.utc), False
+
+    dt = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    tzid = params.get("TZID")
+    if tzid and ZoneInfo:
+        try:
+            dt = dt.replace(tzinfo=ZoneInfo(tzid))
+        except Exception:
+            logger.warning(f"Unknown TZID {tzid}, using local time")
+    return dt, False
+
+
+def parse_duration(value: str) -> timedelta:
+    """Returns a timedelta for an iCalendar DURATION value.
+
+    Raises
+    - ValueError for malformed durations
+    """
+    match = DURATION.match(value)
+    if not match:
+        raise ValueError(f"Bad duration: {value}")
+    parts = {k: int(v) for k, v in match.groupdict().items() if v and k != "sign"}
+    duration = timedelta(**parts)
+    return -duration if match.group("sign") == "-" else duration
+
+
+def _properties(text: str) -> Iterator[Tuple[str, Dict[str, str], str]]:
+    """Yields (name, params, value) for each unfolded content line."""
+    lines = []
+    for line in text.splitlines():
+        if line[:1] in (" ", "\t") and lines:
+            lines[-1] += line[1:]
+        elif line:
+            lines.append(line)
+
+    for line in lines:
+        head, _, value = line.partition(":")
+        name, *params = head.split(";")
+        params = dict(p.partition("=")[::2] for p in params)
+        yield name.upper(), {k.upper(): v for k, v in params.items()}, value
+
+
+def _add_months(dt: datetime, months: int) -> Optional[datetime]:
+    month = dt.month - 1 + months
+    try:
+        return dt.replace(year=dt.year + month // 12, month=month % 12 + 1)
+    except ValueError:
+        return None
+
+
+def _byday(value: str) -> List[Tuple[int, int]]:
+    """Returns a list of (ordinal, weekday) for an RRULE BYDAY value,
+    where ordinal is zero for every such weekday.
+
+    Raises
+    - ValueError for malformed values
+    """
+    days = []
+    for item in value.upper().split(","):
+        match = BYDAY.match(item.strip())
+        if not match:
+            raise ValueError(f"Bad BYDAY: {item}")
+        ordinal = int(match.group("ordinal") or 0)
+        if not -5 <= ordinal <= 5:
+            raise ValueError(f"Bad BYDAY: {item}")
+        days.append((ordinal, WEEKDAYS[match.group("weekday")]))
+    return days
+
+
+def _month_days(year: int, month: int, byday: List[Tuple[int, int]]) -> List[int]:
+    """Returns the sorted days of the month matching `byday`, so
+    (1, 0) is the first Monday and (-1, 4) the last Friday.
+    """
+    ndays = monthrange(year, month)[1]
+    first = date(year, month, 1).weekday()
+    days = set()
+    for ordinal, weekday in byday:
+        matching = list(range((weekday - first) % 7 + 1, ndays + 1, 7))
+        if not ordinal:
+            days.update(matching)
+        elif abs(ordinal) <= len(matching):
+            days.add(matching[ordinal - 1 if ordinal > 0 else ordinal])
+    return sorted(days)
+
+
+def _occurrences(
+    start: datetime, rule: Dict[str, str], window_start: float, window_end: float
+) -> Iterator[datetime]:
+    """Yields occurrence start times for `rule` beginning at `start`
+    until the window ends or the rule's COUNT or UNTIL is reached.
+
+    Raises
+    - ValueError for rules that can't be expanded
+    """
+    unsupported = set(rule) - RULE_PARTS
+    if unsupported:
+        raise ValueError(f"Unsupported RRULE parts: {', '.join(sorted(unsupported))}")
+
+    freq = rule.get("FREQ")
+    interval = int(rule.get("INTERVAL", 1))
+    count = int(rule["COUNT"]) if "COUNT" in rule else None
+    until = None
+    if "UNTIL" in rule:
+        until = parse_datetime(rule["UNTIL"], {})[0].timestamp()
+    byday = _byday(rule["BYDAY"]) if "BYDAY" in rule else None
+
+    if interval < 1:
+        raise ValueError(f"Bad INTERVAL: {interval}")
+    if byday and freq in ("DAILY", "WEEKLY") and any(o for o, _ in byday):
+        raise ValueError(f"BYDAY ordinals need FREQ=MONTHLY, got {freq}")
+    if byday and freq == "YEARLY":
+        raise ValueError("Unsupported RRULE: BYDAY with FREQ=YEARLY")
+
+    weekdays = sorted({day for _, day in byday or []})
+    anchor = start
+    if freq == "DAILY":
+        step = timedelta(days=interval)
+    elif freq == "WEEKLY":
+        step = timedelta(weeks=interval)
+        if byday:
+            anchor = start - timedelta(days=start.weekday())
+    elif freq in ("MONTHLY", "YEARLY"):
+        step = None
+        interval *= 12 if freq == "YEARLY" else 1
+        if byday:
+            anchor = start.replace(day=1)
+    else:
+        raise ValueError(f"Unsupported RRULE FREQ: {freq}")
+
+    def candidates(base: datetime) -> List[datetime]:
+        if not byday:
+            return [base]
+        if freq == "DAILY":
+            return [base] if base.weekday() in weekdays else []
+        if freq == "WEEKLY":
+            return [base + timedelta(days=day) for day in weekdays]
+        days = _month_days(base.year, base.month, byday)
+        return [base.replace(day=day) for day in days]
+
+    period = 0
+    if step and count is None:
+        # Skip whole periods that end before the window without generating
+        # them, events with years of history stay cheap to expand.
+        period = max(
+            0, int((window_start - start.timestamp()) / step.total_seconds()) - 1
+        )
+
+    produced = 0
+    while True:
+        base = (
+            anchor + step * period if step else _add_months(anchor, period * interval)
+        )
+        period += 1
+        if base is None:
+            continue
+        if base.timestamp() >= window_end:
+            return
+        for occurrence in candidates(base):
+            if occurrence < start:
+                continue
+            if until is not None and occurrence.timestamp() > until:
+                return
+            if count is not None:
+                if produced >= count:
+                    return
+                produced += 1
+            yield occurrence
+
+
+def parse_ics(text: str, window_start: float, window_end: float) -> List[Interval]:
+    """Returns the busy intervals described by the VEVENTs in `text` that
+    overlap the window from `window_start` to `window_end`, POSIX
+    timestamps. Recurring events are expanded within the window,
+    instances overridden by a RECURRENCE-ID event are replaced by it and
+    transparent and cancelled events are ignored. Events that can't be
+    expanded are logged and skipped.
+
+    :param text: str iCalendar data
+    :param window_start: float
+    :param window_end: float
+    """
+    events = []
+    event = None
+
+    for name, params, value in _properties(text):
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event = {"EXDATE": []}
+            continue
+        if event is None:
+            continue
+        if name == "END" and value.upper() == "VEVENT":
+            events.append(event)
+            event = None
+        elif name == "EXDATE":
+            event[name].extend((item, params) for item in value.split(","))
+        elif name in ("DTSTART", "DTEND", "RECURRENCE-ID"):
+            event[name] = (value, params)
+        elif name == "RRULE":
+            parts = [p for p in value.upper().split(";") if p]
+            event[name] = dict(p.partition("=")[::2] for p in parts)
+        else:
+            event[name] = value
+
+    # Instances moved or cancelled by an override are excluded from the
+    # recurring event like EXDATEs; the overrides are expanded on their own.
+    overridden: Dict[str, List[Tuple[str, Dict[str, str]]]] = {}
+    for event in events:
+        if "RECURRENCE-ID" in event and event.get("UID"):
+            value, params = event["RECURRENCE-ID"]
+            if params.get("RANGE", "").upper() == "THISANDFUTURE":
+                logger.warning(
+                    f"Event {event.get('SUMMARY')!r} overrides future instances, "
+                    "only the first is replaced"
+                )
+            overridden.setdefault(event["UID"], []).append((value, params))
+
+    intervals = []
+    for event in events:
+        if "RECURRENCE-ID" not in event:
+            event["EXDATE"].extend(overridden.get(event.get("UID"), []))
+        try:
+            intervals.extend(_expand(event, window_start, window_end))
+        except (KeyError, TypeError, ValueError) as error:
+            logger.warning(f"Ignoring event {event.get('SUMMARY')!r}: {error}")
+
+    return intervals
+
+
+def _expand(event: Dict[str, Any], window_start: float, window_end: float):
+    if event.get("TRANSP", "").upper() == "TRANSPARENT":
+        return
+    if event.get("STATUS", "").upper() == "CANCELLED":
+        return
+
+    start, all_day = parse_datetime(*event["DTSTART"])
+    exdates = {parse_datetime(*item)[0].timestamp() for item in event["EXDATE"]}
+    if "DTEND" in event:
+        duration = parse_datetime(*event["DTEND"])[0] - start
+    elif "DURATION" in event:
+        duration = parse_duration(event["DURATION"])
+    else:
+        duration = timedelta(days=1) if all_day else timedelta(0)
+
+    summary = event.get("SUMMARY", "")
+    rule = event.get("RRULE")
+    if rule and "RECURRENCE-ID" in event:
+        rule = None
+    starts = _occurrences(start, rule, window_start, window_end) if rule else [start]
+
+    for occurrence in starts:
+        begin = occurrence.timestamp()
+        if begin in exdates:
+            continue
+        end = (occurrence + duration).timestamp()
+        if end > window_start and begin < window_end and end > begin:
+            yield Interval(begin, end, summary)
+
+
+class IntervalTree:
+    """A static centered interval tree answering which intervals
+    contain a point in O(log n + m), plus a sorted index of interval
+    boundaries for finding the next change after a point.
+    """
+
+    def __init__(self, intervals: List[Interval] = None):
+        intervals = list(intervals or [])
+        self.size = len(intervals)
+        self.boundaries = sorted({t for iv in intervals for t in iv[:2]})
+        self._root = self._build(intervals)
+
+    def _build(self, intervals: List[Interval]):
+        if not intervals:
+            return None
+        starts = sorted(iv.start for iv in intervals)
+        center = starts[len(starts) // 2]
+        left, here, right = [], [], []
+        for iv in intervals:
+            if iv.end <= center:
+                left.append(iv)
+            elif iv.start > center:
+                right.append(iv)
+            else:
+                here.append(iv)
+        return (
+            center,
+            sorted(here, key=lambda iv: iv.start),
+            sorted(here, key=lambda iv: iv.end, reverse=True),
+            self._build(left),
+            self._build(right),
+        )
+
+    def at(self, t: float) -> List[Interval]:
+        """Returns the intervals containing `t`.
+
+        :param t: float
+        """
+        found = []
+        node = self._root
+        while node:
+            center, by_start, by_end, left, right = node
+            if t < center:
+                for iv in by_start:
+                    if iv.start > t:
+                        break
+                    found.append(iv)
+                node = left
+            else:
+                for iv in by_end:
+                    if iv.end <= t:
+                        break
+                    found.append(iv)
+                node = right
+        return found
+
+    def next_boundary(self, t: float) -> Optional[float]:
+        """Returns the first interval start or end after `t`, or None.
+
+        :param t: float
+        """
+        index = bisect_right(self.boundaries, t)
+        return self.boundaries[index] if index < len(self.boundaries) else None
+
+
+class CalendarSchedule:
+    """Tracks busy intervals from a set of .ics files and applies a busy
+    or free state to a light at each event boundary.
+
+    >>> schedule = CalendarSchedule(["work.ics", "oncall.ics"])
+    >>> schedule.run(light, {"color": (255, 0, 0), "on": 1}, {"on": 0})
+
+    The schedule wakes at transitions: event boundaries and the point
+    where recurring events must be re-expanded because the schedule
+    nears the end of its expansion window. Between transitions it wakes
+    at least every `reload_interval` seconds to check its files, which
+    are only re-parsed when their modification time changes, so newly
+    added events take effect within one reload interval.
+    """
+
+    def __init__(
+        self,
+        paths: List[Path],
+        horizon: float = 30 * 86400,
+        clock: Clock = WALL_CLOCK,
+    ):
+        """
+        :param paths: list of .ics file paths
+        :param horizon: float seconds ahead of now to expand recurrences
+        :param clock: Clock reading POSIX time
+        """
+        self.paths = [Path(path) for path in paths]
+        self.horizon = horizon
+        self.clock = clock
+        self.tree = IntervalTree()
+        self.window = (0.0, 0.0)
+        self._files: Dict[Path, Tuple[int, List[Interval]]] = {}
+
+    def reload(self) -> bool:
+        """Re-parses files that changed since the last reload, or every
+        file when the expansion window needs to move forward, and rebuilds
+        the interval tree. Returns True if the tree was rebuilt.
+        """
+        now = self.clock.now()
+        if now >= self.refresh_time:
+            self.window = (now - 86400, now + self.horizon)
+            self._files.clear()
+
+        changed = False
+        for path in self.paths:
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError as error:
+                if self._files.pop(path, None):
+                    changed = True
+                logger.warning(f"Skipping {path}: {error}")
+                continue
+            cached = self._files.get(path)
+            if cached and cached[0] == mtime:
+                continue
+            self._files[path] = (mtime, parse_ics(path.read_text(), *self.window))
+            changed = True
+
+        if changed:
+            intervals = [iv for _, ivs in self._files.values() for iv in ivs]
+            self.tree = IntervalTree(intervals)
+            logger.info(
+                f"Loaded {len(intervals)} intervals from {len(self._files)} files"
+            )
+        return changed
+
+    @property
+    def refresh_time(self) -> float:
+        """POSIX time after which reload() moves the expansion window."""
+        return self.window[1] - self.horizon / 2
+
+    def next_transition(self, t: float) -> float:
+        """Returns the first event boundary after `t`, or the refresh time
+        if it is sooner or there are no more boundaries.
+
+        :param t: float
+        """
+        boundary = self.tree.next_boundary(t)
+        if boundary is None:
+            return self.refresh_time
+        return min(boundary, self.refresh_time)
+
+    def busy(self, t: float = None) -> List[Interval]:
+        """Returns the events in progress at `t`, default now."""
+        return self.tree.at(self.clock.now() if t is None else t)
+
+    def run(
+        self,
+        light,
+        busy_state: Dict[str, Any],
+        free_state: Dict[str, Any],
+        reload_interval: float = 60.0,
+        until: float = None,
+    ) -> None:
+        """Applies `busy_state` or `free_state` to `light` whenever the
+        schedule changes and sleeps until the next transition, but no
+        longer than `reload_interval` seconds, reloading changed files
+        when it wakes. Runs forever unless `until`, a POSIX time, is given.
+
+        :param light: BlyncLight
+        :param busy_state: Dict[str, Any] for BlyncLight.apply()
+        :param free_state: Dict[str, Any] for BlyncLight.apply()
+        :param reload_interval: float maximum seconds between file checks
+        :param until: optional float
+        """
+        current = None
+        while True:
+            self.reload()
+            now = self.clock.now()
+            if until is not None and now >= until:
+                return
+            state = busy_state if self.busy(now) else free_state
+            if state is not current:
+                light.apply(**state)
+                current = state
+            wakeup = min(self.next_transition(now), now + reload_interval)
+            if until is not None:
+                wakeup = min(wakeup, until)
+            self.clock.sleep_until(wakeup)
@@ -0,0 +1,188 @@
+"""Light Index and Aliases
+
+Light ids are positions in the list returned by available_lights(),
+which can change order between boots and replugs, and every lookup by
+id enumerates the HID bus. A LightIndex remembers the vendor id,
+product id, serial number and HID path of lights it has seen and maps
+names chosen by the user to serial numbers, so a known light is opened
+directly by its path without enumerating.
+
+>>> index = LightIndex()
+>>> index.alias("desk", "A1B2C3")
+>>> light = index.open("desk")
+
+Lights can be opened by alias, serial number or HID path. The bus is
+only enumerated when a name isn't in the index, and the index is
+updated with what was found.
+
+The index is stored in lights.json in $XDG_STATE_HOME/blynclight, or
+~/.local/state/blynclight if XDG_STATE_HOME is not set.
+"""
+
+import json
+import os
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from .blynclight import BlyncLight
+from .exceptions import BlyncLightNotFound
+from .state import StateCache, default_state_dir
+
+
+class LightIndex:
+    """Known lights keyed by serial number and aliases for them, stored
+    in a JSON file.
+    """
+
+    def __init__(self, path: Path = None):
+        """
+        :param path: optional Path, defaults to lights.json in
+                     default_state_dir()
+        """
+        self.path = Path(path) if path else default_state_dir() / "lights.json"
+        self._aliases: Dict[str, str] = None
+        self._lights: Dict[str, Dict[str, Any]] = None
+
+    def load(self) -> None:
+        """Reads the aliases and lights from the file once."""
+        if self._lights is not None:
+            return
+        self._aliases, self._lights = {}, {}
+        try:
+            data = json.loads(self.path.read_text())
+            self._aliases.update(data.get("aliases", {}))
+            self._lights.update(data.get("lights", {}))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as error:
+            logger.warning(f"Ignoring light index {self.path}: {error}")
+
+    def save(self) -> None:
+        """Rewrites the file. Failures are logged and otherwise ignored."""
+        self.load()
+        data = {"aliases": self._aliases, "lights": self._lights}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+            tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+            os.replace(tmp, self.path)
+        except OSError as error:
+            logger.warning(f"Failed to save light index {self.path}: {error}")
+
+    @property
+    def aliases(self) -> Dict[str, str]:
+        """Serial numbers keyed by alias."""
+        self.load()
+        return dict(self._aliases)
+
+    @property
+    def lights(self) -> Dict[str, Dict[str, Any]]:
+        """Known lights keyed by serial number."""
+        self.load()
+        return dict(self._lights)
+
+    def alias(self, name: str, serial_number: str) -> None:
+        """Makes `name` refer to the light with `serial_number`.
+
+        :param name: str
+        :param serial_number: str
+        """
+        self.load()
+        self._aliases[name] = serial_number
+        self.save()
+
+    def unalias(self, name: str) -> bool:
+        """Removes the alias `name` and returns True if it existed.
+
+        :param name: str
+        """
+        self.load()
+        if self._aliases.pop(name, None) is None:
+            return False
+        self.save()
+        return True
+
+    def resolve(self, name: str) -> str:
+        """Returns the serial number `name` is an alias for, or name.
+
+        :param name: str alias, serial number or HID path
+        """
+        self.load()
+        return self._aliases.get(name, name)
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Returns a dictionary like those from available_lights() for the
+        known light called `name`, or None. Doesn't enumerate.
+
+        :param name: str alias, serial number or HID path
+        """
+        self.load()
+        key = self.resolve(name)
+        entry = self._lights.get(key)
+        if entry is None:
+            for known in self._lights.values():
+                if known.get("path") == key:
+                    entry = known
+                    break
+            else:
+                return None
+        info = dict(entry)
+        if info.get("path"):
+            info["path"] = os.fsencode(info["path"])
+        return info
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """Enumerates the lights, records them in the index and returns
+        available_lights(). Lights that are no longer attached, including
+        lights without serial numbers recorded under an old HID path, are
+        forgotten; aliases are kept.
+        """
+        self.load()
+        lights = BlyncLight.available_lights()
+        self._lights.clear()
+        for info in lights:
+            key = BlyncLight._key(
+                info["vendor_id"],
+                info["product_id"],
+                info.get("serial_number"),
+                info.get("path"),
+            )
+            path = info.get("path")
+            self._lights[key] = {
+                "vendor_id": info["vendor_id"],
+                "product_id": info["product_id"],
+                "serial_number": info.get("serial_number") or None,
+                "path": os.fsdecode(path) if path else None,
+            }
+        self.save()
+        return lights
+
+    def open(
+        self,
+        name: str,
+        immediate: bool = True,
+        state_cache: StateCache = None,
+        resilient: bool = False,
+    ) -> BlyncLight:
+        """Returns the shared BlyncLight called `name`, enumerating only if
+        the index doesn't know it. See BlyncLight.get_light() for the
+        remaining arguments.
+
+        :param name: str alias, serial number or HID path
+        :param immediate: bool
+        :param state_cache: optional StateCache
+        :param resilient: bool
+
+        Raises
+        - BlyncLightNotFound
+        """
+        info = self.lookup(name)
+        if info is None or not info.get("path"):
+            self.refresh()
+            info = self.lookup(name)
+        if info is None:
+            raise BlyncLightNotFound(f"Light not found: {name}")
+        return BlyncLight.get_light_for(info, immediate, state_cache, resilient)
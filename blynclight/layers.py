@@ -0,0 +1,178 @@
+"""Priority Layered Light State
+
+Several clients can share a light by each holding a layer in a
+StateStack: a light state with a priority and an optional time to
+live. The light shows the state of the highest priority layer that
+hasn't expired, the most recently set layer winning ties, and falls
+back to a default state when no layers are active.
+
+>>> stack = StateStack(light)
+>>> stack.set("presence", priority=0, color="green", on=1)
+>>> stack.set("oncall", priority=10, ttl=300, color="red", flash=3)
+>>> stack.clear("oncall")
+
+Layers are kept in a heap ordered by priority, so setting, clearing and
+expiring a layer is O(log n). Replaced and cleared layers are left in
+the heap and discarded when they reach the top. The light is written
+only when the effective command word changes.
+"""
+
+import heapq
+import itertools
+import threading
+
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .blynclight import BlyncLight
+from .clock import SYSTEM_CLOCK, Clock
+
+
+class Layer(NamedTuple):
+    """A client's requested light state."""
+
+    client: str
+    priority: int
+    frame: bytes
+    expires: Optional[float]
+    serial: int
+
+
+class StateStack:
+    """Arbitrates the state of one light between prioritized clients."""
+
+    def __init__(
+        self,
+        light: BlyncLight,
+        default: bytes = None,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        """
+        :param light: BlyncLight
+        :param default: optional command word shown when no layer is
+                        active, defaults to the light switched off
+        :param clock: Clock
+        """
+        self.light = light
+        self.default = default or BlyncLight.command_word()
+        self.clock = clock
+        self.layers: Dict[str, Layer] = {}
+        self.written: Optional[bytes] = None
+        self.writes = 0
+        self._heap: List[Tuple[int, int, Layer]] = []
+        self._expiries: List[Tuple[float, int, Layer]] = []
+        self._serial = itertools.count()
+        self._lock = threading.Lock()
+
+    def set(
+        self, client: str, priority: int = 0, ttl: float = None, **fields: Any
+    ) -> bool:
+        """Sets the layer of `client` to the state described by `fields`,
+        replacing its previous layer, and returns True if the light was
+        written. Fields are BlyncLight attributes; colors may be given
+        by name and the light is switched on unless on or off is given.
+
+        :param client: str
+        :param priority: int, higher priorities win
+        :param ttl: optional float seconds until the layer expires
+
+        Raises
+        - ValueError for fields that don't describe a light state
+        """
+        frame = BlyncLight.state_word(**fields)
+        return self.set_frame(client, frame, priority, ttl)
+
+    def set_frame(
+        self, client: str, frame: bytes, priority: int = 0, ttl: float = None
+    ) -> bool:
+        """Sets the layer of `client` to a precompiled command word, for
+        example a scene, and returns True if the light was written.
+
+        :param client: str
+        :param frame: bytes command word
+        :param priority: int, higher priorities win
+        :param ttl: optional float seconds until the layer expires
+        """
+        expires = self.clock.now() + ttl if ttl is not None else None
+        with self._lock:
+            layer = Layer(client, priority, frame, expires, next(self._serial))
+            self.layers[client] = layer
+            heapq.heappush(self._heap, (-priority, -layer.serial, layer))
+            if expires is not None:
+                heapq.heappush(self._expiries, (expires, layer.serial, layer))
+            self._compact()
+            return self._refresh()
+
+    def clear(self, client: str) -> bool:
+        """Removes the layer of `client`, if any, and returns True if the
+        light was written.
+
+        :param client: str
+        """
+        with self._lock:
+            if self.layers.pop(client, None) is None:
+                return False
+            return self._refresh()
+
+    def refresh(self) -> bool:
+        """Expires layers whose time to live has passed and writes the
+        effective state if it changed. Returns True if the light was
+        written. Call it at next_expiry() to honor TTLs promptly.
+        """
+        with self._lock:
+            return self._refresh()
+
+    def top(self) -> Optional[Layer]:
+        """Returns the active layer with the highest priority or None."""
+        with self._lock:
+            self._expire()
+            return self._top()
+
+    def effective(self) -> bytes:
+        """Returns the command word the light should be showing."""
+        layer = self.top()
+        return layer.frame if layer else self.default
+
+    def next_expiry(self) -> Optional[float]:
+        """Returns the seconds until the next layer expires, or None if no
+        active layer has a time to live.
+        """
+        with self._lock:
+            while self._expiries and not self._current(self._expiries[0][2]):
+                heapq.heappop(self._expiries)
+            if not self._expiries:
+                return None
+            return max(0.0, self._expiries[0][0] - self.clock.now())
+
+    def _current(self, layer: Layer) -> bool:
+        return self.layers.get(layer.client) is layer
+
+    def _expire(self) -> None:
+        now = self.clock.now()
+        while self._expiries and self._expiries[0][0] <= now:
+            _, _, layer = heapq.heappop(self._expiries)
+            if self._current(layer):
+                del self.layers[layer.client]
+
+    def _top(self) -> Optional[Layer]:
+        while self._heap and not self._current(self._heap[0][2]):
+            heapq.heappop(self._heap)
+        return self._heap[0][2] if self._heap else None
+
+    def _compact(self) -> None:
+        """Rebuilds the heaps when stale entries outnumber active layers."""
+        if len(self._heap) > 2 * len(self.layers) + 16:
+            self._heap = [entry for entry in self._heap if self._current(entry[2])]
+            heapq.heapify(self._heap)
+            self._expiries = [e for e in self._expiries if self._current(e[2])]
+            heapq.heapify(self._expiries)
+
+    def _refresh(self) -> bool:
+        self._expire()
+        layer = self._top()
+        frame = layer.frame if layer else self.default
+        if frame == self.written:
+            return False
+        self.light.write_frame(frame)
+        self.written = frame
+        self.writes += 1
+        return True
@@ -0,0 +1,212 @@
+"""OpenMetrics Textfile Exporter for BlyncLights
+
+Periodically writes an OpenMetrics text file describing the activity
+and state of every shared BlyncLight, suitable for the node_exporter
+textfile collector:
+
+>>> exporter = MetricsExporter("/var/lib/node_exporter/blynclight.prom")
+>>> exporter.start()
+
+Each light's samples are labelled with its serial number, or its HID
+path for lights without one, so lights of the same model are exported
+separately.
+
+Write counts, errors and latencies are gathered incrementally by an
+on_after_write hook attached to each light, so producing the file only
+formats counters and sorts a bounded window of recent latencies.
+The file is replaced atomically so the collector never reads a
+partial export.
+"""
+
+import os
+import threading
+
+from collections import deque
+from pathlib import Path
+from time import monotonic
+from typing import Dict, List, Tuple
+
+from loguru import logger
+
+from .blynclight import BlyncLight
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _label_value(value: str) -> str:
+    """Returns `value` escaped for use in an OpenMetrics label."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class LightMetrics:
+    """Accumulates write activity for a single light. Instances are
+    on_after_write hooks.
+    """
+
+    def __init__(self, window: int = 1024):
+        """
+        :param window: int number of recent write latencies kept, or
+                       None to keep every latency
+        """
+        self.writes = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latencies = deque(maxlen=window)
+        self._last_writes = 0
+        self._last_time = monotonic()
+
+    def __call__(self, frame: bytes, elapsed: float, result) -> None:
+        self.writes += 1
+        self.latency_sum += elapsed
+        self.latencies.append(elapsed)
+        if isinstance(result, Exception) or (isinstance(result, int) and result < 0):
+            self.errors += 1
+
+    def rate(self) -> float:
+        """Returns writes per second since the previous call."""
+        now = monotonic()
+        writes = self.writes
+        elapsed = now - self._last_time
+        rate = (writes - self._last_writes) / elapsed if elapsed > 0 else 0.0
+        self._last_writes, self._last_time = writes, now
+        return rate
+
+    def quantiles(self, quantiles: Tuple[float, ...] = QUANTILES) -> Dict[float, float]:
+        """Returns latency quantiles over the recent write window.
+
+        :param quantiles: optional tuple of quantiles, defaults to QUANTILES
+        """
+        samples = sorted(self.latencies)
+        if not samples:
+            return {}
+        last = len(samples) - 1
+        return {q: samples[min(last, int(q * len(samples)))] for q in quantiles}
+
+
+class MetricsExporter:
+    """Writes an OpenMetrics text file for a collection of lights.
+
+    Lights returned by BlyncLight.get_light() are picked up
+    automatically; other lights can be added with attach().
+    """
+
+    def __init__(self, path: Path, interval: float = 1.0):
+        """
+        :param path: Path of the text file to write, e.g. blynclight.prom
+        :param interval: float seconds between exports
+        """
+        self.path = Path(path)
+        self.interval = interval
+        # Lights and their metrics keyed by BlyncLight.key
+        self.metrics: Dict[str, Tuple[BlyncLight, LightMetrics]] = {}
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def attach(self, light: BlyncLight) -> LightMetrics:
+        """Starts collecting metrics for `light` and returns its
+        LightMetrics. Attaching a light twice is harmless.
+
+        :param light: BlyncLight
+        """
+        try:
+            return self.metrics[light.key][1]
+        except KeyError:
+            pass
+        metrics = LightMetrics()
+        self.metrics[light.key] = (light, metrics)
+        light.add_hook("on_after_write", metrics)
+        return metrics
+
+    def detach(self, light: BlyncLight) -> None:
+        """Stops collecting metrics for `light`.
+
+        :param light: BlyncLight
+        """
+        _, metrics = self.metrics.pop(light.key, (None, None))
+        if metrics:
+            light.remove_hook("on_after_write", metrics)
+
+    def collect(self) -> str:
+        """Returns the current metrics in OpenMetrics text format."""
+
+        for light in BlyncLight.shared_lights():
+            self.attach(light)
+
+        families = {
+            "writes": ("counter", "Writes to the device.", []),
+            "write_errors": ("counter", "Failed writes to the device.", []),
+            "write_rate": ("gauge", "Writes per second since last export.", []),
+            "write_latency_seconds": ("summary", "Device write latency.", []),
+            "color": ("gauge", "Color channel value.", []),
+            "on": ("gauge", "One if the light is on.", []),
+            "flash": ("gauge", "One if the light is flashing.", []),
+        }
+
+        for light, metrics in list(self.metrics.values()):
+            label = f'light="{_label_value(light.key)}"'
+            families["writes"][2].append(f"_total{{{label}}} {metrics.writes}")
+            families["write_errors"][2].append(f"_total{{{label}}} {metrics.errors}")
+            families["write_rate"][2].append(f"{{{label}}} {metrics.rate():.3f}")
+            samples = families["write_latency_seconds"][2]
+            for q, value in metrics.quantiles().items():
+                samples.append(f'{{{label},quantile="{q}"}} {value:.9f}')
+            samples.append(f"_count{{{label}}} {metrics.writes}")
+            samples.append(f"_sum{{{label}}} {metrics.latency_sum:.9f}")
+            for channel in ["red", "blue", "green"]:
+                value = getattr(light, channel)
+                families["color"][2].append(f'{{{label},channel="{channel}"}} {value}')
+            families["on"][2].append(f"{{{label}}} {light.on}")
+            families["flash"][2].append(f"{{{label}}} {light.flash}")
+
+        lines: List[str] = []
+        for name, (kind, help, samples) in families.items():
+            lines.append(f"# TYPE blynclight_{name} {kind}")
+            lines.append(f"# HELP blynclight_{name} {help}")
+            lines.extend(f"blynclight_{name}{sample}" for sample in samples)
+
+        lines.append("# TYPE blynclight_enumeration_seconds gauge")
+        lines.append(
+            "# HELP blynclight_enumeration_seconds Duration of the last enumeration."
+        )
+        lines.append(
+            f"blynclight_enumeration_seconds {BlyncLight.enumeration_seconds:.9f}"
+        )
+        lines.append("# EOF")
+
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Writes the current metrics to a temporary file and atomically
+        renames it over the export path.
+        """
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+        tmp.write_text(self.collect())
+        os.replace(tmp, self.path)
+
+    def start(self) -> None:
+        """Starts exporting every `interval` seconds on a daemon thread."""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._export_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the export thread after writing a final export."""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _export_forever(self) -> None:
+        self._export()
+        while not self._stopped.wait(self.interval):
+            self._export()
+        self._export()
+
+    def _export(self) -> None:
+        # Any failure is logged so the export thread keeps running.
+        try:
+            self.write()
+        except OSError as error:
+            logger.error(f"Failed to export metrics to {self.path}: {error}")
+        except Exception:
+            logger.exception(f"Failed to export metrics to {self.path}")
@@ -298,10 +298,12 @@ class BlyncLight(Structure):
         if name not in self.commands:
             return
 
-        logger.trace(f"{name}={value} immediate {self.immediate}")
+        logger.trace("{}={} immediate {}", name, value, self.immediate)
 
         if self.immediate:
-            logger.trace(f"bytes: {[hex(x) for x in self.bytes]}")
+            logger.opt(lazy=True).trace(
+                "bytes: {}", lambda: [hex(x) for x in self.bytes]
+            )
             n = self.device.write(self.bytes)
             if n != len(self.bytes):
                 raise IOError(f"Wrote {n} bytes, expected {len(self.bytes)} bytes")
@@ -0,0 +1,128 @@
+"""Effect Plugins for the blync Command
+
+Packages add effects to `blync` by declaring an entry point in the
+"blynclight.effects" group:
+
+    [tool.poetry.plugins."blynclight.effects"]
+    sparkle = "blync_sparkle:sparkle"
+
+The effect runs as `blync sparkle` and receives the light selected by
+the root command's options in ctx.obj, like the builtin effects. The
+entry point may name a function, which is turned into a command with
+typer, a typer.Typer application or a click.Command.
+
+Entry point metadata is only read when `blync` lists its commands or
+is asked for a command that isn't builtin, and a plugin's module is
+imported when its effect is invoked, so installing many plugins doesn't
+slow down the builtin commands.
+"""
+
+from functools import lru_cache
+from typing import Dict, List
+
+import typer
+
+from loguru import logger
+
+ENTRY_POINT_GROUP = "blynclight.effects"
+
+
+@lru_cache()
+def effect_entry_points() -> Dict[str, object]:
+    """Returns the effect entry points of installed packages keyed by
+    effect name. The plugin modules are not imported.
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        try:
+            from importlib_metadata import entry_points
+        except ImportError:
+            return {}
+    try:
+        found = entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # Python < 3.10
+        found = entry_points().get(ENTRY_POINT_GROUP, [])
+    return {entry_point.name: entry_point for entry_point in found}
+
+
+def load_effect(entry_point) -> typer.core.TyperCommand:
+    """Imports the object named by `entry_point` and returns it as a
+    command.
+
+    :param entry_point: importlib.metadata.EntryPoint
+
+    Raises
+    - TypeError if the entry point doesn't name a usable object
+    """
+    effect = entry_point.load()
+
+    if hasattr(effect, "make_context"):
+        return effect
+
+    if isinstance(effect, typer.Typer):
+        return typer.main.get_command(effect)
+
+    if callable(effect):
+        app = typer.Typer(add_completion=False)
+        app.command(entry_point.name)(effect)
+        return typer.main.get_command(app)
+
+    raise TypeError(f"Effect {entry_point.name} is not callable: {effect!r}")
+
+
+class LazyEffectCommand(typer.core.TyperCommand):
+    """Stands in for an effect plugin in `blync` until the effect is
+    invoked, at which point the plugin is loaded and parses the
+    command line itself.
+    """
+
+    def __init__(self, name: str, entry_point):
+        """
+        :param name: str effect name
+        :param entry_point: importlib.metadata.EntryPoint
+        """
+        dist = getattr(entry_point, "dist", None)
+        origin = f" from {dist.name}" if dist else ""
+        super().__init__(
+            name,
+            help=f"Effect plugin {entry_point.value}{origin}.",
+            context_settings={"ignore_unknown_options": True},
+            add_help_option=False,
+        )
+        self.entry_point = entry_point
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        try:
+            command = load_effect(self.entry_point)
+        except Exception as error:
+            typer.secho(f"Failed to load effect {self.name}: {error}", fg="red")
+            raise typer.Exit(code=1) from None
+        return command.make_context(info_name, args, parent=parent, **extra)
+
+
+class EffectGroup(typer.core.TyperGroup):
+    """The `blync` command group, extended with effect plugins found by
+    effect_entry_points(). Builtin subcommands take precedence over
+    plugins with the same name, and entry points are only scanned for
+    names that aren't builtin.
+    """
+
+    def list_commands(self, ctx: typer.Context) -> List[str]:
+        builtin = super().list_commands(ctx)
+        plugins = []
+        for name in effect_entry_points():
+            if name in builtin:
+                logger.debug(f"Effect plugin {name} hidden by builtin command")
+            else:
+                plugins.append(name)
+        return builtin + sorted(plugins)
+
+    def get_command(self, ctx: typer.Context, name: str) -> typer.core.TyperCommand:
+        command = super().get_command(ctx, name)
+        if command is not None:
+            return command
+        entry_point = effect_entry_points().get(name)
+        if entry_point is None:
+            return None
+        return LazyEffectCommand(name, entry_point)
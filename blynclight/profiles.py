@@ -0,0 +1,87 @@
+"""Device Model Profiles
+
+The BlyncLight family shares a command word but not capabilities;
+only some models have a speaker and models differ in how quickly they
+accept updates. A DeviceProfile describes a model and the registry maps
+USB product_ids to profiles. BlyncLight looks up its profile when it is
+created and uses it to mask fields the device doesn't support, correct
+color channels and pace writes.
+
+Unknown product_ids get DEFAULT_PROFILE, which assumes every feature
+and doesn't pace writes, matching the behavior before profiles existed.
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from .constants import DeviceType
+
+
+class DeviceProfile(NamedTuple):
+    """Capabilities of a BlyncLight model.
+
+    name: human readable model name
+    device_type: constants.DeviceType
+    music: True if the model can play its built-in tunes
+    dim: True if the model honors the dim bit
+    max_update_rate: optional writes per second the model sustains
+    calibration: (red, blue, green) scale factors applied to colors
+    """
+
+    name: str
+    device_type: DeviceType = DeviceType.INVALID
+    music: bool = True
+    dim: bool = True
+    max_update_rate: Optional[float] = None
+    calibration: Tuple[float, float, float] = (1.0, 1.0, 1.0)
+
+    @property
+    def min_interval(self) -> float:
+        """Minimum seconds between writes, zero if writes aren't paced."""
+        return 1.0 / self.max_update_rate if self.max_update_rate else 0.0
+
+    @property
+    def calibrated(self) -> bool:
+        """True if colors need correcting before they are written."""
+        return self.calibration != (1.0, 1.0, 1.0)
+
+
+DEFAULT_PROFILE = DeviceProfile("BlyncLight")
+
+# Models are paced to one write per 10ms, the interval of a full-speed
+# USB HID device. Register a profile to override a model's entry.
+PROFILES: Dict[int, DeviceProfile] = {
+    0x0001: DeviceProfile(
+        "BlyncLight V30", DeviceType.V30, music=False, max_update_rate=100
+    ),
+    0x000A: DeviceProfile(
+        "BlyncLight Mini", DeviceType.MINI_V30S, music=False, max_update_rate=100
+    ),
+    0x000C: DeviceProfile(
+        "BlyncLight V30S", DeviceType.V30S, music=False, max_update_rate=100
+    ),
+    0x0010: DeviceProfile(
+        "BlyncLight Plus", DeviceType.V30_LUMENA, music=True, max_update_rate=100
+    ),
+    0x2516: DeviceProfile(
+        "BlyncLight TenX", DeviceType.TENX_20, music=False, max_update_rate=100
+    ),
+}
+
+
+def profile_for(product_id: int) -> DeviceProfile:
+    """Returns the DeviceProfile for `product_id`, or DEFAULT_PROFILE
+    for models without a profile.
+
+    :param product_id: int
+    """
+    return PROFILES.get(product_id, DEFAULT_PROFILE)
+
+
+def register_profile(product_id: int, profile: DeviceProfile) -> None:
+    """Registers `profile` for `product_id`, replacing any existing
+    profile. Lights created afterwards use the new profile.
+
+    :param product_id: int
+    :param profile: DeviceProfile
+    """
+    PROFILES[product_id] = profile
@@ -0,0 +1,93 @@
+"""Background Reconnection of Disconnected Lights
+
+A resilient BlyncLight that fails to write marks itself disconnected
+and keeps accepting changes in memory. A Reconnector thread tries to
+reopen the light, identified by its vendor and product ids, with
+exponential backoff between attempts. When the light reopens, its
+latest in-memory state is written, so changes made while it was
+unplugged aren't lost.
+
+Each disconnected light has its own Reconnector, so lights that are
+still connected never wait on one that isn't.
+"""
+
+import threading
+
+from loguru import logger
+
+
+class Reconnector:
+    """Reopens a disconnected light on a daemon thread.
+
+    >>> reconnector = Reconnector(light)
+    >>> reconnector.start()
+    """
+
+    def __init__(
+        self, light, initial: float = 0.1, maximum: float = 30.0, factor: float = 2.0
+    ):
+        """
+        :param light: BlyncLight
+        :param initial: float seconds before the second attempt
+        :param maximum: float longest seconds between attempts
+        :param factor: float multiplier applied to the delay after each failure
+        """
+        self.light = light
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.attempts = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def alive(self) -> bool:
+        """True while the reconnection thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def attempt(self) -> bool:
+        """Tries once to reopen the light and write its state. Returns
+        True if the light is connected afterwards.
+        """
+        self.attempts += 1
+        try:
+            self.light.reconnect()
+        except Exception as error:
+            logger.debug(f"Reconnect {self.light.identifier} failed: {error}")
+            return False
+        return self.light.connected
+
+    def run(self) -> None:
+        """Attempts to reconnect until the light is connected or stop()
+        is called, doubling the delay between attempts up to `maximum`.
+        """
+        delay = self.initial
+        while not self._stop.is_set():
+            if self.attempt():
+                logger.info(
+                    f"Reconnected {self.light.identifier} "
+                    f"after {self.attempts} attempts"
+                )
+                return
+            self._stop.wait(delay)
+            delay = min(delay * self.factor, self.maximum)
+
+    def start(self) -> None:
+        """Starts reconnecting on a daemon thread if not already running."""
+        if self.alive:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, name=f"reconnect-{self.light.identifier}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        """Stops reconnecting and waits for the thread to exit.
+
+        :param timeout: optional float seconds to wait
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
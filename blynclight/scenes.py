@@ -0,0 +1,177 @@
+"""Named Scenes for BlyncLights
+
+A scene is a named light state that is compiled once into the 9-byte
+command word the device understands, so applying a scene is a
+dictionary lookup and a single write. Scenes are defined in an INI
+file, one section per scene:
+
+    [busy]
+    color = red
+
+    [alert-flash-fast]
+    color = red
+    flash = 3
+    dim = 0
+
+Keys are BlyncLight attributes. The color key accepts a name from
+constants.COLORS, "red, blue, green" or a 24-bit integer, and the
+flash key accepts a flash speed like the command-line -f option.
+Scenes turn the light on unless they say otherwise.
+
+The default scene file is $XDG_CONFIG_HOME/blynclight/scenes.ini and
+compiled tables are cached in $XDG_CACHE_HOME/blynclight, keyed by the
+scene file's path, size and modification time, so startup doesn't
+recompile unchanged scenes.
+"""
+
+import configparser
+import hashlib
+import json
+import os
+
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from loguru import logger
+
+from .blynclight import BlyncLight
+from .state import default_cache_dir
+
+
+def default_scenes_path() -> Path:
+    """Returns the scene file loaded by SceneRegistry.default()."""
+    root = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(root) / "blynclight" / "scenes.ini"
+
+
+def _parse_value(name: str, value: str) -> Any:
+    if name != "color":
+        return int(value, 0)
+    if "," in value:
+        return [int(v, 0) for v in value.split(",")]
+    try:
+        return int(value, 0)
+    except ValueError:
+        return value
+
+
+class SceneRegistry:
+    """A table of scene names and their compiled command words.
+
+    >>> scenes = SceneRegistry.load("scenes.ini")
+    >>> light.write_frame(scenes["busy"])
+    """
+
+    _default = None
+
+    def __init__(self, frames: Dict[str, bytes] = None):
+        """
+        :param frames: optional Dict[str, bytes] of compiled scenes
+        """
+        self.frames: Dict[str, bytes] = dict(frames or {})
+
+    def __getitem__(self, name: str) -> bytes:
+        try:
+            return self.frames[name]
+        except KeyError:
+            raise KeyError(f"Unknown scene: {name}") from None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.frames
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.frames)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def add(self, name: str, **fields: Any) -> bytes:
+        """Compiles `fields` into a command word stored as scene `name`
+        and returns the command word.
+
+        >>> scenes.add("free", color="green")
+
+        Raises
+        - ValueError for fields that don't describe a light state
+        """
+        try:
+            frame = BlyncLight.state_word(**fields)
+        except ValueError as error:
+            raise ValueError(f"Bad scene {name}: {error}") from None
+        self.frames[name] = frame
+        return frame
+
+    @classmethod
+    def compile(cls, path: Path) -> "SceneRegistry":
+        """Returns a registry compiled from the scene file at `path`.
+
+        :param path: Path
+
+        Raises
+        - OSError if the file can't be read
+        - ValueError for malformed scenes
+        """
+        parser = configparser.ConfigParser(interpolation=None)
+        if not parser.read(path):
+            raise FileNotFoundError(path)
+
+        registry = cls()
+        for name in parser.sections():
+            try:
+                fields = {k: _parse_value(k, v) for k, v in parser[name].items()}
+            except ValueError as error:
+                raise ValueError(f"Bad scene {name}: {error}") from None
+            registry.add(name, **fields)
+        return registry
+
+    @classmethod
+    def load(cls, path: Path, cache_dir: Path = None) -> "SceneRegistry":
+        """Returns a registry for the scene file at `path`, using a
+        compiled table from `cache_dir` if the file hasn't changed since
+        it was cached and refreshing the cache otherwise.
+
+        :param path: Path
+        :param cache_dir: optional Path, defaults to default_cache_dir()
+
+        Raises
+        - OSError if the file can't be read
+        - ValueError for malformed scenes
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        key = [str(path), stat.st_size, stat.st_mtime_ns]
+        digest = hashlib.sha1(str(path).encode()).hexdigest()[:16]
+        cache = Path(cache_dir or default_cache_dir()) / f"scenes-{digest}.json"
+
+        try:
+            cached = json.loads(cache.read_text())
+            if cached["key"] == key:
+                frames = cached["frames"]
+                return cls({name: bytes.fromhex(word) for name, word in frames.items()})
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        registry = cls.compile(path)
+
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache.with_name(f".{cache.name}.{os.getpid()}")
+            frames = {name: frame.hex() for name, frame in registry.frames.items()}
+            tmp.write_text(json.dumps({"key": key, "frames": frames}))
+            os.replace(tmp, cache)
+        except OSError as error:
+            logger.warning(f"Failed to cache scenes in {cache}: {error}")
+
+        return registry
+
+    @classmethod
+    def default(cls) -> "SceneRegistry":
+        """Returns the registry for default_scenes_path(), loaded once
+        per process. The registry is empty if the file doesn't exist.
+        """
+        if cls._default is None:
+            try:
+                cls._default = cls.load(default_scenes_path())
+            except FileNotFoundError:
+                cls._default = cls()
+        return cls._default
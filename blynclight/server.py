@@ -0,0 +1,276 @@
+"""Local HTTP Control Endpoint for BlyncLights
+
+A small HTTP/1.1 server built on asyncio streams that lets other
+processes on the host (CI jobs, paging webhooks) change the state of
+already open lights without paying for CLI startup, enumeration and
+reset on every event.
+
+    PUT /lights/{id}   JSON object of BlyncLight attributes to assign
+    GET /lights/{id}   JSON object of the light's status
+    GET /lights        JSON object of every light's status keyed by id
+
+Updates are not written when they arrive. They are merged into a
+per-light pending state and every `tick` seconds each light with
+pending changes receives exactly one device write, so a burst of
+requests for the same light coalesces into a single write. Device
+writes run on the event loop's default executor so a slow light doesn't
+stall request handling. Connections are kept alive between requests unless the client asks
+otherwise.
+"""
+
+import asyncio
+import json
+
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from .blynclight import BlyncLight
+
+MAX_BODY_LENGTH = 64 * 1024
+
+
+class LightServer:
+    """Serves HTTP requests that update the state of a collection
+    of open BlyncLights.
+
+    >>> server = LightServer({0: BlyncLight.get_light()})
+    >>> asyncio.run(server.serve_forever("127.0.0.1", 8000))
+    """
+
+    def __init__(self, lights: Dict[int, BlyncLight], tick: float = 0.05):
+        """
+        :param lights: Dict[int, BlyncLight] keyed by light id
+        :param tick: float seconds between coalesced device writes
+        """
+        self.lights = dict(lights)
+        self.tick = tick
+        self.pending: Dict[int, Dict[str, Any]] = {}
+        self.requests = 0
+        self.writes = 0
+        self._server = None
+        self._flusher = None
+
+        for light in self.lights.values():
+            light.immediate = False
+
+    def submit(self, light_id: int, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Merges `fields` into the pending state for `light_id` and
+        returns the merged pending state. Later values for a field replace
+        earlier ones and move to the end of the pending state so fields
+        are applied in the order they were last requested.
+
+        :param light_id: int
+        :param fields: Dict[str, Any]
+
+        Raises
+        - KeyError if light_id is not served
+        - ValueError if fields are not valid light attributes
+        """
+        if light_id not in self.lights:
+            raise KeyError(light_id)
+
+        fields = BlyncLight.validate(fields)
+        pending = self.pending.setdefault(light_id, {})
+        for name, value in fields.items():
+            pending.pop(name, None)
+            pending[name] = value
+        return pending
+
+    def flush(self) -> int:
+        """Writes the pending state of each light to the device, one
+        write per light, and returns the number of lights written.
+        """
+        pending, self.pending = self.pending, {}
+        return self._apply(pending)
+
+    async def flush_async(self) -> int:
+        """Takes the pending state of each light and writes it to the
+        device in the event loop's default executor, returning the number
+        of lights written. Requests arriving during the writes are merged
+        into a new pending state.
+        """
+        pending, self.pending = self.pending, {}
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._apply, pending)
+
+    def _apply(self, pending: Dict[int, Dict[str, Any]]) -> int:
+        written = 0
+        for light_id, fields in pending.items():
+            light = self.lights[light_id]
+            try:
+                light.apply(**fields)
+                written += 1
+            except Exception as error:
+                logger.error(f"Failed to update light {light_id}: {error}")
+        self.writes += written
+        return written
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000):
+        """Starts listening on `host` and `port` and starts the write
+        coalescing task. Returns the asyncio server object.
+
+        :param host: str
+        :param port: int
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self._flusher = asyncio.ensure_future(self._flush_forever())
+        for sock in self._server.sockets:
+            logger.info(f"Listening on {sock.getsockname()}")
+        return self._server
+
+    async def stop(self) -> None:
+        """Stops listening, cancels the write coalescing task and writes
+        any remaining pending state.
+        """
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        await self.flush_async()
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8000):
+        """Starts the server and serves requests until cancelled.
+
+        :param host: str
+        :param port: int
+        """
+        server = await self.start(host, port)
+        try:
+            await server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _flush_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            if self.pending:
+                await self.flush_async()
+
+    async def _handle(self, reader, writer) -> None:
+        """Reads requests from a single connection until the client
+        closes it or a request asks for the connection to be closed.
+        """
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body, keep_alive = request
+                if isinstance(body, HTTPStatus):
+                    status, payload = body, None
+                    keep_alive = False
+                else:
+                    status, payload = self.dispatch(method, path, body)
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader) -> Optional[Tuple]:
+        """Returns a tuple of (method, path, headers, body, keep_alive) or
+        None if the connection was closed. The body is the HTTPStatus to
+        respond with if the request line is malformed or Content-Length is
+        invalid or exceeds MAX_BODY_LENGTH.
+        """
+        line = await reader.readline()
+        if not line:
+            return None
+
+        try:
+            method, path, version = line.decode("latin-1").split()
+        except ValueError:
+            return None, None, {}, HTTPStatus.BAD_REQUEST, False
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            return method, path, headers, HTTPStatus.BAD_REQUEST, False
+        if length > MAX_BODY_LENGTH:
+            return method, path, headers, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, False
+
+        body = await reader.readexactly(length) if length else b""
+        self.requests += 1
+        return method, path, headers, body, keep_alive
+
+    def dispatch(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Any]:
+        """Routes a single request and returns a tuple of the response
+        status and a JSON serializable payload.
+
+        :param method: str
+        :param path: str
+        :param body: bytes
+        """
+        parts = [part for part in path.split("?")[0].split("/") if part]
+
+        if not parts or parts[0] != "lights" or len(parts) > 2:
+            return HTTPStatus.NOT_FOUND, {"error": f"No such resource: {path}"}
+
+        if len(parts) == 1:
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": method}
+            return (
+                HTTPStatus.OK,
+                {light_id: light.status for light_id, light in self.lights.items()},
+            )
+
+        try:
+            light_id = int(parts[1])
+            light = self.lights[light_id]
+        except (ValueError, KeyError):
+            return HTTPStatus.NOT_FOUND, {"error": f"Light not found: {parts[1]}"}
+
+        if method == "GET":
+            return HTTPStatus.OK, light.status
+
+        if method != "PUT":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": method}
+
+        try:
+            pending = self.submit(light_id, json.loads(body or b"{}"))
+        except ValueError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+
+        return HTTPStatus.ACCEPTED, {"light": light_id, "pending": pending}
+
+    def _write_response(
+        self, writer, status: HTTPStatus, payload: Any, keep_alive: bool
+    ) -> None:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
@@ -0,0 +1,113 @@
+"""Persistent Cache of the Last Command Word Written to a Light
+
+BlyncLights can't report their current state, so a new BlyncLight
+starts from a known "off" state in memory. A StateCache remembers the
+last command word written to each light in a small file per light key,
+letting a new BlyncLight adopt the state the device is already showing
+without writing to it.
+
+Files live in $XDG_STATE_HOME/blynclight, or ~/.local/state/blynclight
+if XDG_STATE_HOME is not set.
+"""
+
+import os
+import re
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from loguru import logger
+
+from .constants import COMMAND_LENGTH, END_OF_COMMAND
+
+
+def default_state_dir() -> Path:
+    """Returns the directory used by StateCache when no path is given."""
+    root = os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state"
+    return Path(root) / "blynclight"
+
+
+def default_cache_dir() -> Path:
+    """Returns the directory for caches that can be rebuilt, such as
+    compiled scenes, effect tables and calibrations.
+    """
+    root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "blynclight"
+
+
+class StateCache:
+    """Stores the last command word written to each light.
+
+    >>> light = BlyncLight.get_light(state_cache=StateCache())
+    """
+
+    def __init__(self, path: Path = None):
+        """
+        :param path: optional directory, defaults to default_state_dir()
+        """
+        self.path = Path(path) if path else default_state_dir()
+        self._fds: Dict[str, int] = {}
+        self._saved: Dict[str, bytes] = {}
+
+    def __del__(self):
+        self.close()
+
+    def filename(self, key: str) -> Path:
+        """Returns the path of the file holding state for `key`.
+
+        :param key: str
+        """
+        return self.path / re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+
+    def load(self, key: str) -> Optional[bytes]:
+        """Returns the last command word saved for `key` or None
+        if there isn't a valid one.
+
+        :param key: str
+        """
+        try:
+            frame = self.filename(key).read_bytes()
+        except OSError:
+            return None
+
+        if len(frame) != COMMAND_LENGTH:
+            return None
+
+        if int.from_bytes(frame[-2:], "big") != END_OF_COMMAND:
+            return None
+
+        self._saved[key] = frame
+        return frame
+
+    def save(self, key: str, frame: bytes) -> None:
+        """Saves `frame` as the last command word written to `key`.
+        Unchanged frames are not rewritten. The file is kept open and
+        overwritten in place, so saving is cheap enough to do after every
+        device write. Failures are logged and otherwise ignored.
+
+        :param key: str
+        :param frame: bytes
+        """
+        if self._saved.get(key) == frame:
+            return
+
+        try:
+            fd = self._fds.get(key)
+            if fd is None:
+                self.path.mkdir(parents=True, exist_ok=True)
+                flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+                fd = os.open(self.filename(key), flags, 0o644)
+                self._fds[key] = fd
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, frame)
+        except OSError as error:
+            logger.warning(f"Failed to save state for {key}: {error}")
+            return
+
+        self._saved[key] = frame
+
+    def close(self) -> None:
+        """Closes any open state files."""
+        for fd in getattr(self, "_fds", {}).values():
+            os.close(fd)
+        self._fds = {}
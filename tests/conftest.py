@@ -29,18 +29,21 @@ def Runner() -> CliRunner:
 def Light():
     """Function scoped :class: `blynclight.BlyncLight` instance.
 
-    Returns the first BlyncLight found.
+    Returns the first BlyncLight found, opened through an empty light
+    registry so no state is shared between tests. The light is closed
+    and the registry restored after the test.
 
     If no light is available, a BlyncLight is assembled
     with a mocked device property and product_id of 0xffff.
     """
 
-    try:
-        return BlyncLight.get_light()
-    except BlyncLightNotFound:
-        pass
-
-    with mock.patch("hid.device") as MockHelper:
-        b = BlyncLight(EMBRAVA_VENDOR_IDS[0], 0xFFFF, immediate=False)
-
-    return b
+    with mock.patch.dict(BlyncLight._registry, clear=True):
+        try:
+            b = BlyncLight.get_light()
+        except BlyncLightNotFound:
+            with mock.patch("hid.device") as MockHelper:
+                b = BlyncLight(EMBRAVA_VENDOR_IDS[0], 0xFFFF, immediate=False)
+        try:
+            yield b
+        finally:
+            b.close()
@@ -0,0 +1,122 @@
+"""Test the write benchmark."""
+
+import json
+
+import pytest
+
+from unittest import mock
+
+from blynclight import BlyncLight
+from blynclight.__main__ import cli
+from blynclight.bench import Benchmark, SimulatedDevice, simulated_lights
+from blynclight.clock import VirtualClock
+
+
+class SteppingClock(VirtualClock):
+    """A virtual clock that also advances a fixed step on every reading."""
+
+    def __init__(self, step=0.001):
+        super().__init__()
+        self.step = step
+
+    def now(self):
+        self.time += self.step
+        return self.time
+
+
+@pytest.mark.parametrize(
+    "pattern,writes", [("constant", 3), ("colors", 3), ("round-robin", 1)]
+)
+def test_benchmark_patterns(pattern, writes):
+    lights = simulated_lights(3, latency=0)
+    bench = Benchmark(lights, pattern)
+    for tick in range(10):
+        bench.step(tick)
+    assert sum(light.device.writes for light in lights) == 10 * writes
+    if pattern == "constant":
+        assert lights[0].color == (0, 0, 0)
+    else:
+        assert lights[0].color != (0, 0, 0)
+
+
+def test_benchmark_report():
+    clock = SteppingClock(step=0.006)
+    lights = simulated_lights(2, latency=0)
+    bench = Benchmark(lights, "colors", rate=100, clock=clock)
+    report = bench.run(seconds=0.5)
+
+    assert report["ticks"] + report["dropped"] >= 49
+    assert report["dropped"] > 0
+    assert report["writes"] == 2 * report["ticks"]
+    assert report["p50"] <= report["p99"] <= report["p999"] <= report["max"]
+    assert len(report["lights"]) == 2
+    assert not lights[0].on_after_write
+
+
+def test_benchmark_report_same_model():
+    """Lights of the same model are reported separately by serial number."""
+    lights = simulated_lights(2, latency=0)
+    for index, light in enumerate(lights):
+        light.product_id = lights[0].product_id
+        light.serial_number = f"SIM{index}"
+    report = Benchmark(lights, "colors").run(seconds=0.01)
+
+    assert sorted(report["lights"]) == ["SIM0", "SIM1"]
+
+
+def test_benchmark_unpaced():
+    """Profile pacing doesn't cap the measured write rate and is restored
+    after the run.
+    """
+    clock = VirtualClock()
+    light = simulated_lights(1, latency=0.001, clock=clock)[0]
+    light._min_interval = 0.01
+    report = Benchmark([light], "colors", clock=clock).run(seconds=1)
+
+    assert report["writes_per_second"] == pytest.approx(1000, rel=0.01)
+    assert light._min_interval == 0.01
+
+
+def test_benchmark_invalid():
+    with pytest.raises(ValueError):
+        Benchmark(simulated_lights(1), "plaid")
+    with pytest.raises(ValueError):
+        Benchmark([], "constant")
+
+
+def test_simulated_device():
+    clock = VirtualClock()
+    device = SimulatedDevice(latency=0.25, clock=clock, record=True)
+    assert device.write(b"123") == 3
+    assert clock.now() == 0.25 and device.writes == 1
+    assert device.frames == [(0.25, b"123")]
+
+
+def test_bench_subcommand_json(Runner):
+    """:param Runner: CliRunner fixture"""
+    result = Runner.invoke(
+        cli, ["bench", "-S", "2", "-s", "0.05", "--latency", "0", "--json"]
+    )
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert report["pattern"] == "colors"
+    assert report["writes"] > 0 and report["errors"] == 0
+
+
+def test_bench_subcommand_light_option(Runner):
+    """:param Runner: CliRunner fixture
+
+    The light chosen with --light is benchmarked.
+    """
+    light = simulated_lights(1, latency=0)[0]
+    light.serial_number = "DESK1"
+    with mock.patch(
+        "blynclight.__main__.LightIndex.open", return_value=light
+    ) as index_open, mock.patch.object(
+        BlyncLight, "get_light", side_effect=AssertionError
+    ):
+        result = Runner.invoke(cli, ["-L", "desk", "bench", "-s", "0.05", "--json"])
+
+    assert result.exit_code == 0, result.output
+    index_open.assert_called_once_with("desk", immediate=False)
+    assert list(json.loads(result.output)["lights"]) == ["DESK1"]
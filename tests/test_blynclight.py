@@ -9,6 +9,7 @@ go to the device.
 
 import pytest
 from dataclasses import dataclass
+from unittest import mock
 
 from blynclight import (
     BlyncLight,
@@ -312,9 +313,9 @@ def test_bright_property(Light):
 def test_open_same_device(number_of_lights):
     """:param number_of_lights: integer fixture
 
-    Two BlyncLight objects cannot open the same device, so here we
-    test that BlyncLightInUse is raised when that is attempted. This
-    only works if there are physical lights to test against, which is
+    Getting the same light twice returns the same shared object, and
+    a closed light reopens the device on the next write. This only
+    works if there are physical lights to test against, which is
     controlled with the number_of_lights fixture.
     """
 
@@ -324,13 +325,39 @@ def test_open_same_device(number_of_lights):
     a_light = BlyncLight.get_light()
     assert isinstance(a_light, BlyncLight)
 
-    with pytest.raises(BlyncLightInUse):
-        b_light = BlyncLight.get_light()
+    b_light = BlyncLight.get_light()
+    assert a_light is b_light
 
-    del a_light
+    a_light.close()
+    assert not a_light.is_open
+    a_light.update(force=True)
+    assert a_light.is_open
 
-    c_light = BlyncLight.get_light()
-    assert isinstance(c_light, BlyncLight)
+
+def test_get_light_registry():
+    """Lights returned by get_light() are shared, opened lazily on the
+    first write, closed explicitly and reopened without enumerating.
+    """
+    info = {"vendor_id": EMBRAVA_VENDOR_IDS[0], "product_id": 0xFFFE}
+
+    with mock.patch.dict(BlyncLight._registry, clear=True), mock.patch.object(
+        BlyncLight, "available_lights", return_value=[info]
+    ) as available, mock.patch("hid.device"):
+        light = BlyncLight.get_light()
+        assert BlyncLight.get_light() is light
+        assert not light.is_open
+        light.device.open.assert_not_called()
+
+        with light:
+            light.on = True
+            assert light.is_open
+        assert not light.is_open
+        light.device.close.assert_called_once()
+
+        light.on = False
+        assert light.is_open
+        assert light.device.open.call_count == 2
+        assert available.call_count == 2
 
 
 @pytest.mark.parametrize(
@@ -397,3 +424,56 @@ def test_status_property(propname, Light):
     status = Light.status
     assert isinstance(status, dict)
     assert propname in status
+
+
+def test_apply(Light):
+    """:param Light: BlyncLight fixture
+
+    BlyncLight.apply() assigns several attributes with a single
+    write to the device and rejects names that are not attributes
+    of the light.
+    """
+    Light.immediate = False
+
+    with mock.patch.object(Light, "device") as device:
+        Light.apply(color=(1, 2, 3), on=True, flash=1)
+
+    assert device.write.call_count == 1
+    assert Light.color == (1, 2, 3)
+    assert Light.on and Light.flash
+
+    with pytest.raises(AttributeError):
+        Light.apply(bogus=1)
+
+
+def test_hooks(Light):
+    """:param Light: BlyncLight fixture
+
+    Registered hooks observe field updates and device writes, and
+    stop being called once removed.
+    """
+    fields, before, after = [], [], []
+
+    def on_field_set(name, value):
+        fields.append((name, value))
+
+    Light.add_hook("on_field_set", on_field_set)
+    Light.add_hook("on_before_write", before.append)
+    Light.add_hook("on_after_write", lambda *args: after.append(args))
+
+    Light.immediate = False
+    Light.red = 0x42
+    Light.update(force=True)
+
+    assert fields == [("red", 0x42)]
+    assert before == [Light.bytes]
+    frame, elapsed, result = after[0]
+    assert frame == Light.bytes
+    assert elapsed >= 0
+
+    Light.remove_hook("on_field_set", on_field_set)
+    Light.blue = 0x24
+    assert len(fields) == 1
+
+    with pytest.raises(ValueError):
+        Light.add_hook("on_bogus", print)
@@ -0,0 +1,93 @@
+"""Test opening many lights concurrently."""
+
+import threading
+
+import pytest
+
+from unittest import mock
+
+from blynclight import BlyncLight, BlyncLightInUse, BlyncLightNotFound
+from blynclight.bulk import open_lights
+from blynclight.constants import EMBRAVA_VENDOR_IDS
+
+
+def infos(count):
+    return [
+        {
+            "vendor_id": EMBRAVA_VENDOR_IDS[0],
+            "product_id": 0xFFF0,
+            "serial_number": f"S{index}",
+            "path": f"/dev/hidraw{index}".encode(),
+        }
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def registry():
+    """An empty light registry with mocked devices."""
+    with mock.patch.dict(BlyncLight._registry, clear=True), mock.patch("hid.device"):
+        yield BlyncLight._registry
+
+
+def test_open_lights_concurrently(registry):
+    """Every light is opened and reset on its own thread."""
+    barrier = threading.Barrier(4, timeout=5)
+
+    def opener(light):
+        if not light.is_open:
+            barrier.wait()
+            light.is_open = True
+
+    with mock.patch.object(BlyncLight, "open", autospec=True, side_effect=opener):
+        results = open_lights(infos(4), reset=True, max_workers=4)
+
+    assert [result.info["serial_number"] for result in results] == [
+        "S0",
+        "S1",
+        "S2",
+        "S3",
+    ]
+    assert all(result.ok and result.seconds >= 0 for result in results)
+    for result in results:
+        assert result.light is registry[result.info["serial_number"]]
+        assert result.light.immediate
+        assert result.light.off
+
+
+def test_open_lights_collects_errors(registry):
+    """A light that fails to open doesn't stop the others."""
+    errors = {"S1": BlyncLightInUse("S1"), "S2": BlyncLightNotFound("S2")}
+
+    def opener(light):
+        if light.serial_number in errors:
+            raise errors[light.serial_number]
+
+    with mock.patch.object(BlyncLight, "open", autospec=True, side_effect=opener):
+        results = open_lights(infos(3), immediate=False)
+
+    assert [result.ok for result in results] == [True, False, False]
+    assert results[1].error is errors["S1"] and results[1].light is None
+    assert results[2].error is errors["S2"]
+    assert not results[0].light.immediate
+    assert [result.key for result in results] == ["S0", "S1", "S2"]
+
+
+def test_open_lights_enumerates_once(registry):
+    with mock.patch.object(
+        BlyncLight, "available_lights", return_value=infos(2)
+    ) as available:
+        results = open_lights()
+    assert available.call_count == 1
+    assert len(results) == 2
+    assert open_lights([]) == []
+
+
+def test_open_lights_without_reset_doesnt_write(registry):
+    """Lights are only written when reset is requested."""
+    with mock.patch.object(BlyncLight, "open", autospec=True):
+        results = open_lights(infos(3), immediate=True)
+
+    for result in results:
+        assert result.light.immediate
+        result.light.device.write.assert_not_called()
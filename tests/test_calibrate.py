@@ -0,0 +1,84 @@
+"""Test effect timing calibration."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight import BlyncLightNotFound
+from blynclight.calibrate import HEADROOM, Calibration, CalibrationCache, measure
+from blynclight.clock import VirtualClock
+
+
+class SteppingClock(VirtualClock):
+    """A virtual clock that advances a fixed step on every reading."""
+
+    def __init__(self, step):
+        super().__init__()
+        self.step = step
+
+    def now(self):
+        self.time += self.step
+        return self.time
+
+
+def test_calibration_interval():
+    calibration = Calibration(0.001, 0.002)
+    assert calibration.max_rate == pytest.approx(500)
+    assert calibration.interval(0.05) == 0.05
+    assert calibration.interval(0.0) == 0.002
+
+
+def test_measure(Light):
+    """:param Light: BlyncLight fixture"""
+    Light.clock = SteppingClock(0.001)
+    with mock.patch.object(Light, "device") as device:
+        calibration = measure(Light, samples=5)
+
+    assert device.write.call_count == 6
+    assert calibration.latency == pytest.approx(0.001)
+    assert calibration.min_interval == pytest.approx(0.001 * HEADROOM)
+    assert not Light.on_after_write
+
+
+def test_measure_write_errors(Light):
+    """:param Light: BlyncLight fixture
+
+    Write failures are reported as BlyncLightNotFound, and a resilient
+    light that disconnects while being measured isn't calibrated.
+    """
+    with mock.patch.object(Light, "device") as device:
+        device.write.side_effect = OSError("unplugged")
+        with pytest.raises(BlyncLightNotFound):
+            measure(Light, samples=5)
+
+        Light.resilient = True
+        with mock.patch.object(Light, "_disconnect") as disconnect:
+            with pytest.raises(BlyncLightNotFound):
+                measure(Light, samples=5)
+    assert disconnect.called
+    assert not Light.on_after_write
+
+
+def test_calibration_cache(Light, tmp_path):
+    """:param Light: BlyncLight fixture
+    :param tmp_path: pathlib.Path fixture
+    """
+    path = tmp_path / "calibration.json"
+    cache = CalibrationCache(path)
+
+    with mock.patch.object(Light, "device") as device:
+        assert cache.calibration_for(Light) == Calibration.from_profile(Light)
+        assert device.write.call_count == 0
+        first = cache.calibrate(Light)
+        assert cache.calibration_for(Light) == first
+        assert device.write.call_count == 21
+
+    assert CalibrationCache(path).get(Light.key) == first
+    assert CalibrationCache(path).get("bogus") is None
+
+
+def test_calibration_cache_corrupt(tmp_path):
+    """:param tmp_path: pathlib.Path fixture"""
+    path = tmp_path / "calibration.json"
+    path.write_text("not json")
+    assert CalibrationCache(path).load() == {}
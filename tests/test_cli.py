@@ -0,0 +1,49 @@
+"""Test the blync command-line interface."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight import BlyncLight
+from blynclight.__main__ import DEFAULT_COLOR, cli, parse_batch_line
+
+
+@pytest.mark.parametrize(
+    "line,light_id,expected",
+    [
+        ("-l 1 -R --dim", 1, {"red": 255, "dim": 1, "off": 0}),
+        ("-r 12 -b 34 -g 56", 0, {"red": 12, "blue": 34, "green": 56}),
+        ("-G -ff  # comment", 0, {"green": 255, "flash": 1, "speed": 2}),
+        ("--off", 0, {"off": 1, "red": 0, "blue": 0, "green": 0}),
+        ("--on", 0, dict(zip(["red", "blue", "green"], DEFAULT_COLOR))),
+    ],
+)
+def test_parse_batch_line(line, light_id, expected):
+    parsed_id, state = parse_batch_line(line)
+    assert parsed_id == light_id
+    for name, value in expected.items():
+        assert state[name] == value
+
+
+def test_batch_subcommand(Runner, Light, tmp_path):
+    """:param Runner: CliRunner fixture
+    :param Light: BlyncLight fixture
+
+    Each line of a batch script results in one write, lights are opened
+    once and bad lines are reported without stopping the script.
+    """
+    script = tmp_path / "script.blync"
+    script.write_text("# setup\n-l 0 -R\n\n-l 0 -B --dim\n-Z\n-l 0 -G\n")
+
+    with mock.patch.object(
+        BlyncLight, "get_light", return_value=Light
+    ) as get_light, mock.patch.object(Light, "device") as device:
+        result = Runner.invoke(cli, ["batch", "-i", str(script)])
+
+    assert result.exit_code == 1
+    assert "No such option" in result.output
+    assert "1 lights, 1 errors" in result.output
+    get_light.assert_called_once_with(0, immediate=False)
+    assert device.write.call_count == 3
+    assert Light.color == (0, 0, 255)
+    assert not Light.dim
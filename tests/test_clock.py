@@ -0,0 +1,81 @@
+"""Test clocks and running timed effects on a virtual clock."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight import BlyncLight
+from blynclight.bench import simulated_lights
+from blynclight.clock import SYSTEM_CLOCK, VirtualClock
+from blynclight.effects import EffectRunner, Spectrum
+
+from blynclight.__main__ import cli
+
+
+def test_virtual_clock():
+    clock = VirtualClock(start=5.0, stop=10.0)
+    assert clock() == clock.now() == 5.0
+
+    clock.sleep(1.5)
+    clock.sleep_until(6.0)
+    assert clock.now() == 6.5
+
+    clock.sleep(-1)
+    clock.advance(0.5)
+    assert clock.now() == 7.0
+
+    with pytest.raises(KeyboardInterrupt):
+        clock.sleep_until(11.0)
+    assert clock.now() == 10.0
+
+
+def test_system_clock_sleep_until():
+    start = SYSTEM_CLOCK.now()
+    SYSTEM_CLOCK.sleep_until(start - 1)
+    SYSTEM_CLOCK.sleep_until(start + 0.01)
+    assert SYSTEM_CLOCK.now() >= start + 0.01
+
+
+def test_runner_timestamps_are_deterministic():
+    """Ten minutes of effect output runs without waiting and every frame is
+    written exactly on its tick.
+    """
+    clock = VirtualClock()
+    lights = simulated_lights(2, latency=0.001, clock=clock, record=True)
+    colors = list(Spectrum(steps=64))
+    runner = EffectRunner(lights, colors, interval=0.05, clock=clock)
+    runner.run(count=12000)
+
+    assert runner.dropped == 0
+    frames = lights[1].device.frames
+    assert len(frames) == 12000
+    for tick in (0, 1, 4321, 11999):
+        stamp, frame = frames[tick]
+        assert stamp == pytest.approx(tick * 0.05 + 0.002)
+        assert tuple(frame[1:4]) == colors[tick % 64]
+
+
+def test_rainbow_subcommand_virtual_time(Runner, tmp_path, monkeypatch):
+    """:param Runner: CliRunner fixture
+
+    The rainbow subcommand runs until interrupted; a virtual clock with
+    a stop time interrupts it after a thousand simulated seconds.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    clock = VirtualClock(stop=1000)
+    monkeypatch.setattr("blynclight.__main__.CLOCK", clock)
+    light = simulated_lights(1, latency=0, clock=clock, record=True)[0]
+    info = {"vendor_id": light.vendor_id, "product_id": light.product_id}
+
+    with mock.patch.dict(
+        BlyncLight._registry, {light.identifier: light}, clear=True
+    ), mock.patch.object(BlyncLight, "available_lights", return_value=[info]):
+        result = Runner.invoke(cli, ["rainbow"])
+
+    assert result.exit_code == 0, result.output
+    # Ticks after the first, up to the stop time, and the reset write.
+    stamps = [stamp for stamp, _ in light.device.frames if stamp > 0]
+    assert len(stamps) == 20001
+    assert stamps[-1] == pytest.approx(1000)
+    assert all(b - a == pytest.approx(0.05) for a, b in zip(stamps, stamps[1:-1]))
+    assert not light.on
@@ -0,0 +1,92 @@
+"""Test alpha blended effect compositing."""
+
+import random
+
+import pytest
+
+from itertools import cycle, repeat
+from unittest import mock
+
+from blynclight.clock import VirtualClock
+from blynclight.effects.compositor import (
+    CompositeRunner,
+    Compositor,
+    EffectLayer,
+    blend,
+    pulse,
+)
+
+
+@pytest.mark.parametrize(
+    "mode,alpha,expected",
+    [
+        ("normal", 255, (200, 0, 100)),
+        ("normal", 0, (100, 100, 100)),
+        ("normal", 128, (150, 50, 100)),
+        ("add", 255, (255, 100, 200)),
+        ("add", 128, (200, 100, 150)),
+        ("max", 255, (200, 100, 100)),
+    ],
+)
+def test_blend(mode, alpha, expected):
+    assert blend((100, 100, 100), (200, 0, 100), alpha, mode) == expected
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        EffectLayer(repeat((0, 0, 0)), mode="multiply")
+
+
+def test_pulse_over_background():
+    background = EffectLayer(repeat((0, 0, 100)))
+    compositor = Compositor([background, EffectLayer(pulse((255, 0, 0), 4))])
+
+    frames = [compositor.frame() for _ in range(6)]
+
+    assert frames[0] == (0, 0, 100)
+    assert frames[2] == (255, 0, 0)
+    assert frames[4:] == [(0, 0, 100), (0, 0, 100)]
+    assert compositor.layers == [background]
+
+
+def test_vector_path_matches_integer_path():
+    np = pytest.importorskip("numpy")
+    rng = random.Random(7)
+    layers = [
+        [
+            (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+            for _ in range(20)
+        ]
+        for _ in range(12)
+    ]
+    modes = ["normal", "normal", "add", "max", "normal", "add"] * 2
+    alphas = [rng.randrange(256) for _ in layers]
+
+    def compositor(threshold):
+        return Compositor(
+            [EffectLayer(c, a, m) for c, a, m in zip(layers, alphas, modes)],
+            background=(10, 20, 30),
+            vector_threshold=threshold,
+        )
+
+    scalar, vector = compositor(100), compositor(1)
+    for _ in range(20):
+        expected, actual = scalar.frame(), vector.frame()
+        assert all(abs(a - b) <= 2 for a, b in zip(expected, actual))
+
+
+def test_composite_runner(Light):
+    """:param Light: BlyncLight fixture"""
+    clock = VirtualClock()
+    compositor = Compositor([EffectLayer(cycle([(n, 0, 0) for n in range(10)]))])
+    runner = CompositeRunner([Light], compositor, interval=0.1, clock=clock)
+
+    def slow_write(data):
+        clock.advance(0.25)
+
+    with mock.patch.object(Light, "device") as device:
+        device.write.side_effect = slow_write
+        runner.run(count=4)
+
+    assert runner.dropped == 4
+    assert Light.red == 7
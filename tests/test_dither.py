@@ -0,0 +1,100 @@
+"""Test the temporal dithering output stage."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight.clock import VirtualClock
+from blynclight.effects import Ditherer
+from blynclight.effects.dither import DEFAULT_RATE, from_16bit, max_rate, thresholds
+from blynclight.profiles import DEFAULT_PROFILE, DeviceProfile
+
+
+def test_thresholds():
+    assert thresholds(1) == [0]
+    assert thresholds(4) == [0, 2, 1, 3]
+    assert sorted(thresholds(16)) == list(range(16))
+    with pytest.raises(ValueError):
+        thresholds(12)
+
+
+def test_from_16bit():
+    assert from_16bit((0, 65535, 257)) == (0.0, 255.0, 1.0)
+
+
+@pytest.mark.parametrize("value", [0.0, 0.25, 10.5, 100.75, 254.9375, 255.0])
+def test_quantize_average(Light, value):
+    """:param Light: BlyncLight fixture
+
+    Over one period the shown levels average to the requested value
+    and only the two adjacent levels are used.
+    """
+    ditherer = Ditherer([Light], period=16)
+    shown = [ditherer.quantize((value, 0, 0), frame)[0] for frame in range(16)]
+    assert sum(shown) / 16 == pytest.approx(value, abs=1 / 32)
+    assert set(shown) <= {int(value), min(int(value) + 1, 255)}
+
+
+def test_quantize_spreads_high_frames(Light):
+    """:param Light: BlyncLight fixture"""
+    ditherer = Ditherer([Light], period=16)
+    shown = [ditherer.quantize((0.5, 0, 0), frame)[0] for frame in range(16)]
+    assert shown == [1, 0] * 8
+
+
+def test_show_writes_only_changes(Light):
+    """:param Light: BlyncLight fixture"""
+    ditherer = Ditherer([Light], period=4)
+    with mock.patch.object(Light, "device") as device:
+        for frame in range(8):
+            ditherer.show((3.0, 0, 0), frame)
+    assert device.write.call_count == 1
+    assert Light.color == (3, 0, 0)
+
+
+def test_run_drops_late_frames(Light):
+    """:param Light: BlyncLight fixture"""
+    clock = VirtualClock()
+    ditherer = Ditherer([Light], rate=100, period=2, clock=clock)
+
+    def slow_write(data):
+        clock.advance(0.025)
+
+    with mock.patch.object(Light, "device") as device:
+        device.write.side_effect = slow_write
+        ditherer.run(lambda t: (0.5, 0, 0), duration=0.1)
+
+    assert ditherer.frames + ditherer.dropped == 10
+    assert ditherer.dropped > 0
+    assert ditherer.writes == device.write.call_count
+    assert ditherer.write_rate == pytest.approx(ditherer.writes / ditherer.elapsed)
+
+
+def test_run_ends_on_final_color(Light):
+    """:param Light: BlyncLight fixture
+
+    A fade ends on its exact final color even though the last frame
+    is shown before t reaches the duration.
+    """
+    clock = VirtualClock()
+    ditherer = Ditherer([Light], rate=100, period=16, clock=clock)
+
+    with mock.patch.object(Light, "device") as device:
+        ditherer.run(lambda t: (t * 200.0, 0, 0), duration=1.0)
+
+    assert ditherer.frames == 100
+    assert Light.color == (200, 0, 0)
+    assert ditherer.writes == device.write.call_count
+
+
+def test_default_rate_follows_profile(Light):
+    """:param Light: BlyncLight fixture"""
+    assert Ditherer([Light]).rate == max_rate([Light])
+    assert max_rate([]) == DEFAULT_RATE
+
+    slow = mock.Mock(profile=DeviceProfile("Slow", max_update_rate=20))
+    fast = mock.Mock(profile=DeviceProfile("Fast", max_update_rate=100))
+    ditherer = Ditherer([fast, slow])
+    assert ditherer.rate == 20 and ditherer.interval == pytest.approx(0.05)
+    assert Ditherer([fast], rate=50).rate == 50
+    assert Ditherer([mock.Mock(profile=DEFAULT_PROFILE)]).rate == DEFAULT_RATE
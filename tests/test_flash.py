@@ -0,0 +1,81 @@
+"""Test hardware flash offload planning."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight import BlyncLight
+from blynclight.__main__ import cli
+from blynclight.clock import VirtualClock
+from blynclight.constants import FlashSpeed
+from blynclight.flash import FlashPlan, blink, plan_blink
+
+
+@pytest.mark.parametrize(
+    "on,off,speed",
+    [
+        (0.5, 0.5, FlashSpeed.LOW),
+        (0.25, 0.25, FlashSpeed.MEDIUM),
+        (0.13, 0.12, FlashSpeed.HIGH),
+        (0.1, 0.9, None),
+        (2.0, 2.0, None),
+        (0.35, 0.35, None),
+    ],
+)
+def test_plan_blink(on, off, speed):
+    assert plan_blink(on, off).speed == speed
+
+
+def test_plan_blink_invalid():
+    with pytest.raises(ValueError):
+        plan_blink(0, 1)
+
+
+def test_plan_fields():
+    assert FlashPlan(0.5, 0.5, FlashSpeed.HIGH).fields == {
+        "flash": 1,
+        "speed": 3,
+        "on": 1,
+    }
+    assert FlashPlan(0.1, 0.9).fields == {"flash": 0, "on": 1}
+
+
+def test_blink_hardware(Light):
+    """:param Light: BlyncLight fixture"""
+    clock = VirtualClock()
+    with mock.patch.object(Light, "device") as device:
+        plan = blink(Light, (255, 0, 0), 0.25, 0.25, 60, clock=clock)
+
+    assert plan.hardware
+    assert device.write.call_count == 2
+    assert device.write.call_args_list[0] != device.write.call_args_list[1]
+    assert not Light.flash and not Light.on
+    assert clock.now() == 60
+
+
+def test_blink_software(Light):
+    """:param Light: BlyncLight fixture"""
+    clock = VirtualClock()
+    with mock.patch.object(Light, "device") as device:
+        plan = blink(Light, (255, 0, 0), 0.1, 0.9, 10, clock=clock)
+
+    assert not plan.hardware
+    assert device.write.call_count == 1 + 2 * 10 + 1
+    assert not Light.flash and not Light.on
+    assert clock.now() == pytest.approx(10)
+
+
+def test_blink_subcommand_stops_flashing(Runner, Light, monkeypatch):
+    """:param Runner: CliRunner fixture
+    :param Light: BlyncLight fixture
+
+    A timed hardware blink doesn't leave the firmware flashing.
+    """
+    monkeypatch.setattr("blynclight.__main__.CLOCK", VirtualClock())
+    with mock.patch.object(
+        BlyncLight, "get_light", return_value=Light
+    ), mock.patch.object(Light, "device"):
+        result = Runner.invoke(cli, ["-R", "blink", "-s", "5"])
+
+    assert result.exit_code == 0, result.output
+    assert not Light.flash and not Light.on
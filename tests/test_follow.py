@@ -0,0 +1,96 @@
+"""Test following a stream of JSON light events."""
+
+import io
+
+import pytest
+
+from unittest import mock
+
+from blynclight.clock import VirtualClock
+from blynclight.constants import COLORS
+from blynclight.follow import Follower, event_to_fields
+
+
+@pytest.mark.parametrize(
+    "event,expected",
+    [
+        ({"color": "red"}, (0, {"color": COLORS["red"]})),
+        ({"light": 2, "color": [1, 2, 3]}, (2, {"color": (1, 2, 3)})),
+        ({"light": 1, "flash": 2}, (1, {"flash": 1, "speed": 2})),
+        ({"flash": 0}, (0, {"flash": 0})),
+        ({"on": 1, "dim": 0}, (0, {"on": 1, "dim": 0})),
+    ],
+)
+def test_event_to_fields(event, expected):
+    assert event_to_fields(event) == expected
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        [1, 2],
+        {"light": "zero"},
+        {"color": "plaid"},
+        {"bogus": 1},
+        {"red": 999},
+        {"red": -1},
+        {"color": [0, 256, 0]},
+        {"flash": 4},
+        {"on": "yes"},
+    ],
+)
+def test_event_to_fields_invalid(event):
+    with pytest.raises(ValueError):
+        event_to_fields(event)
+
+
+def test_follower_debounce(Light):
+    """:param Light: BlyncLight fixture
+
+    Events split across chunks are reassembled and events within the
+    debounce window collapse into one write with the last state.
+    """
+    clock = VirtualClock()
+    follower = Follower(lambda n: Light, window=0.1, clock=clock)
+
+    with mock.patch.object(Light, "device") as device:
+        assert follower.feed(b'{"color": "red", "on": 1}\n{"col') == 1
+        assert follower.feed(b'or": "blue"}\nnot json\n') == 1
+        assert follower.flush() == 0
+        assert follower.timeout() == pytest.approx(0.1)
+
+        clock.advance(0.1)
+        assert follower.flush() == 1
+
+    assert device.write.call_count == 1
+    assert Light.color == COLORS["blue"]
+    assert Light.on
+    assert follower.events == 2
+    assert follower.errors == 1
+    assert follower.timeout() is None
+
+
+def test_follower_follow_stream(Light):
+    """:param Light: BlyncLight fixture
+
+    Following a stream writes all pending states when the stream ends,
+    including a final line without a trailing newline. Events with
+    values that don't fit the light are skipped.
+    """
+    opened = []
+
+    def open_light(light_id):
+        opened.append(light_id)
+        return Light
+
+    follower = Follower(open_light, window=60)
+    stream = io.BytesIO(b"\n".join([b'{"red": %d}' % n for n in range(1000)]))
+
+    with mock.patch.object(Light, "device") as device:
+        follower.follow(stream)
+
+    assert opened == [0]
+    assert device.write.call_count == 1
+    assert Light.red == 255
+    assert follower.events == 256
+    assert follower.errors == 1000 - 256
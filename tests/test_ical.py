@@ -0,0 +1,293 @@
+"""Test calendar driven presence."""
+
+import os
+import random
+
+from datetime import datetime, timezone
+from unittest import mock
+
+import pytest
+
+from blynclight.clock import VirtualClock
+from blynclight.ical import (
+    CalendarSchedule,
+    Interval,
+    IntervalTree,
+    parse_duration,
+    parse_ics,
+)
+
+
+def ts(*args) -> float:
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+CALENDAR = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+SUMMARY:Standup
+DTSTART:20260105T090000Z
+DURATION:PT15M
+RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=5
+EXDATE:20260107T090000Z
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Lunch
+DTSTART:20260105T120000Z
+DTEND:20260105T130000Z
+TRANSP:TRANSPARENT
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Planning with a very long
+  folded summary
+DTSTART:20260106T100000Z
+DTEND:20260106T110000Z
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Broken
+DTSTART:not a date
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+@pytest.mark.parametrize(
+    "value,seconds",
+    [("PT15M", 900), ("P1D", 86400), ("P1W", 604800), ("-PT1H30M", -5400)],
+)
+def test_parse_duration(value, seconds):
+    assert parse_duration(value).total_seconds() == seconds
+
+
+def test_parse_ics():
+    intervals = parse_ics(CALENDAR, ts(2026, 1, 1), ts(2026, 2, 1))
+    starts = sorted((iv.start, iv.summary) for iv in intervals)
+
+    assert starts == [
+        (ts(2026, 1, 5, 9), "Standup"),
+        (ts(2026, 1, 6, 10), "Planning with a very long folded summary"),
+        (ts(2026, 1, 9, 9), "Standup"),
+        (ts(2026, 1, 12, 9), "Standup"),
+        (ts(2026, 1, 14, 9), "Standup"),
+    ]
+
+
+def test_parse_ics_window_skips_history():
+    text = (
+        "BEGIN:VEVENT\nDTSTART:20000101T090000Z\nDURATION:PT1H\n"
+        "RRULE:FREQ=DAILY\nEND:VEVENT\n"
+    )
+    intervals = parse_ics(text, ts(2026, 1, 1), ts(2026, 1, 3))
+    assert [iv.start for iv in intervals] == [ts(2026, 1, 1, 9), ts(2026, 1, 2, 9)]
+
+
+def event(*lines) -> str:
+    return "BEGIN:VEVENT\n" + "\n".join(lines) + "\nEND:VEVENT\n"
+
+
+@pytest.mark.parametrize(
+    "byday,days",
+    [
+        ("1MO", [(1, 5), (2, 2), (3, 2), (4, 6)]),
+        ("-1FR", [(1, 30), (2, 27), (3, 27), (4, 24)]),
+        ("2TU,4TU", [(1, 13), (1, 27), (2, 10), (2, 24), (3, 10), (3, 24)]),
+        ("5FR", [(1, 30)]),
+        ("SA", [(1, 3), (1, 10), (1, 17), (1, 24), (1, 31), (2, 7)]),
+    ],
+)
+def test_parse_ics_monthly_byday(byday, days):
+    text = event(
+        "DTSTART:20260101T090000Z",
+        "DURATION:PT1H",
+        f"RRULE:FREQ=MONTHLY;BYDAY={byday}",
+    )
+    intervals = parse_ics(text, ts(2026, 1, 1), ts(2026, 5, 1))
+    starts = sorted(iv.start for iv in intervals)
+    assert starts[: len(days)] == [ts(2026, month, day, 9) for month, day in days]
+    assert all(datetime.fromtimestamp(t, timezone.utc).hour == 9 for t in starts)
+
+
+def test_parse_ics_daily_byday():
+    text = event(
+        "DTSTART:20260101T090000Z",
+        "DURATION:PT1H",
+        "RRULE:FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR",
+    )
+    intervals = parse_ics(text, ts(2026, 1, 1), ts(2026, 1, 8))
+    days = [datetime.fromtimestamp(iv.start, timezone.utc).day for iv in intervals]
+    assert days == [1, 2, 5, 6, 7]
+
+
+def test_parse_ics_recurrence_id():
+    """Overridden instances are moved or cancelled."""
+    text = (
+        event(
+            "UID:standup",
+            "SUMMARY:Standup",
+            "DTSTART:20260105T090000Z",
+            "DURATION:PT15M",
+            "RRULE:FREQ=DAILY;COUNT=3",
+        )
+        + event(
+            "UID:standup",
+            "SUMMARY:Standup (moved)",
+            "RECURRENCE-ID:20260106T090000Z",
+            "DTSTART:20260106T140000Z",
+            "DURATION:PT15M",
+        )
+        + event(
+            "UID:standup",
+            "RECURRENCE-ID:20260107T090000Z",
+            "DTSTART:20260107T090000Z",
+            "STATUS:CANCELLED",
+        )
+    )
+    intervals = parse_ics(text, ts(2026, 1, 1), ts(2026, 2, 1))
+    assert sorted((iv.start, iv.summary) for iv in intervals) == [
+        (ts(2026, 1, 5, 9), "Standup"),
+        (ts(2026, 1, 6, 14), "Standup (moved)"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "FREQ=MONTHLY;BYMONTHDAY=15",
+        "FREQ=YEARLY;BYDAY=1MO",
+        "FREQ=WEEKLY;BYDAY=1MO",
+        "FREQ=HOURLY",
+        "FREQ=MONTHLY;BYDAY=XX",
+    ],
+)
+def test_parse_ics_skips_unsupported_rules(rule):
+    text = event("SUMMARY:Odd", "DTSTART:20260105T090000Z", f"RRULE:{rule}")
+    text += event("SUMMARY:Plain", "DTSTART:20260105T100000Z", "DURATION:PT1H")
+    with mock.patch("blynclight.ical.logger") as logger:
+        intervals = parse_ics(text, ts(2026, 1, 1), ts(2026, 2, 1))
+    assert [iv.summary for iv in intervals] == ["Plain"]
+    assert "Odd" in logger.warning.call_args[0][0]
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(42)
+    intervals = []
+    for _ in range(500):
+        start = rng.uniform(0, 1000)
+        intervals.append(Interval(start, start + rng.uniform(0.1, 50)))
+    tree = IntervalTree(intervals)
+
+    for t in [rng.uniform(-10, 1100) for _ in range(200)] + [
+        iv.start for iv in intervals
+    ]:
+        expected = sorted(iv for iv in intervals if iv.start <= t < iv.end)
+        assert sorted(tree.at(t)) == expected
+
+    assert tree.next_boundary(-1) == min(iv.start for iv in intervals)
+    assert tree.next_boundary(2000) is None
+
+
+def test_calendar_schedule_run(tmp_path, Light):
+    """:param Light: BlyncLight fixture
+
+    The schedule writes the light only at event boundaries, sleeping
+    until the next boundary, and picks up changed files.
+    """
+    path = tmp_path / "work.ics"
+    path.write_text(CALENDAR)
+
+    start = ts(2026, 1, 5, 8)
+    clock = VirtualClock(start)
+
+    schedule = CalendarSchedule([path], clock=clock)
+    busy, free = {"color": (255, 0, 0), "on": 1}, {"on": 0}
+
+    with mock.patch.object(Light, "device") as device, mock.patch.object(
+        clock, "sleep_until", wraps=clock.sleep_until
+    ) as sleep_until:
+        schedule.run(Light, busy, free, reload_interval=86400, until=ts(2026, 1, 5, 10))
+
+    deadlines = [call.args[0] - start for call in sleep_until.call_args_list]
+    assert deadlines == [3600, 4500, 7200]
+    assert device.write.call_count == 3
+    assert not Light.on
+
+    assert not schedule.reload()
+    path.write_text(CALENDAR.replace("TRANSP:TRANSPARENT\n", ""))
+    os.utime(path, ns=(0, 0))
+    assert schedule.reload()
+    assert schedule.busy(ts(2026, 1, 5, 12, 30))
+
+
+def test_calendar_schedule_wakes_at_transitions(tmp_path, Light):
+    """:param Light: BlyncLight fixture
+
+    Without events and with a long reload interval the schedule sleeps
+    until the expansion window moves, and changed files are picked up
+    when it wakes.
+    """
+    path = tmp_path / "empty.ics"
+    path.write_text("BEGIN:VCALENDAR\nEND:VCALENDAR\n")
+
+    start = ts(2026, 1, 1)
+    clock = VirtualClock(start)
+    horizon = 10 * 86400
+    schedule = CalendarSchedule([path], horizon=horizon, clock=clock)
+
+    with mock.patch.object(Light, "device"), mock.patch.object(
+        clock, "sleep_until", wraps=clock.sleep_until
+    ) as sleep_until:
+        schedule.run(
+            Light, {"on": 1}, {"on": 0}, reload_interval=horizon, until=start + horizon
+        )
+        assert [call.args[0] - start for call in sleep_until.call_args_list] == [
+            horizon / 2,
+            horizon,
+        ]
+
+        path.write_text(event("DTSTART:20260111T090000Z", "DURATION:PT1H"))
+        os.utime(path, ns=(0, 0))
+        sleep_until.reset_mock()
+        schedule.run(
+            Light,
+            {"on": 1},
+            {"on": 0},
+            reload_interval=horizon,
+            until=ts(2026, 1, 11, 12),
+        )
+
+    assert [call.args[0] for call in sleep_until.call_args_list] == [
+        ts(2026, 1, 11, 9),
+        ts(2026, 1, 11, 10),
+        ts(2026, 1, 11, 12),
+    ]
+    assert not Light.on
+
+
+def test_calendar_schedule_picks_up_new_events(tmp_path, Light):
+    """:param Light: BlyncLight fixture
+
+    An event added to a file while the schedule sleeps is picked up
+    within one reload interval, not at the next transition.
+    """
+    path = tmp_path / "empty.ics"
+    path.write_text("BEGIN:VCALENDAR\nEND:VCALENDAR\n")
+
+    start = ts(2026, 1, 1)
+    clock = VirtualClock(start)
+    schedule = CalendarSchedule([path], clock=clock)
+    advance = clock.sleep_until
+
+    def sleep_until(t):
+        advance(t)
+        if clock.now() >= ts(2026, 1, 1, 8):
+            path.write_text(event("DTSTART:20260101T090000Z", "DURATION:PT1H"))
+            os.utime(path, ns=(1, 1))
+
+    with mock.patch.object(Light, "device"), mock.patch.object(
+        clock, "sleep_until", side_effect=sleep_until
+    ):
+        schedule.run(
+            Light, {"on": 1}, {"on": 0}, reload_interval=60, until=ts(2026, 1, 1, 9, 30)
+        )
+
+    assert schedule.busy(ts(2026, 1, 1, 9, 30))
+    assert Light.on
@@ -0,0 +1,171 @@
+"""Test the light index, aliases and opening lights by path."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight import BlyncLight, BlyncLightNotFound
+from blynclight.constants import EMBRAVA_VENDOR_IDS
+from blynclight.index import LightIndex
+
+from blynclight.__main__ import cli
+
+INFO = {
+    "vendor_id": EMBRAVA_VENDOR_IDS[0],
+    "product_id": 0xFFFE,
+    "serial_number": "A1B2C3",
+    "path": b"/dev/hidraw7",
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    """A LightIndex stored in a temporary directory."""
+    with mock.patch.dict(BlyncLight._registry, clear=True), mock.patch(
+        "hid.device"
+    ), mock.patch.object(BlyncLight, "available_lights", return_value=[INFO]):
+        yield LightIndex(tmp_path / "lights.json")
+
+
+def test_light_opens_by_path():
+    """Lights with a path are opened by path, falling back to their
+    serial number when the path is gone.
+    """
+    with mock.patch("hid.device"):
+        light = BlyncLight(0x2C0D, 0xFFFE, path=b"/dev/hidraw7", serial_number="S1")
+    light.open()
+    light.device.open_path.assert_called_once_with(b"/dev/hidraw7")
+    light.device.open.assert_not_called()
+
+    light.close()
+    light.device.open_path.side_effect = OSError("gone")
+    light.open()
+    light.device.open.assert_called_once_with(0x2C0D, 0xFFFE, "S1")
+
+
+def test_light_without_serial_reopens_by_id():
+    """A light without a serial number whose path changed, for example
+    after a replug, is reopened by its ids if it is the only light of
+    its model.
+    """
+    with mock.patch("hid.device"):
+        light = BlyncLight(0x2C0D, 0xFFFE, path=b"/dev/hidraw7")
+    light.device.open_path.side_effect = OSError("gone")
+    infos = [{"vendor_id": 0x2C0D, "product_id": 0xFFFE, "path": b"/dev/hidraw8"}]
+    with mock.patch("hid.enumerate", return_value=infos):
+        light.open()
+    light.device.open.assert_called_once_with(0x2C0D, 0xFFFE)
+    assert light.is_open
+
+
+def test_light_without_serial_not_reopened_by_id_if_ambiguous():
+    """A light without a serial number whose path changed isn't reopened
+    by its ids when another light of the same model could answer.
+    """
+    with mock.patch("hid.device"):
+        light = BlyncLight(0x2C0D, 0xFFFE, path=b"/dev/hidraw7")
+    light.device.open_path.side_effect = OSError("gone")
+    infos = [
+        {"vendor_id": 0x2C0D, "product_id": 0xFFFE, "path": b"/dev/hidraw8"},
+        {"vendor_id": 0x2C0D, "product_id": 0xFFFE, "path": b"/dev/hidraw9"},
+    ]
+    with mock.patch("hid.enumerate", return_value=infos):
+        with pytest.raises(BlyncLightNotFound):
+            light.open()
+    light.device.open.assert_not_called()
+    assert not light.is_open
+
+
+def test_get_light_for_keys_registry_by_serial(index):
+    """:param index: LightIndex fixture"""
+    light = BlyncLight.get_light_for(INFO)
+    assert BlyncLight._registry["A1B2C3"] is light
+    assert BlyncLight.get_light() is light
+    assert light.path == INFO["path"]
+    assert light.key == "A1B2C3"
+
+
+def test_lights_without_serial_keyed_by_path():
+    """Lights of the same model without serial numbers stay distinct."""
+    infos = [
+        {"vendor_id": 0x2C0D, "product_id": 0xFFFE, "path": b"/dev/hidraw0"},
+        {"vendor_id": 0x2C0D, "product_id": 0xFFFE, "path": b"/dev/hidraw1"},
+    ]
+    with mock.patch.dict(BlyncLight._registry, clear=True), mock.patch(
+        "hid.device"
+    ), mock.patch.object(BlyncLight, "available_lights", return_value=infos):
+        first, second = BlyncLight.get_light(0), BlyncLight.get_light(1)
+    assert first is not second
+    assert (first.key, second.key) == ("/dev/hidraw0", "/dev/hidraw1")
+
+
+def test_alias_persists(index, tmp_path):
+    """:param index: LightIndex fixture"""
+    index.alias("desk", "A1B2C3")
+    assert index.resolve("desk") == "A1B2C3"
+    assert index.resolve("other") == "other"
+
+    reloaded = LightIndex(tmp_path / "lights.json")
+    assert reloaded.aliases == {"desk": "A1B2C3"}
+
+    assert reloaded.unalias("desk")
+    assert not reloaded.unalias("desk")
+    assert LightIndex(tmp_path / "lights.json").aliases == {}
+
+
+def test_known_light_opens_without_enumerating(index, tmp_path):
+    """:param index: LightIndex fixture"""
+    index.alias("desk", "A1B2C3")
+    light = index.open("desk")
+    assert BlyncLight.available_lights.call_count == 1
+    assert light.serial_number == "A1B2C3"
+
+    BlyncLight._registry.clear()
+    reloaded = LightIndex(tmp_path / "lights.json")
+    for name in ["desk", "A1B2C3", "/dev/hidraw7"]:
+        other = reloaded.open(name)
+        assert other.path == b"/dev/hidraw7"
+    assert BlyncLight.available_lights.call_count == 1
+
+
+def test_refresh_forgets_detached_lights(index):
+    """:param index: LightIndex fixture
+
+    A light without a serial number is keyed by its HID path, and the
+    entry for its old path is dropped when it moves.
+    """
+    moved = {"vendor_id": 0x2C0D, "product_id": 0xFFFE, "path": b"/dev/hidraw3"}
+    BlyncLight.available_lights.return_value = [
+        INFO,
+        {**moved, "path": b"/dev/hidraw2"},
+    ]
+    index.refresh()
+    assert set(index.lights) == {"A1B2C3", "/dev/hidraw2"}
+
+    BlyncLight.available_lights.return_value = [moved]
+    index.refresh()
+    assert set(index.lights) == {"/dev/hidraw3"}
+    assert index.lookup("/dev/hidraw2") is None
+
+
+def test_unknown_light_not_found(index):
+    """:param index: LightIndex fixture"""
+    with pytest.raises(BlyncLightNotFound):
+        index.open("nope")
+    assert BlyncLight.available_lights.call_count == 1
+
+
+def test_alias_subcommand(index, Runner, tmp_path, monkeypatch):
+    """:param index: LightIndex fixture"""
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path))
+
+    result = Runner.invoke(cli, ["alias", "desk", "A1B2C3"])
+    assert result.exit_code == 0
+
+    result = Runner.invoke(cli, ["alias"])
+    assert result.exit_code == 0
+    assert "desk" in result.output and "/dev/hidraw7" in result.output
+
+    result = Runner.invoke(cli, ["alias", "desk", "--remove"])
+    assert result.exit_code == 0
+    assert LightIndex().aliases == {}
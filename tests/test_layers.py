@@ -0,0 +1,88 @@
+"""Test priority layered light state."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight import BlyncLight
+from blynclight.clock import VirtualClock
+from blynclight.constants import COLORS
+from blynclight.layers import StateStack
+
+
+@pytest.fixture
+def stack(Light):
+    """:param Light: BlyncLight fixture
+
+    A StateStack on the Light fixture with a manual clock.
+    """
+    with mock.patch.object(Light, "device"):
+        yield StateStack(Light, clock=VirtualClock())
+
+
+def test_highest_priority_wins(stack):
+    """:param stack: StateStack fixture"""
+    assert stack.set("presence", color="green")
+    assert stack.set("oncall", priority=10, color="red", flash=3)
+    assert stack.light.color == COLORS["red"] and stack.light.flash
+
+    assert not stack.set("presence", color="blue")
+    assert stack.light.color == COLORS["red"]
+
+    assert stack.clear("oncall")
+    assert stack.light.color == COLORS["blue"] and not stack.light.flash
+
+    assert stack.clear("presence")
+    assert stack.light.off
+    assert not stack.clear("presence")
+    assert stack.writes == 4
+
+
+def test_ties_go_to_latest(stack):
+    """:param stack: StateStack fixture"""
+    stack.set("a", color="red")
+    stack.set("b", color="green")
+    assert stack.top().client == "b"
+    stack.set("a", color="red")
+    assert stack.top().client == "a"
+
+
+def test_unchanged_state_not_written(stack):
+    """:param stack: StateStack fixture"""
+    stack.set("build", priority=1, color="red")
+    assert not stack.set("page", priority=5, color="red")
+    assert not stack.clear("page")
+    assert stack.light.device.write.call_count == 1
+
+
+def test_ttl_expiry(stack):
+    """:param stack: StateStack fixture"""
+    stack.set("presence", color="green")
+    stack.set("meeting", priority=5, ttl=30, color="red")
+    stack.set("alert", priority=9, ttl=10, color="blue")
+    assert stack.next_expiry() == 10
+
+    stack.clock.advance(10)
+    assert stack.refresh()
+    assert stack.light.color == COLORS["red"]
+    assert stack.next_expiry() == 20
+
+    stack.clock.advance(21)
+    assert stack.effective() == BlyncLight.command_word(color=COLORS["green"], on=1)
+    assert stack.refresh()
+    assert stack.next_expiry() is None
+    assert set(stack.layers) == {"presence"}
+
+
+def test_stale_entries_compacted(stack):
+    """:param stack: StateStack fixture"""
+    for n in range(1000):
+        stack.set("busy", priority=n % 7, ttl=60, red=n % 256)
+    assert len(stack._heap) <= 2 * len(stack.layers) + 17
+    assert stack.light.red == 999 % 256
+
+
+def test_invalid_fields(stack):
+    """:param stack: StateStack fixture"""
+    with pytest.raises(ValueError):
+        stack.set("bogus", color="plaid")
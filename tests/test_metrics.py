@@ -0,0 +1,96 @@
+"""Test the OpenMetrics textfile exporter."""
+
+from unittest import mock
+
+from blynclight import BlyncLight
+from blynclight.constants import EMBRAVA_VENDOR_IDS
+from blynclight.metrics import LightMetrics, MetricsExporter
+
+
+def test_light_metrics_counts_writes_and_errors():
+    metrics = LightMetrics(window=4)
+    for elapsed in [0.1, 0.2, 0.3, 0.4, 0.5]:
+        metrics(b"", elapsed, 9)
+    metrics(b"", 0.6, -1)
+    metrics(b"", 0.7, OSError("unplugged"))
+
+    assert metrics.writes == 7
+    assert metrics.errors == 2
+    assert len(metrics.latencies) == 4
+    assert metrics.quantiles()[0.5] == 0.6
+
+
+def test_exporter_collect(tmp_path, Light):
+    """:param Light: BlyncLight fixture
+
+    Writes to an attached light show up in the export, which is written
+    atomically to the export path.
+    """
+    exporter = MetricsExporter(tmp_path / "blynclight.prom")
+    exporter.attach(Light)
+    exporter.attach(Light)
+
+    Light.immediate = False
+    Light.apply(color=(1, 2, 3), on=True)
+
+    with mock.patch("blynclight.metrics.BlyncLight.shared_lights", return_value=[]):
+        exporter.write()
+
+    text = exporter.path.read_text()
+    label = f'light="{Light.key}"'
+
+    assert f"blynclight_writes_total{{{label}}} 1\n" in text
+    assert f"blynclight_write_errors_total{{{label}}} 0\n" in text
+    assert f'blynclight_color{{{label},channel="blue"}} 2\n' in text
+    assert f"blynclight_on{{{label}}} 1\n" in text
+    assert "blynclight_enumeration_seconds" in text
+    assert text.endswith("# EOF\n")
+    assert list(tmp_path.iterdir()) == [exporter.path]
+
+    exporter.detach(Light)
+    assert Light.on_after_write == ()
+
+
+def test_exporter_same_model_lights(tmp_path):
+    """Lights of the same model are labelled by serial number, or by HID
+    path when they don't have one.
+    """
+    exporter = MetricsExporter(tmp_path / "blynclight.prom")
+    with mock.patch("hid.device"):
+        lights = [
+            BlyncLight(EMBRAVA_VENDOR_IDS[0], 0xFFFF, serial_number="A1"),
+            BlyncLight(EMBRAVA_VENDOR_IDS[0], 0xFFFF, serial_number="B2"),
+            BlyncLight(EMBRAVA_VENDOR_IDS[0], 0xFFFF, path=b'/dev/"hid"'),
+        ]
+    for light in lights:
+        exporter.attach(light)
+
+    with mock.patch("blynclight.metrics.BlyncLight.shared_lights", return_value=[]):
+        text = exporter.collect()
+
+    assert len(exporter.metrics) == 3
+    for label in ["A1", "B2", '/dev/\\"hid\\"']:
+        assert f'blynclight_writes_total{{light="{label}"}} 0\n' in text
+
+
+def test_exporter_survives_collect_errors(tmp_path):
+    """An unexpected exception while exporting is logged and the export
+    thread keeps running.
+    """
+    exporter = MetricsExporter(tmp_path / "blynclight.prom", interval=0.001)
+    calls = []
+
+    def collect():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("boom")
+        exporter._stopped.set()
+        return "# EOF\n"
+
+    with mock.patch.object(exporter, "collect", side_effect=collect):
+        exporter.start()
+        exporter._thread.join(timeout=5)
+        exporter.stop()
+
+    assert len(calls) >= 3
+    assert exporter.path.read_text() == "# EOF\n"
@@ -0,0 +1,69 @@
+"""Test lazily loaded effect plugins."""
+
+import typer
+
+from unittest import mock
+
+from blynclight import BlyncLight
+from blynclight.__main__ import cli
+from blynclight.plugins import load_effect
+
+
+def sparkle(ctx: typer.Context, count: int = typer.Option(1, "--count", "-c")) -> None:
+    """Sparkle the light."""
+    ctx.obj.apply(red=count)
+
+
+def make_entry_point(name, effect):
+    entry_point = mock.Mock(value=f"tests:{name}", dist=None)
+    entry_point.name = name
+    entry_point.load.return_value = effect
+    return entry_point
+
+
+def test_load_effect():
+    app = typer.Typer(add_completion=False)
+    app.command("sparkle")(sparkle)
+
+    for effect in [sparkle, app, typer.main.get_command(app)]:
+        command = load_effect(make_entry_point("sparkle", effect))
+        assert [param.name for param in command.params] == ["count"]
+
+
+def test_plugin_loaded_when_invoked(Runner, Light):
+    """:param Runner: CliRunner fixture
+    :param Light: BlyncLight fixture
+    """
+    plugins = {
+        "sparkle": make_entry_point("sparkle", sparkle),
+        "fli": make_entry_point("fli", sparkle),
+    }
+
+    with mock.patch(
+        "blynclight.plugins.effect_entry_points", return_value=plugins
+    ), mock.patch.object(BlyncLight, "get_light", return_value=Light):
+        result = Runner.invoke(cli, ["--help"])
+        assert result.exit_code == 0
+        assert "sparkle" in result.output
+        plugins["sparkle"].load.assert_not_called()
+
+        with mock.patch.object(Light, "device"):
+            result = Runner.invoke(cli, ["-B", "sparkle", "-c", "7"])
+
+    assert result.exit_code == 0, result.output
+    plugins["sparkle"].load.assert_called_once()
+    plugins["fli"].load.assert_not_called()
+    assert Light.red == 7
+    assert Light.blue == 255
+
+
+def test_builtin_command_skips_entry_points(Runner):
+    """:param Runner: CliRunner fixture
+
+    Invoking a builtin command doesn't scan installed entry points.
+    """
+    with mock.patch("blynclight.plugins.effect_entry_points") as entry_points:
+        result = Runner.invoke(cli, ["udev-rules"])
+
+    assert result.exit_code == 0, result.output
+    entry_points.assert_not_called()
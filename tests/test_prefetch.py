@@ -0,0 +1,90 @@
+"""Test the prefetching frame ring buffer."""
+
+import pytest
+
+from itertools import cycle
+from unittest import mock
+
+from blynclight.clock import VirtualClock
+from blynclight.effects.prefetch import FrameRing, PrefetchRunner
+
+
+def test_frame_ring():
+    ring = FrameRing(capacity=3, width=2)
+    for n in range(3):
+        assert ring.put(bytes([n, n]))
+    assert not ring.put(b"xx", timeout=0)
+    assert ring.depth == 3
+
+    assert ring.get() == b"\x00\x00"
+    assert ring.put(b"\x03\x03")
+    assert ring.discard(2) == 2
+    assert ring.get() == b"\x03\x03"
+
+    assert ring.get() is None
+    assert ring.underruns == 1
+
+    ring.close()
+    assert ring.drained
+    assert ring.get() is None
+    assert ring.underruns == 1
+    assert not ring.put(b"xx")
+
+
+def test_frame_ring_invalid():
+    with pytest.raises(ValueError):
+        FrameRing(0, 9)
+    with pytest.raises(ValueError):
+        FrameRing(2, 2).put(b"abc")
+
+
+def test_prefetch_runner_finite_effect(Light):
+    """:param Light: BlyncLight fixture
+
+    Every frame of a finite effect is written once and the run ends when
+    the effect is exhausted.
+    """
+    clock = VirtualClock()
+    effect = [(n, 0, 0) for n in range(10)]
+    runner = PrefetchRunner(
+        [Light, Light], effect, interval=0.1, capacity=4, clock=clock
+    )
+
+    with mock.patch.object(Light, "device") as device:
+        runner.run()
+
+    assert runner.ticks == 10
+    assert device.write.call_count == 20
+    assert Light.color == (9, 0, 0) and Light.on
+    assert runner.finished
+
+
+def test_prefetch_runner_per_light_colors(Light):
+    """:param Light: BlyncLight fixture"""
+    runner = PrefetchRunner([Light, Light], [])
+    runner._base = Light.bytes * 2
+    frame = runner.encode([(1, 2, 3), (4, 5, 6)])
+    assert frame[1:4] == b"\x01\x02\x03"
+    assert frame[10:13] == b"\x04\x05\x06"
+
+
+def test_prefetch_runner_discards_dropped_ticks(Light):
+    """:param Light: BlyncLight fixture"""
+    clock = VirtualClock()
+    runner = PrefetchRunner(
+        [Light],
+        cycle([(n, 0, 0) for n in range(100)]),
+        interval=0.1,
+        capacity=16,
+        clock=clock,
+    )
+
+    def slow_write(data):
+        clock.advance(0.25)
+
+    with mock.patch.object(Light, "device") as device:
+        device.write.side_effect = slow_write
+        runner.run(count=4)
+
+    assert runner.dropped == 4
+    assert Light.red == 7
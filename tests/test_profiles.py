@@ -0,0 +1,91 @@
+"""Test device model profiles."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight import BlyncLight, StateCache
+from blynclight.clock import VirtualClock
+from blynclight.constants import EMBRAVA_VENDOR_IDS, DeviceType
+from blynclight.profiles import (
+    DEFAULT_PROFILE,
+    PROFILES,
+    DeviceProfile,
+    profile_for,
+    register_profile,
+)
+
+
+@pytest.fixture
+def make_light():
+    """Returns a function that builds a light with a mocked device for
+    a product_id, restoring the profile registry afterwards.
+    """
+    with mock.patch.dict(PROFILES):
+
+        def make_light(product_id: int) -> BlyncLight:
+            with mock.patch("hid.device"):
+                return BlyncLight(EMBRAVA_VENDOR_IDS[0], product_id)
+
+        yield make_light
+
+
+def test_profile_for():
+    assert profile_for(0x0010).device_type == DeviceType.V30_LUMENA
+    assert profile_for(0x0010).music
+    assert not profile_for(0x0001).music
+    assert profile_for(0xFFFF) is DEFAULT_PROFILE
+    assert DEFAULT_PROFILE.min_interval == 0
+    assert profile_for(0x0001).min_interval == pytest.approx(0.01)
+
+
+def test_default_profile_writes_unchanged(make_light):
+    light = make_light(0xFFFF)
+    light.apply(color=(1, 2, 3), music=5, play=1, volume=3, on=1)
+    light.device.write.assert_called_once_with(light.bytes)
+
+
+def test_unsupported_fields_masked(make_light):
+    register_profile(0xFFFE, DeviceProfile("Quiet", music=False, dim=False))
+    light = make_light(0xFFFE)
+    light.apply(color=(1, 2, 3), music=5, play=1, repeat=1, volume=3, dim=1)
+
+    expected = BlyncLight.command_word(color=(1, 2, 3))
+    light.device.write.assert_called_once_with(expected)
+    assert light.music == 5 and light.dim == 1
+
+
+def test_calibration(make_light):
+    register_profile(0xFFFE, DeviceProfile("Warm", calibration=(1.0, 0.5, 2.0)))
+    light = make_light(0xFFFE)
+    light.apply(color=(200, 200, 200), on=1)
+
+    expected = BlyncLight.command_word(color=(200, 100, 255), on=1)
+    light.device.write.assert_called_once_with(expected)
+    assert light.color == (200, 200, 200)
+
+
+def test_state_cache_saves_logical_state(make_light, tmp_path):
+    """The state cache keeps the light's own state, not the calibrated
+    frame written to the device, so a restored light isn't corrected
+    twice.
+    """
+    register_profile(0xFFFE, DeviceProfile("Warm", calibration=(1.0, 0.5, 2.0)))
+    light = make_light(0xFFFE)
+    light.state_cache = StateCache(tmp_path)
+    light.apply(color=(200, 200, 200), on=1)
+
+    assert StateCache(tmp_path).load(light.key) == light.bytes
+
+
+def test_writes_paced(make_light):
+    register_profile(0xFFFE, DeviceProfile("Slow", max_update_rate=20))
+    light = make_light(0xFFFE)
+
+    light.clock = VirtualClock()
+    light.update(force=True)
+    assert light.clock.now() == 0
+    light.update(force=True)
+
+    assert light.device.write.call_count == 2
+    assert light.clock.now() == pytest.approx(0.05)
@@ -0,0 +1,98 @@
+"""Test resilient lights and background reconnection."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight import BlyncLight
+from blynclight.constants import COMMAND_LENGTH, EMBRAVA_VENDOR_IDS
+from blynclight.reconnect import Reconnector
+
+
+@pytest.fixture
+def resilient_light():
+    """A resilient BlyncLight with a mocked device."""
+    with mock.patch("hid.device"):
+        light = BlyncLight(EMBRAVA_VENDOR_IDS[0], 0xFFFF, resilient=True)
+    return light
+
+
+def test_write_failure_raises_unless_resilient(Light):
+    """:param Light: BlyncLight fixture"""
+    with mock.patch.object(Light, "device") as device:
+        device.write.side_effect = OSError("unplugged")
+        with pytest.raises(OSError):
+            Light.update(force=True)
+    assert Light.connected
+
+
+def test_resilient_light_reconnects(resilient_light):
+    """:param resilient_light: resilient BlyncLight fixture
+
+    A failed write disconnects the light, later changes are kept in
+    memory without writing and the latest state is written when the
+    light reconnects.
+    """
+    light = resilient_light
+    light.device.write.side_effect = OSError("unplugged")
+
+    with mock.patch.object(Reconnector, "start") as start:
+        light.apply(color=(255, 0, 0), on=1)
+        assert not light.connected
+        assert not light.is_open
+        start.assert_called_once()
+
+        failed = light.device
+        light.apply(color=(0, 0, 255))
+        assert failed.write.call_count == 1
+
+    with mock.patch("hid.device") as new_device:
+        assert light._reconnector.attempt()
+
+    assert light.connected
+    new_device.return_value.write.assert_called_once_with(light.bytes)
+    assert light.color == (0, 0, 255) and light.on
+
+
+@pytest.mark.parametrize("result", [-1, 0, COMMAND_LENGTH - 1])
+def test_resilient_light_short_write(result, resilient_light):
+    """:param resilient_light: resilient BlyncLight fixture
+
+    A write that fails or writes only part of the command word
+    disconnects the light.
+    """
+    resilient_light.device.write.return_value = result
+    with mock.patch.object(Reconnector, "start") as start:
+        resilient_light.update(force=True)
+    assert not resilient_light.connected
+    start.assert_called_once()
+
+
+def test_resilient_light_full_write(resilient_light):
+    """:param resilient_light: resilient BlyncLight fixture"""
+    resilient_light.device.write.return_value = COMMAND_LENGTH
+    resilient_light.update(force=True)
+    assert resilient_light.connected
+
+
+def test_reconnector_backoff():
+    light = mock.Mock(identifier="0x2c0d:0xffff", connected=True)
+    light.reconnect.side_effect = [OSError(), OSError(), OSError(), OSError(), None]
+    reconnector = Reconnector(light, initial=0.1, maximum=0.5, factor=2.0)
+
+    with mock.patch.object(reconnector._stop, "wait") as wait:
+        reconnector.run()
+
+    assert reconnector.attempts == 5
+    assert [c.args[0] for c in wait.call_args_list] == [0.1, 0.2, 0.4, 0.5]
+
+
+def test_reconnector_thread():
+    light = mock.Mock(identifier="0x2c0d:0xffff", connected=True)
+    light.reconnect.side_effect = OSError()
+    reconnector = Reconnector(light, initial=0.001)
+    reconnector.start()
+    assert reconnector.alive
+    reconnector.stop(1)
+    assert not reconnector.alive
+    assert reconnector.attempts >= 1
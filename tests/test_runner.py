@@ -0,0 +1,76 @@
+"""Test the synchronized multi-light effect runner."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight.clock import VirtualClock
+from blynclight.effects import EffectRunner, Spectrum
+
+
+def test_runner_spread():
+    assert EffectRunner.spread(4, 100) == [0, 25, 50, 75]
+    assert EffectRunner.spread(1, 100) == [0]
+
+
+def test_runner_frame_offsets(Light):
+    """:param Light: BlyncLight fixture"""
+    frames = [(n, n, n) for n in range(10)]
+    runner = EffectRunner([Light, Light], frames, offsets=[0, 3])
+    assert runner.frame(0) == [(0, 0, 0), (3, 3, 3)]
+    assert runner.frame(9) == [(9, 9, 9), (2, 2, 2)]
+
+
+def test_runner_invalid_arguments(Light):
+    """:param Light: BlyncLight fixture"""
+    with pytest.raises(ValueError):
+        EffectRunner([Light], [])
+    with pytest.raises(ValueError):
+        EffectRunner([Light], [(0, 0, 0)], offsets=[0, 1])
+
+
+def test_runner_run(Light):
+    """:param Light: BlyncLight fixture
+
+    Each tick writes every light exactly once and reports the skew
+    between the first and last write.
+    """
+    clock = VirtualClock()
+    colors = list(Spectrum(steps=16))
+    runner = EffectRunner([Light] * 3, colors, interval=0.1, clock=clock)
+    reported = []
+    runner.on_tick = lambda tick, skew: reported.append((tick, skew))
+
+    with mock.patch.object(Light, "device") as device:
+        runner.run(count=20)
+
+    assert device.write.call_count == 3 * 20
+    assert [tick for tick, _ in reported] == list(range(20))
+    assert runner.max_skew == 0.0
+    assert runner.dropped == 0
+    assert clock.now() == pytest.approx(1.9)
+    assert Light.color == colors[19 % 16]
+
+
+def test_runner_drops_late_ticks(Light):
+    """:param Light: BlyncLight fixture
+
+    A runner that falls behind skips to the frame for the current time.
+    """
+    clock = VirtualClock()
+    runner = EffectRunner([Light], [(n, 0, 0) for n in range(100)], interval=0.1)
+    runner.clock = clock
+
+    ticks = []
+    runner.on_tick = lambda tick, skew: ticks.append(tick)
+
+    def slow_write(data):
+        clock.advance(0.25)
+
+    with mock.patch.object(Light, "device") as device:
+        device.write.side_effect = slow_write
+        runner.run(count=4)
+
+    assert ticks == [0, 2, 5, 7]
+    assert runner.dropped == 4
+    assert Light.red == 7
@@ -0,0 +1,103 @@
+"""Test named scenes compiled to command words."""
+
+from unittest import mock
+
+import pytest
+
+from blynclight import BlyncLight
+from blynclight.constants import COLORS
+from blynclight.scenes import SceneRegistry
+
+SCENES = """
+[busy]
+color = red
+
+[free]
+color = 0, 0, 255
+dim = 1
+
+[alert-flash-fast]
+color = 0xff0000
+flash = 3
+
+[dark]
+color = blue
+off = 1
+"""
+
+
+@pytest.fixture
+def scene_file(tmp_path):
+    path = tmp_path / "scenes.ini"
+    path.write_text(SCENES)
+    return path
+
+
+def test_scene_registry_compile(scene_file, Light):
+    """:param Light: BlyncLight fixture
+
+    Compiled scenes are the command words produced by applying the
+    scene's attributes to a light in the reset state.
+    """
+    scenes = SceneRegistry.compile(scene_file)
+
+    assert list(scenes) == ["busy", "free", "alert-flash-fast", "dark"]
+
+    Light.reset(flush=False)
+    Light.immediate = False
+    Light.apply(color=COLORS["red"], on=1)
+    assert scenes["busy"] == Light.bytes
+
+    with mock.patch.object(Light, "device") as device:
+        Light.apply_scene("alert-flash-fast", scenes)
+    device.write.assert_called_once_with(scenes["alert-flash-fast"])
+    assert Light.color == (255, 0, 0)
+    assert Light.flash and Light.speed == 3 and Light.on
+
+    Light.write_frame(scenes["dark"])
+    assert Light.off and Light.color == COLORS["blue"]
+
+    with pytest.raises(KeyError):
+        scenes["missing"]
+
+
+def test_scene_registry_invalid(tmp_path):
+    path = tmp_path / "scenes.ini"
+    path.write_text("[bad]\nsparkle = 1\n")
+    with pytest.raises(ValueError):
+        SceneRegistry.compile(path)
+
+
+def test_scene_registry_cache(scene_file, tmp_path):
+    """Loading an unchanged scene file uses the cached table instead of
+    compiling, and a changed file is recompiled.
+    """
+    cache_dir = tmp_path / "cache"
+    first = SceneRegistry.load(scene_file, cache_dir)
+
+    with mock.patch.object(SceneRegistry, "compile") as compile:
+        second = SceneRegistry.load(scene_file, cache_dir)
+    compile.assert_not_called()
+    assert second.frames == first.frames
+
+    scene_file.write_text(SCENES + "\n[extra]\ncolor = white\n")
+    assert "extra" in SceneRegistry.load(scene_file, cache_dir)
+
+
+def test_command_word_rejects_unknown_fields():
+    with pytest.raises(AttributeError):
+        BlyncLight.command_word(sparkle=1)
+
+
+def test_state_word():
+    """Named colors and flash speeds are mapped onto light attributes and
+    the light is switched on unless on or off is given.
+    """
+    assert BlyncLight.state_word(color="red", flash=2) == BlyncLight.command_word(
+        color=COLORS["red"], flash=1, speed=2, on=1
+    )
+    assert BlyncLight.state_word(off=1) == BlyncLight.command_word(off=1)
+
+    for state in [{"sparkle": 1}, {"color": "plaid"}, {"red": 256}]:
+        with pytest.raises(ValueError):
+            BlyncLight.state_word(**state)
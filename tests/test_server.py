@@ -0,0 +1,237 @@
+"""Test the BlyncLight HTTP control endpoint.
+
+The server is started on an ephemeral localhost port and driven with
+a minimal keep-alive client. Device writes are counted by replacing the
+light's device with a mock.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from http import HTTPStatus
+from unittest import mock
+
+from blynclight.server import MAX_BODY_LENGTH, LightServer
+
+
+async def request(reader, writer, method, path, payload=None, close=False):
+    """Sends a single HTTP/1.1 request on an open connection and returns
+    a tuple of (status, headers, decoded JSON body).
+    """
+    body = json.dumps(payload).encode() if payload is not None else b""
+    head = [f"{method} {path} HTTP/1.1", "Host: localhost"]
+    head.append(f"Content-Length: {len(body)}")
+    if close:
+        head.append("Connection: close")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        key, _, value = line.decode().partition(":")
+        headers[key.strip().lower()] = value.strip()
+    content = await reader.readexactly(int(headers["content-length"]))
+    return status, headers, json.loads(content) if content else None
+
+
+def run_client(server, client):
+    """Starts `server` on an ephemeral port, runs the coroutine function
+    `client` with a connected (reader, writer) pair and stops the server.
+    """
+
+    async def main():
+        srv = await server.start("127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            return await client(reader, writer)
+        finally:
+            writer.close()
+            await server.stop()
+
+    return asyncio.run(main())
+
+
+def test_server_put_updates_light(Light):
+    """:param Light: BlyncLight fixture
+
+    A PUT request is accepted and applied to the light on the next tick.
+    """
+    server = LightServer({0: Light}, tick=0.01)
+
+    async def client(reader, writer):
+        status, _, body = await request(reader, writer, "GET", "/lights/0")
+        assert body["red"] == "0x00"
+        status, _, body = await request(
+            reader, writer, "PUT", "/lights/0", {"color": [1, 2, 3], "on": 1}
+        )
+        assert status == HTTPStatus.ACCEPTED
+        assert body["pending"] == {"color": [1, 2, 3], "on": 1}
+        await asyncio.sleep(0.05)
+        return await request(reader, writer, "GET", "/lights/0")
+
+    status, _, body = run_client(server, client)
+
+    assert status == HTTPStatus.OK
+    assert body["red"] == "0x01" and body["green"] == "0x03"
+    assert body["off"] == "0x0"
+    assert Light.color == (1, 2, 3)
+    assert Light.on
+
+
+@pytest.mark.parametrize(
+    "method,path,payload,expected",
+    [
+        ("PUT", "/lights/99", {"on": 1}, HTTPStatus.NOT_FOUND),
+        ("PUT", "/lights/zero", {"on": 1}, HTTPStatus.NOT_FOUND),
+        ("PUT", "/nowhere", {"on": 1}, HTTPStatus.NOT_FOUND),
+        ("PUT", "/lights/0", {"bogus": 1}, HTTPStatus.BAD_REQUEST),
+        ("PUT", "/lights/0", {"red": "high"}, HTTPStatus.BAD_REQUEST),
+        ("PUT", "/lights/0", [1, 2, 3], HTTPStatus.BAD_REQUEST),
+        ("PUT", "/lights/0", {"red": 300}, HTTPStatus.BAD_REQUEST),
+        ("PUT", "/lights/0", {"red": -1}, HTTPStatus.BAD_REQUEST),
+        ("PUT", "/lights/0", {"music": 16}, HTTPStatus.BAD_REQUEST),
+        ("PUT", "/lights/0", {"on": 2}, HTTPStatus.BAD_REQUEST),
+        ("PUT", "/lights/0", {"speed": 0}, HTTPStatus.BAD_REQUEST),
+        ("PUT", "/lights/0", {"color": [0, 256, 0]}, HTTPStatus.BAD_REQUEST),
+        ("PUT", "/lights/0", {"color": 0x1000000}, HTTPStatus.BAD_REQUEST),
+        ("PUT", "/lights/0", {"red": 255, "speed": 3, "on": True}, HTTPStatus.ACCEPTED),
+        ("DELETE", "/lights/0", None, HTTPStatus.METHOD_NOT_ALLOWED),
+        ("GET", "/lights", None, HTTPStatus.OK),
+    ],
+)
+def test_server_dispatch(method, path, payload, expected, Light):
+    """:param Light: BlyncLight fixture
+
+    Checks the status returned for well and badly formed requests.
+    """
+    server = LightServer({0: Light})
+    body = json.dumps(payload).encode() if payload is not None else b""
+    status, _ = server.dispatch(method, path, body)
+    assert status == expected
+
+
+def test_server_coalesces_bursts(Light):
+    """:param Light: BlyncLight fixture
+
+    A burst of requests on a single keep-alive connection results in
+    at most one device write per tick, and the last value wins.
+    """
+    nrequests = 2000
+    tick = 0.05
+    server = LightServer({0: Light}, tick=tick)
+
+    async def client(reader, writer):
+        start = time.perf_counter()
+        for value in range(nrequests):
+            status, headers, _ = await request(
+                reader, writer, "PUT", "/lights/0", {"red": value & 0xFF}
+            )
+            assert status == HTTPStatus.ACCEPTED
+            assert headers["connection"] == "keep-alive"
+        return time.perf_counter() - start
+
+    with mock.patch.object(Light, "device") as device:
+        elapsed = run_client(server, client)
+
+    assert server.requests == nrequests
+    assert device.write.call_count == server.writes
+    # One write per elapsed tick, plus the final flush when stopping.
+    assert 1 <= server.writes <= elapsed / tick + 2
+    assert server.writes < nrequests // 10
+    assert Light.red == (nrequests - 1) & 0xFF
+
+
+def test_server_connection_close(Light):
+    """:param Light: BlyncLight fixture
+
+    The server closes the connection when the client asks it to.
+    """
+    server = LightServer({0: Light})
+
+    async def client(reader, writer):
+        status, headers, _ = await request(
+            reader, writer, "GET", "/lights/0", close=True
+        )
+        assert headers["connection"] == "close"
+        return await reader.read()
+
+    assert run_client(server, client) == b""
+
+
+@pytest.mark.parametrize(
+    "length,expected",
+    [
+        ("abc", HTTPStatus.BAD_REQUEST),
+        ("-5", HTTPStatus.BAD_REQUEST),
+        ("1e3", HTTPStatus.BAD_REQUEST),
+        (str(MAX_BODY_LENGTH + 1), HTTPStatus.REQUEST_ENTITY_TOO_LARGE),
+    ],
+)
+def test_server_bad_content_length(length, expected, Light):
+    """:param Light: BlyncLight fixture
+
+    Invalid or oversized Content-Length headers are answered with an
+    error and the connection is closed.
+    """
+    server = LightServer({0: Light})
+
+    async def client(reader, writer):
+        head = ["PUT /lights/0 HTTP/1.1", f"Content-Length: {length}"]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode())
+        await writer.drain()
+        return await reader.read()
+
+    response = run_client(server, client)
+    assert response.startswith(f"HTTP/1.1 {expected.value} ".encode())
+    assert b"Connection: close" in response
+    assert server.requests == 0
+
+
+def test_server_malformed_request_line(Light):
+    """:param Light: BlyncLight fixture
+
+    A malformed request line is answered with 400 Bad Request and the
+    connection is closed.
+    """
+    server = LightServer({0: Light})
+
+    async def client(reader, writer):
+        writer.write(b"GARBAGE\r\n\r\n")
+        await writer.drain()
+        return await reader.read()
+
+    response = run_client(server, client)
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"Connection: close" in response
+    assert server.requests == 0
+
+
+def test_server_writes_off_event_loop(Light):
+    """:param Light: BlyncLight fixture
+
+    Pending state is written to the device from an executor thread, not
+    the thread running the event loop.
+    """
+    server = LightServer({0: Light})
+    threads = []
+
+    async def main():
+        server.submit(0, {"red": 1})
+        await server.flush_async()
+        return threading.get_ident()
+
+    with mock.patch.object(Light, "device") as device:
+        device.write.side_effect = lambda data: threads.append(threading.get_ident())
+        loop_thread = asyncio.run(main())
+
+    assert server.writes == 1
+    assert threads and loop_thread not in threads
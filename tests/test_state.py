@@ -0,0 +1,64 @@
+"""Test persisting the last command word written to a light."""
+
+from unittest import mock
+
+from blynclight import BlyncLight, StateCache
+from blynclight.constants import EMBRAVA_VENDOR_IDS
+from blynclight.state import default_state_dir
+
+
+def test_default_state_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path))
+    assert default_state_dir() == tmp_path / "blynclight"
+
+
+def test_state_cache_round_trip(tmp_path, Light):
+    """:param Light: BlyncLight fixture"""
+    cache = StateCache(tmp_path)
+    assert cache.load(Light.key) is None
+
+    cache.save(Light.key, Light.bytes)
+    assert cache.filename(Light.key).read_bytes() == Light.bytes
+    assert StateCache(tmp_path).load(Light.key) == Light.bytes
+
+
+def test_state_cache_filename_for_path_keys(tmp_path):
+    """Lights keyed by HID path are stored in a file in the cache
+    directory, not under the path itself.
+    """
+    cache = StateCache(tmp_path)
+    assert cache.filename("/dev/hidraw0") == tmp_path / "_dev_hidraw0"
+    assert cache.filename("0x2c0d:0xfffe") == tmp_path / "0x2c0d_0xfffe"
+
+
+def test_state_cache_rejects_invalid_frames(tmp_path):
+    cache = StateCache(tmp_path)
+    cache.filename("short").write_bytes(b"\x00" * 4)
+    cache.filename("no_eoc").write_bytes(b"\x00" * 9)
+    assert cache.load("short") is None
+    assert cache.load("no_eoc") is None
+
+
+def test_light_adopts_cached_state(tmp_path):
+    """A light created with a state cache adopts the last frame written
+    by a previous light without writing to the device.
+    """
+    cache = StateCache(tmp_path)
+
+    with mock.patch("hid.device"):
+        first = BlyncLight(EMBRAVA_VENDOR_IDS[0], 0xFFFF, state_cache=cache)
+        first.apply(color=(1, 2, 3), on=True)
+        first.close()
+        first.device.reset_mock()
+
+        second = BlyncLight(
+            EMBRAVA_VENDOR_IDS[0],
+            0xFFFF,
+            immediate=True,
+            state_cache=StateCache(tmp_path),
+        )
+
+    assert second.value == first.value
+    assert second.color == (1, 2, 3)
+    assert second.on
+    second.device.write.assert_not_called()
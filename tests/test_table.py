@@ -0,0 +1,70 @@
+"""Test compiled effect tables and their cache."""
+
+import mmap
+
+import pytest
+
+from blynclight import BlyncLight
+from blynclight.clock import VirtualClock
+from blynclight.effects import EffectCache, EffectTable, Spectrum, TableRunner
+
+BASE = BlyncLight.command_word(on=1)
+
+
+def test_table_run_length_encodes():
+    """Repeated frames are stored as one run."""
+    colors = [(1, 2, 3)] * 5 + [(4, 5, 6)] + [(1, 2, 3)] * 2
+    table = EffectTable.compile(colors, BASE)
+
+    assert len(table) == 8
+    assert table.runs == 3
+    words = [bytes(word) for word in table]
+    assert words == [bytes(table[index]) for index in range(8)]
+    assert bytes(table[5]) == BlyncLight.command_word(color=(4, 5, 6), on=1)
+    assert bytes(table[-1]) == BlyncLight.command_word(color=(1, 2, 3), on=1)
+
+    with pytest.raises(IndexError):
+        table[8]
+
+
+@pytest.mark.parametrize(
+    "buffer", [b"", b"NOTATABLE" * 4, EffectTable.encode([BASE, BASE])[:-1]]
+)
+def test_table_invalid(buffer):
+    with pytest.raises(ValueError):
+        EffectTable(buffer)
+
+
+def test_cache_compiles_once(tmp_path):
+    """A cached table is mapped from its file instead of recompiled."""
+    cache = EffectCache(tmp_path)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return Spectrum(steps=64)
+
+    first = cache.get("spectrum", {"steps": 64}, BASE, factory)
+    second = cache.get("spectrum", {"steps": 64}, BASE, factory)
+    other = cache.get("spectrum", {"steps": 32}, BASE, lambda: Spectrum(steps=32))
+
+    assert len(calls) == 1
+    assert isinstance(second._buffer, mmap.mmap)
+    assert list(map(bytes, first)) == list(map(bytes, second))
+    assert len(other) == 32
+    assert len(list(tmp_path.glob("spectrum-*.fx"))) == 2
+
+    cache.filename("spectrum", {"steps": 64}, BASE).write_bytes(b"garbage")
+    assert cache.load("spectrum", {"steps": 64}, BASE) is None
+
+
+def test_table_runner(Light):
+    """:param Light: BlyncLight fixture"""
+    table = EffectTable.compile([(255, 0, 0), (0, 255, 0)], BASE)
+    clock = VirtualClock()
+    runner = TableRunner([Light], table, interval=0.1, clock=clock)
+    runner.run(count=3)
+
+    assert runner.ticks == 3
+    assert Light.color == (255, 0, 0)
+    assert Light.on
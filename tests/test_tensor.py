@@ -0,0 +1,63 @@
+"""Test vectorized frame tensors for arrays of lights."""
+
+import pytest
+
+from unittest import mock
+
+from blynclight.clock import VirtualClock
+from blynclight.effects import Spectrum
+
+np = pytest.importorskip("numpy")
+
+from blynclight.effects.tensor import TensorPlayer, frame_tensor, spectrum, wave
+
+
+def test_frame_tensor_shape():
+    frames = frame_tensor([0.0, 0.5, 1.0], wave(color=(200, 0, 100)), ticks=40)
+    assert frames.shape == (40, 3, 3)
+    assert frames.dtype == np.uint8
+    assert frames[:, :, 1].max() == 0
+    assert frames[0, 0, 0] == 100 and frames[0, 0, 2] == 50
+
+
+def test_frame_tensor_broadcasts_and_clips():
+    frames = frame_tensor([0, 1], lambda t, x: np.full(3, 300.0), ticks=2)
+    assert (frames == 255).all()
+
+    with pytest.raises(ValueError):
+        frame_tensor([0, 1], lambda t, x: np.zeros((2, 5, 3)), ticks=2)
+
+
+def test_spectrum_matches_generator():
+    """Light 0 follows Spectrum() and a light one unit away leads it
+    by `spread` steps.
+    """
+    frames = frame_tensor([0, 1], spectrum(rate=20, spread=4), ticks=32)
+    expected = list(Spectrum(steps=36))
+    for tick in range(32):
+        for light, offset in [(0, 0), (1, 4)]:
+            color = frames[tick, light].astype(int)
+            assert np.abs(color - expected[tick + offset]).max() <= 1
+
+
+def test_tensor_player(Light):
+    """:param Light: BlyncLight fixture"""
+    clock = VirtualClock()
+    frames = np.zeros((4, 2, 3), dtype=np.uint8)
+    frames[:, 0, 0] = [10, 20, 30, 40]
+    frames[:, 1, 2] = [1, 2, 3, 4]
+    player = TensorPlayer([Light, Light], frames, interval=0.1, clock=clock)
+
+    with mock.patch.object(Light, "device") as device:
+        player.run(count=6)
+
+    assert device.write.call_count == 12
+    assert Light.on
+    assert Light.color == (0, 0, 2)
+    assert player.ticks == 6 and player.dropped == 0
+
+
+def test_tensor_player_invalid_frames(Light):
+    """:param Light: BlyncLight fixture"""
+    with pytest.raises(ValueError):
+        TensorPlayer([Light], np.zeros((4, 2, 3)))